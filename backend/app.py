@@ -3,8 +3,17 @@ import flask_session
 import flask_sqlalchemy
 import os
 import atexit
+import hashlib
 from backend import auth
+from backend import catalog
+from backend import compression
+from backend import geo
+from backend.compression import compress
 from backend import database
+from backend import metrics  # request timing hooks and /metrics
+from backend import open_hours
+from backend import search_index
+from backend import static_assets  # /static with precompressed variants
 from backend.top import app
 from data_management import db_manager
 
@@ -16,14 +25,11 @@ app.config['SESSION_PERMANENT'] = False
 app.config['SESSION_TYPE'] = 'sqlalchemy'
 app.config['SQLALCHEMY_DATABASE_URI'] = session_database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# 'sql' (Postgres trigram/full text) or 'memory' (in-process index)
+app.config['SEARCH_BACKEND'] = search_index.SEARCH_BACKEND
 
-# Cap SQLAlchemy engine pool size for session store to avoid exceeding DB connection limits
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_size': 1,        
-    'max_overflow': 0,     
-    'pool_pre_ping': True, # detect stale connections
-    'pool_recycle': 1800   # recycle every 30 minutes
-}
+# Session store engine shares the per-worker connection budget with the data layer
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.pool_config.session_engine_options()
 app.config['SESSION_SQLALCHEMY'] = flask_sqlalchemy.SQLAlchemy(
     app,
     engine_options=app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
@@ -36,6 +42,8 @@ def _dispose_pools():
         # Close psycopg2 pooled connections
         if hasattr(database, 'pool'):
             database.pool.closeall()
+        if getattr(database, 'replica_pool', None) is not None:
+            database.replica_pool.closeall()
     except Exception:
         pass
     try:
@@ -48,150 +56,413 @@ def _dispose_pools():
 
 atexit.register(_dispose_pools)
 
+# Read replica routing: a session that just wrote keeps reading from the
+# primary until the replica has had time to catch up (read-your-writes)
+PRIMARY_UNTIL_SESSION_KEY = 'db_primary_until'
+
+@app.before_request
+def _begin_db_routing():
+    if database.replica_pool is not None:
+        database.begin_request(flask.session.get(PRIMARY_UNTIL_SESSION_KEY, 0.0))
+
+@app.after_request
+def _end_db_routing(response):
+    primary_until = database.end_request()
+    if primary_until is not None:
+        flask.session[PRIMARY_UNTIL_SESSION_KEY] = primary_until
+    return response
+
+@app.teardown_request
+def _clear_db_routing(exc=None):
+    # Worker threads are reused; do not leak stickiness into the next request
+    database.end_request()
+
+def _json_with_raw(raw_fields, **fields):
+    """Like jsonify, but raw_fields values are already-encoded JSON bytes."""
+    parts = [
+        flask.json.dumps(key).encode('utf-8') + b':' + flask.json.dumps(value).encode('utf-8')
+        for key, value in fields.items()
+    ]
+    parts += [
+        flask.json.dumps(key).encode('utf-8') + b':' + raw
+        for key, raw in raw_fields.items()
+    ]
+    return flask.Response(b'{' + b','.join(parts) + b'}', mimetype='application/json')
+
+# Conditional GET. ETags are derived from cache_versions counters, so a
+# matching If-None-Match is answered before any payload query runs.
+# no-cache lets browsers and proxies store the body but revalidate each use.
+CACHE_PRIVATE = 'private, no-cache'
+CACHE_PUBLIC = 'public, no-cache'
+
+def _etag(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def _not_modified(etag, cache_control):
+    """A 304 response if the client already has etag (or a compressed variant of it), else None."""
+    matched = compression.matching_etag(flask.request.if_none_match, etag)
+    if matched is None:
+        return None
+    resp = flask.Response(status=304)
+    resp.set_etag(matched)
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+def _cacheable(resp, etag, cache_control):
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
 # Welcome page route (not protected)
 @app.route('/', methods=['GET'])
 def index():
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
+
+def _open_at_arg():
+    """
+    Minute of the week to filter on from ?open_now=1 or
+    ?open_at=<ISO 8601 | epoch seconds>, or None. ValueError if invalid.
+    """
+    args = flask.request.args
+    if args.get('open_at'):
+        return open_hours.minute_of_week(open_hours.parse_open_at(args['open_at']))
+    if args.get('open_now') in ('1', 'true'):
+        return open_hours.minute_of_week()
+    return None
+
+# Large list payloads below opt in to compression with @compress()
+# even when COMPRESS_ENABLED is off for the rest of the app.
 
 # Home Page
 @app.route('/api/home', methods=['GET'])
+@compress()
 def home():
     auth.authenticate()
-    restaurants = database.load_all_restaurants()
     firstname = auth.get_firstname()
 
-    username = auth.get_username()
     user_prefs = {}
     try:
-        ok_u, user = database.get_user_by_username(username)
-        if ok_u and isinstance(user, dict):
+        user = auth.get_user_context()
+        if isinstance(user, dict):
             # Normalize keys if present (DB uses favorite_cuisine as array)
             favs = user.get('favorite_cuisine') or user.get('favoriteCuisine') or user.get('favorite_cuisines') or []
             user_prefs = { 'favorite_cuisines': favs or [] }
     except Exception:
         user_prefs = {}
 
+    try:
+        open_at = _open_at_arg()
+    except ValueError:
+        return flask.jsonify({"error": "Invalid open_at"}), 400
+
+    ok_v, version = database.load_catalog_version()
+    etag = _etag('home', version, firstname, user_prefs.get('favorite_cuisines'), open_at) if ok_v else None
+    if etag:
+        not_modified = _not_modified(etag, CACHE_PRIVATE)
+        if not_modified:
+            return not_modified
+
+    restaurants = database.load_all_restaurants_json(open_at)
     if restaurants[0] is False:
         return flask.jsonify({"error": restaurants[1]}), 400
 
-    return flask.jsonify({
-        "firstname": firstname,
-        "restaurants": restaurants[1],
-        "preferences": user_prefs
-    })
+    resp = _json_with_raw(
+        {"restaurants": restaurants[1]},
+        firstname=firstname,
+        preferences=user_prefs,
+    )
+    return _cacheable(resp, etag, CACHE_PRIVATE) if etag else resp
 
 # Load restaurant data for map
+# Optional viewport: bbox=west,south,east,north, lat/lng + radius (meters),
+# zoom. At zoom <= geo.CLUSTER_MAX_ZOOM, crowded grid cells come back as
+# clusters instead of individual restaurants.
 @app.route('/api/map', methods=['GET'])
+@compress()
 def map():
     auth.authenticate()
-    restaurants = database.load_all_restaurants()
-
+    args = flask.request.args
+    try:
+        bbox = geo.parse_bbox(args['bbox']) if args.get('bbox') else None
+        center = radius = None
+        if args.get('radius'):
+            center = (float(args['lat']), float(args['lng']))
+            radius = min(float(args['radius']), geo.MAX_RADIUS_M)
+            if radius <= 0 or not (-90 <= center[0] <= 90 and -180 <= center[1] <= 180):
+                raise ValueError
+        zoom = geo.parse_zoom(args['zoom']) if args.get('zoom') else None
+    except (KeyError, ValueError):
+        return flask.jsonify({"error": "Invalid bbox, lat, lng, radius or zoom"}), 400
+
+    ok_v, version = database.load_catalog_version()
+    etag = _etag('map', version, bbox, center, radius, zoom) if ok_v else None
+    if etag:
+        not_modified = _not_modified(etag, CACHE_PRIVATE)
+        if not_modified:
+            return not_modified
+
+    if bbox is None and center is None and zoom is None:
+        restaurants = database.load_all_restaurants_json()
+        if restaurants[0] is False:
+            return flask.jsonify({"error": restaurants[1]}), 400
+        resp = _json_with_raw({"restaurants": restaurants[1]})
+        return _cacheable(resp, etag, CACHE_PRIVATE) if etag else resp
+
+    if app.config['SEARCH_BACKEND'] == 'memory':
+        in_view = database.restaurants_in_view_in_memory
+    else:
+        in_view = database.restaurants_in_view
+    ok, visible = in_view(bbox, center, radius)
+    if not ok:
+        return flask.jsonify({"error": visible}), 400
+
+    clusters = []
+    if zoom is not None and zoom <= geo.CLUSTER_MAX_ZOOM:
+        points = [
+            (i, rest['latitude'], rest['longitude'])
+            for i, (rest, _) in enumerate(visible)
+            if rest['latitude'] is not None and rest['longitude'] is not None
+        ]
+        singles, clusters = geo.cluster(points, zoom)
+        visible = [visible[i] for i in singles]
+
+    body = b"[" + b",".join(fragment for _, fragment in visible) + b"]"
+    resp = _json_with_raw({"restaurants": body}, clusters=clusters)
+    return _cacheable(resp, etag, CACHE_PRIVATE) if etag else resp
+
+# Home feed ranked for the current user (profile + review history)
+@app.route('/api/recommendations', methods=['GET'])
+@compress()
+def recommendations():
+    auth.authenticate()
+    limit = flask.request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, limit)
+
+    user = auth.get_user_context() or {}
+    ratings = []
+    if user.get('id'):
+        ok, ratings = database.get_user_ratings(user['id'])
+        if not ok:
+            return flask.jsonify({"error": ratings}), 400
+
+    restaurants = database.recommend_restaurants(user, ratings, limit=limit, as_json=True)
     if restaurants[0] is False:
         return flask.jsonify({"error": restaurants[1]}), 400
-
-    return flask.jsonify({
-        "restaurants": restaurants[1]
-    })
+    return _json_with_raw({"restaurants": restaurants[1]})
 
 # Load profile data
 @app.route('/profile', methods=['GET'])
 def profile_page():
-    auth.authenticate()
-    return flask.send_file('../frontend/react/index.html')
+    auth.require_login()
+    return static_assets.shell_response()
 
 # Serve map page
 @app.route('/map', methods=['GET'])
 def map_page():
-    auth.authenticate()
-    return flask.send_file('../frontend/react/index.html')
+    auth.require_login()
+    return static_assets.shell_response()
 
 # Serve discover page
 @app.route('/discover', methods=['GET'])
 def discover_page():
-    auth.authenticate()
-    return flask.send_file('../frontend/react/index.html')
+    auth.require_login()
+    return static_assets.shell_response()
 
 # Serve group page
 @app.route('/group', methods=['GET'])
 def group_page():
-    auth.authenticate()
-    return flask.send_file('../frontend/react/index.html')
+    auth.require_login()
+    return static_assets.shell_response()
 
 # Serve individual restaurant page (client-side route)
 @app.route('/restaurants/<rest_id>', methods=['GET'])
 def restaurant_page(rest_id):
-    auth.authenticate()
-    return flask.send_file('../frontend/react/index.html')
+    auth.require_login()
+    return static_assets.shell_response()
 
 # Logout route that redirects to CAS logout
 @app.route('/logout_cas', methods=['GET'])
 def logout_cas():
     # This route serves the React app to show the LogoutCasPage after CAS redirects back
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 
 # Logout app page (no authentication required)
 @app.route('/logout_app', methods=['GET'])
 def logout_app_page():
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 # Logout CAS landing page (no authentication required)
 @app.route('/logout_cas_landing', methods=['GET'])
 def logout_cas_landing_page():
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 # Endpoint to retrieve search results 
+# name/category: substring filters; q: ranked, typo-tolerant free text
 @app.route('/api/search', methods=['GET'])
 def search_results():
     
-    # Test Restaurant Data
     name = flask.request.args.get('name', '')
     category = flask.request.args.get('category', '')
-    restaurants = database.restaurant_search([name, category])
+    query = flask.request.args.get('q', '')
+    limit = flask.request.args.get('limit', type=int)
+    if query and limit is None:
+        limit = SEARCH_DEFAULT_LIMIT
+    if limit is not None:
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    try:
+        open_at = _open_at_arg()
+    except ValueError:
+        return flask.jsonify({"error": "Invalid open_at"}), 400
+    only_ids = None
+    if open_at is not None:
+        ok, only_ids = database.open_restaurant_ids(open_at)
+        if not ok:
+            return flask.jsonify({"error": only_ids}), 400
+    if app.config['SEARCH_BACKEND'] == 'memory':
+        search = database.restaurant_search_in_memory
+    else:
+        search = database.restaurant_search
+    restaurants = search([name, category], query=query, limit=limit, as_json=True,
+                         only_ids=only_ids)
 
     if not restaurants[0]:
         return flask.jsonify({"error": restaurants[1]}), 400
 
-    return flask.jsonify({"restaurants": restaurants[1]})
+    return _json_with_raw({"restaurants": restaurants[1]})
+
+RESTAURANT_NOT_FOUND = "Restaurant not found"
 
 # Retrieve restaurant details and menu (JSON API)
 @app.route('/api/restaurants/<rest_id>', methods=['GET'])
 def restaurant_details(rest_id):
-    ok_r, rest = database.load_restaurant_by_id(rest_id)
+    keys = [catalog.CATALOG_KEY, catalog.menu_key(rest_id)]
+    ok_v, versions = database.get_cache_versions(keys)
+    etag = _etag('restaurant', rest_id, *[versions[k] for k in keys]) if ok_v else None
+    if etag:
+        not_modified = _not_modified(etag, CACHE_PUBLIC)
+        if not_modified:
+            return not_modified
+
+    ok_r, rest = database.load_restaurant_by_id(rest_id, as_json=True)
     if not ok_r:
-        return flask.abort(404)
+        return flask.jsonify({"error": RESTAURANT_NOT_FOUND}), 404
 
     ok_m, menu = database.load_menu_for_restaurant(rest_id)
     if not ok_m:
-        menu = []
+        # Do not let a degraded response be cached
+        return _json_with_raw({"restaurant": rest}, menu=[])
 
-    return flask.jsonify({"restaurant": rest, "menu": menu})
+    resp = _json_with_raw({"restaurant": rest}, menu=menu)
+    return _cacheable(resp, etag, CACHE_PUBLIC) if etag else resp
+
+# Everything the restaurant page needs in one request and one query:
+# restaurant (with rating stats), menu, the first page of reviews, the
+# viewer's own reviews and who the viewer is.
+BUNDLE_REVIEWS_LIMIT = 20
+
+@app.route('/api/restaurants/<rest_id>/bundle', methods=['GET'])
+@compress()
+def restaurant_bundle(rest_id):
+    try:
+        limit, _ = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    limit = limit or BUNDLE_REVIEWS_LIMIT
+
+    # The user context is cached in the session, so this is usually free
+    viewer = auth.get_user_context() if auth.is_authenticated() else None
+
+    keys = [catalog.CATALOG_KEY, catalog.menu_key(rest_id), catalog.reviews_key(rest_id)]
+    ok_v, versions = database.get_cache_versions(keys)
+    etag = None
+    if ok_v:
+        etag = _etag('bundle', rest_id, *[versions[k] for k in keys], limit,
+                     viewer and viewer['id'], viewer and viewer['admin_status'])
+        not_modified = _not_modified(etag, CACHE_PRIVATE)
+        if not_modified:
+            return not_modified
+
+    ok, bundle = database.load_restaurant_bundle(
+        rest_id, viewer_id=viewer and viewer['id'], limit=limit)
+    if not ok:
+        return flask.jsonify({"error": RESTAURANT_NOT_FOUND}), 404
+
+    resp = _json_with_raw(
+        {"restaurant": bundle["restaurant"]},
+        menu=bundle["menu"],
+        reviews=bundle["reviews"],
+        next_cursor=_next_cursor(bundle["reviews"], limit),
+        viewer_reviews=bundle["viewer_reviews"],
+        viewer=viewer and {"username": viewer['netid'], "admin_status": viewer['admin_status']},
+    )
+    return _cacheable(resp, etag, CACHE_PRIVATE) if etag else resp
 
 @app.route('/back_office/restaurants/<rest_id>', methods=['GET'])
 def back_office_restaurant_page(rest_id):
     auth.authenticate()
-    ok, admin = database.get_admin_status(auth.get_username())
+    ok, admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": admin}), 400
     if not admin:
         return flask.abort(403)
-    return flask.send_file('../frontend/react/index.html')
-
+    return static_assets.shell_response()
+
+
+# Keyset pagination: ?limit=N&cursor=<next_cursor from the previous page>.
+# Without limit, lists stay unbounded for existing clients.
+def _page_args():
+    """Return (limit, cursor) from the query string; raises ValueError on a bad limit."""
+    limit = flask.request.args.get('limit')
+    cursor = flask.request.args.get('cursor') or None
+    if limit is None or limit == '':
+        return None, cursor
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, database.MAX_PAGE_SIZE), cursor
+
+def _next_cursor(rows, limit):
+    if limit is None or len(rows) < limit:
+        return None
+    return database.encode_cursor(rows[-1])
 
 # Review endpoints
 @app.route('/api/reviews', methods=['GET'])
+@compress()
 def get_all_reviews():
-    ok, reviews = database.get_all_reviews()
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    ok, reviews = database.get_all_reviews(limit=limit, cursor=cursor)
     if not ok:
         return flask.jsonify({"error": reviews}), 400
-    return flask.jsonify({"reviews": reviews})
+    return flask.jsonify({"reviews": reviews, "next_cursor": _next_cursor(reviews, limit)})
 
 @app.route('/api/restaurants/<rest_id>/reviews', methods=['GET'])
 def get_restaurant_reviews(rest_id):
-    ok, reviews = database.get_reviews_by_restaurant(rest_id)
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    key = catalog.reviews_key(rest_id)
+    ok_v, versions = database.get_cache_versions([key])
+    etag = _etag('reviews', rest_id, versions[key], limit, cursor) if ok_v else None
+    if etag:
+        not_modified = _not_modified(etag, CACHE_PUBLIC)
+        if not_modified:
+            return not_modified
+
+    ok, reviews = database.get_reviews_by_restaurant(rest_id, limit=limit, cursor=cursor)
     if not ok:
         return flask.jsonify({"error": reviews}), 400
-    return flask.jsonify({"reviews": reviews})
+    resp = flask.jsonify({"reviews": reviews, "next_cursor": _next_cursor(reviews, limit)})
+    return _cacheable(resp, etag, CACHE_PUBLIC) if etag else resp
 
 # Create or update a review for a restaurant
 @app.route('/api/restaurants/<rest_id>/reviews', methods=['POST'])
@@ -214,7 +485,11 @@ def create_review(rest_id):
         return flask.jsonify({"error": f"Comment must be at most {MAX_COMMENT_LEN} characters"}), 400
     
     username = auth.get_username()
-    ok, review = database.upsert_review(rest_id, username, rating, comment)
+    user = auth.get_user_context()
+    ok, review = database.upsert_review(
+        rest_id, username, rating, comment,
+        user_id=user['id'] if user else None,
+    )
     
     if not ok:
         return flask.jsonify({"error": review}), 400
@@ -224,10 +499,14 @@ def create_review(rest_id):
 # Feedback Endpoints
 @app.route('/api/restaurants/<rest_id>/feedback', methods=['GET'])
 def get_restaurant_feedback(rest_id):
-    ok, feedback = database.get_feedback_by_restaurant(rest_id)
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    ok, feedback = database.get_feedback_by_restaurant(rest_id, limit=limit, cursor=cursor)
     if not ok:
         return flask.jsonify({"error": feedback}), 400
-    return flask.jsonify({"reviews": feedback})
+    return flask.jsonify({"reviews": feedback, "next_cursor": _next_cursor(feedback, limit)})
 
 
 @app.route('/api/restaurants/<rest_id>/feedback', methods=['POST'])
@@ -243,7 +522,11 @@ def submit_feedback(rest_id):
         return flask.jsonify({"error": "Comment must be a non-empty string"}), 400
     
     username = auth.get_username()
-    ok, feedback = database.submit_feedback(rest_id, username, response)
+    user = auth.get_user_context()
+    ok, feedback = database.submit_feedback(
+        rest_id, username, response,
+        user_id=user['id'] if user else None,
+    )
     
     if not ok:
         return flask.jsonify({"error": feedback}), 400
@@ -254,8 +537,7 @@ def submit_feedback(rest_id):
 @app.route('/api/users/admin_status', methods=['GET'])
 def get_admin_status():
     auth.authenticate()
-    username = auth.get_username()
-    ok, is_admin = database.get_admin_status(username)
+    ok, is_admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": is_admin}), 400
     return flask.jsonify({"is_admin": is_admin})
@@ -265,10 +547,14 @@ def get_admin_status():
 def get_user_reviews():
     auth.authenticate()
     username = auth.get_username()
-    ok, reviews = database.get_reviews_by_user(username)
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    ok, reviews = database.get_reviews_by_user(username, limit=limit, cursor=cursor)
     if not ok:
         return flask.jsonify({"error": reviews}), 400
-    return flask.jsonify({"reviews": reviews})
+    return flask.jsonify({"reviews": reviews, "next_cursor": _next_cursor(reviews, limit)})
 
 # Delete a review by review ID
 @app.route('/api/reviews/<review_id>', methods=['DELETE'])
@@ -276,7 +562,7 @@ def delete_user_review(review_id):
     auth.authenticate()
     username = auth.get_username()
     # Admins can delete any review; normal users can delete only their own
-    ok_admin, is_admin = database.get_admin_status(username)
+    ok_admin, is_admin = auth.get_admin_status()
     if ok_admin and is_admin:
         ok, result = database.delete_review_force(review_id)
     else:
@@ -288,19 +574,23 @@ def delete_user_review(review_id):
     return flask.jsonify({"message": "Review deleted"}), 200
 
 @app.route('/api/feedback', methods=['GET'])
+@compress()
 def get_feedback():
     auth.authenticate()
-    ok, responses = database.get_all_feedback()
+    try:
+        limit, cursor = _page_args()
+    except ValueError:
+        return flask.jsonify({"error": "limit must be a positive integer"}), 400
+    ok, responses = database.get_all_feedback(limit=limit, cursor=cursor)
     if not ok:
         return flask.jsonify({"error": responses}), 400
-    return flask.jsonify({"responses": responses})
+    return flask.jsonify({"responses": responses, "next_cursor": _next_cursor(responses, limit)})
 
 @app.route('/api/feedback/<feedback_id>', methods=['DELETE'])
 def delete_feedback(feedback_id):
     auth.authenticate()
-    username = auth.get_username()
     # Only admins can delete feedback from Back Office
-    ok_admin, is_admin = database.get_admin_status(username)
+    ok_admin, is_admin = auth.get_admin_status()
     if not (ok_admin and is_admin):
         return flask.jsonify({"error": "Forbidden"}), 403
     ok, result = database.delete_feedback(feedback_id)
@@ -312,37 +602,37 @@ def delete_feedback(feedback_id):
 def back_office():
     # Force CAS authentication (will redirect to CAS if needed)
     auth.authenticate()
-    ok, admin = database.get_admin_status(auth.get_username())
+    ok, admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": admin}), 400
     if not admin:
         return flask.abort(403)
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 @app.route('/back_office/feedback', methods=['GET'])
 def back_office_feedback():
     auth.authenticate()
-    ok, admin = database.get_admin_status(auth.get_username())
+    ok, admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": admin}), 400
     if not admin:
         return flask.abort(403)
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 @app.route('/back_office/reviews', methods=['GET'])
 def back_office_reviews():
     auth.authenticate()
-    ok, admin = database.get_admin_status(auth.get_username())
+    ok, admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": admin}), 400
     if not admin:
         return flask.abort(403)
-    return flask.send_file('../frontend/react/index.html')
+    return static_assets.shell_response()
 
 @app.route('/api/reviews/<review_id>/admin_delete', methods=['DELETE'])
 def admin_delete_review(review_id):
     auth.authenticate()
-    ok, admin = database.get_admin_status(auth.get_username())
+    ok, admin = auth.get_admin_status()
     if not ok:
         return flask.jsonify({"error": admin}), 400
     if not admin:
@@ -393,6 +683,14 @@ def get_group(group_id):
         return flask.jsonify({"error": "Forbidden"}), 403
     return flask.jsonify({"group": group})
 
+def _group_error(err, forbidden_msg):
+    """Map a database group mutation error onto the route's response."""
+    if err == database.GROUP_NOT_FOUND:
+        return flask.jsonify({"error": err}), 404
+    if err == database.NOT_GROUP_MEMBER:
+        return flask.jsonify({"error": forbidden_msg}), 403
+    return flask.jsonify({"error": err}), 400
+
 def _is_leader(username, group):
     for m in group['members']:
         if m['netid'] == username and m['role'] == 'leader':
@@ -406,37 +704,21 @@ def add_group_member(group_id):
     member_netid = data.get('netid', '').strip()
     if not member_netid:
         return flask.jsonify({"error": "netid required"}), 400
-    ok, group = database.get_group_with_members(group_id)
+    # Any member can add other members; the check, insert and re-read
+    # happen in one statement
+    ok, updated = database.add_group_member_as(group_id, username, member_netid)
     if not ok:
-        return flask.jsonify({"error": group}), 404
-    # Any member can add other members; ensure the requester is in the group
-    if username not in [m['netid'] for m in group['members']]:
-        return flask.jsonify({"error": "Only group members can add"}), 403
-    ok, err = database.add_member_to_group(group_id, member_netid)
-    if not ok:
-        return flask.jsonify({"error": err}), 400
-    # Return updated group
-    ok, updated = database.get_group_with_members(group_id)
+        return _group_error(updated, "Only group members can add")
     return flask.jsonify({"group": updated}), 200
 
 @app.route('/api/groups/<group_id>/members/<member_netid>', methods=['DELETE'])
 def remove_group_member(group_id, member_netid):
     username = _require_auth()
-    ok, group = database.get_group_with_members(group_id)
+    # Leaders can never be removed; any member can remove others
+    # (including self), non-members are blocked
+    ok, updated = database.remove_group_member_as(group_id, username, member_netid)
     if not ok:
-        return flask.jsonify({"error": group}), 404
-    # Prevent removal of leader entirely
-    if any(m['netid'] == member_netid and m['role'] == 'leader' for m in group['members']):
-        return flask.jsonify({"error": "Cannot remove group leader"}), 400
-    # Allow any member to remove others (including self), but block non-members
-    if username not in [m['netid'] for m in group['members']]:
-        return flask.jsonify({"error": "Only group members can remove"}), 403
-    ok, err = database.remove_member_from_group(group_id, member_netid)
-    if not ok:
-        return flask.jsonify({"error": err}), 400
-    ok, updated = database.get_group_with_members(group_id)
-    if not ok:
-        return flask.jsonify({"error": updated}), 400
+        return _group_error(updated, "Only group members can remove")
     return flask.jsonify({"group": updated}), 200
 
 @app.route('/api/groups/<group_id>', methods=['DELETE'])
@@ -461,16 +743,10 @@ def set_group_restaurant(group_id):
     # Allow None to clear selection, but require key in request
     if 'restaurant_id' not in data:
         return flask.jsonify({"error": "restaurant_id required"}), 400
-    ok, group = database.get_group_with_members(group_id)
-    if not ok:
-        return flask.jsonify({"error": group}), 404
-    # Any member can set restaurant; ensure requester is in the group
-    if username not in [m['netid'] for m in group['members']]:
-        return flask.jsonify({"error": "Only group members can set restaurant"}), 403
-    ok, updated = database.update_group_selected_restaurant(group_id, restaurant_id)
+    # Any member can set restaurant
+    ok, full = database.set_group_restaurant_as(group_id, username, restaurant_id)
     if not ok:
-        return flask.jsonify({"error": updated}), 400
-    ok, full = database.get_group_with_members(group_id)
+        return _group_error(full, "Only group members can set restaurant")
     return flask.jsonify({"group": full}), 200
 
 @app.route('/api/groups/<group_id>/meal', methods=['PUT'])
@@ -482,12 +758,6 @@ def set_group_meal(group_id):
     payload = flask.request.get_json(silent=True) or {}
     # scheduled_meal_at as ISO local string (datetime-local) or None
     scheduled = payload.get('scheduled_meal_at', None)
-    # Verify membership
-    ok, group = database.get_group_with_members(group_id)
-    if not ok:
-        return flask.jsonify({"error": group}), 404
-    if username not in [m['netid'] for m in group['members']]:
-        return flask.jsonify({"error": "Only group members can update meal time"}), 403
     # Normalize only naive local input to UTC; if input already includes timezone (ends with 'Z' or contains offset), trust it
     if isinstance(scheduled, str) and scheduled:
         has_tz = scheduled.endswith('Z') or ('+' in scheduled[10:] or '-' in scheduled[10:])
@@ -503,13 +773,10 @@ def set_group_meal(group_id):
             except Exception:
                 # If parsing fails, leave as-is
                 pass
-    ok2, updated = database.update_group_meal_time(group_id, scheduled)
-    if not ok2:
-        return flask.jsonify({"error": updated}), 400
-    # Return full group details to refresh client state
-    ok3, full = database.get_group_with_members(group_id)
-    if not ok3:
-        return flask.jsonify({"error": full}), 400
+    # Membership check, update and full group details in one statement
+    ok, full = database.set_group_meal_as(group_id, username, scheduled)
+    if not ok:
+        return _group_error(full, "Only group members can update meal time")
     return flask.jsonify({"group": full}), 200
 
 @app.route('/api/users/search', methods=['GET'])
@@ -526,25 +793,27 @@ def user_search():
 def get_cuisines():
     """Get list of available cuisine types from restaurants database."""
     auth.authenticate()
+    ok_v, version = database.load_catalog_version()
+    etag = _etag('cuisines', version) if ok_v else None
+    if etag:
+        not_modified = _not_modified(etag, CACHE_PRIVATE)
+        if not_modified:
+            return not_modified
+
     ok, cuisines = database.get_available_cuisines()
     if not ok:
         return flask.jsonify({"error": cuisines}), 400
-    return flask.jsonify({"cuisines": cuisines})
+    resp = flask.jsonify({"cuisines": cuisines})
+    return _cacheable(resp, etag, CACHE_PRIVATE) if etag else resp
 
 @app.route('/api/groups/<group_id>/preferences', methods=['GET'])
 def get_group_preferences(group_id):
     """Get aggregated preferences (recommended cuisines, dietary restrictions) for a group."""
     username = _require_auth()
-    # Verify membership
-    ok, group = database.get_group_with_members(group_id)
+    # Membership is verified in the same query
+    ok, prefs = database.get_group_preferences(group_id, username)
     if not ok:
-        return flask.jsonify({"error": group}), 404
-    if username not in [m['netid'] for m in group['members']]:
-        return flask.jsonify({"error": "Forbidden"}), 403
-    
-    ok, prefs = database.get_group_preferences(group_id)
-    if not ok:
-        return flask.jsonify({"error": prefs}), 400
+        return _group_error(prefs, "Forbidden")
     return flask.jsonify({"preferences": prefs})
 
 # Back Office Api Routes ----------------
@@ -565,16 +834,23 @@ def update_restaurant_menu(rest_id):
     """Back Office: Update menu items for a restaurant."""
     username = _require_auth()
     # Ensure user is admin
-    ok_admin, is_admin = database.get_admin_status(username)
+    ok_admin, is_admin = auth.get_admin_status()
     if not ok_admin or not is_admin:
         return flask.jsonify({"error": "Forbidden"}), 403
 
+    # items may mix updates (with id), inserts (no id) and deletes (op: "delete")
     payload = flask.request.get_json() or {}
     items = payload.get('items', [])
-    ok, updated_count = database.update_menu_items(rest_id, items)
+    ok, results = database.update_menu_items(rest_id, items)
     if not ok:
-        return flask.jsonify({"error": updated_count}), 400
-    return flask.jsonify({"updated": updated_count}), 200
+        return flask.jsonify({"error": results}), 400
+    statuses = [r['status'] for r in results]
+    return flask.jsonify({
+        "updated": statuses.count('updated'),
+        "inserted": statuses.count('inserted'),
+        "deleted": statuses.count('deleted'),
+        "items": results,
+    }), 200
 
 # Run the Flask app
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+"""
+TigerBites ASGI entry point
+- Public read endpoints (/api/search, /api/restaurants/<id>,
+  /api/restaurants/<id>/reviews) are served natively on the event loop
+  with async_database, with the same JSON, ETags and status codes
+- Everything else (CAS login, session-authenticated pages, writes,
+  static files) runs the Flask app through asgiref's WsgiToAsgi
+Run with: uvicorn backend.asgi:app
+"""
+
+import re
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+from backend import async_database
+from backend import catalog
+from backend import database
+from backend import restaurant_rows
+from backend.app import (
+    app as flask_app, _etag, CACHE_PUBLIC, RESTAURANT_NOT_FOUND, SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+)
+from backend.compression import etag_variants
+
+_wsgi = WsgiToAsgi(flask_app)
+
+JSON = b"application/json"
+
+
+class Request:
+    """The bits of an ASGI HTTP scope the native routes need."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.args = {
+            k: v[-1] for k, v in
+            parse_qs(scope.get("query_string", b"").decode("latin-1")).items()
+        }
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1")
+                        for k, v in scope.get("headers", [])}
+
+    def arg_int(self, name):
+        """Like flask.request.args.get(name, type=int)."""
+        try:
+            return int(self.args[name])
+        except (KeyError, ValueError):
+            return None
+
+    def has_etag(self, etag):
+        sent = self.headers.get("if-none-match", "")
+        if sent.strip() == "*":
+            return True
+        tags = {t.strip().removeprefix("W/").strip('"') for t in sent.split(",")}
+        return any(variant in tags for variant in etag_variants(etag))
+
+
+async def _send(send, status, body=b"", content_type=JSON, headers=()):
+    raw = [(b"content-length", str(len(body)).encode())]
+    if content_type:
+        raw.append((b"content-type", content_type))
+    raw += [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+    await send({"type": "http.response.start", "status": status, "headers": raw})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _json_object(raw_fields=None, **fields):
+    """Same body as app._json_with_raw."""
+    parts = [restaurant_rows.encode(k) + b":" + restaurant_rows.encode(v) for k, v in fields.items()]
+    parts += [restaurant_rows.encode(k) + b":" + raw for k, raw in (raw_fields or {}).items()]
+    return b"{" + b",".join(parts) + b"}"
+
+
+async def _error(send, status, message):
+    await _send(send, status, _json_object(error=message))
+
+
+async def _conditional(request, send, etag):
+    """Send a 304 and return True if the client already has etag."""
+    if etag and request.has_etag(etag):
+        await _send(send, 304, content_type=None, headers=_cache_headers(etag))
+        return True
+    return False
+
+
+def _cache_headers(etag):
+    return [("etag", f'"{etag}"'), ("cache-control", CACHE_PUBLIC)] if etag else []
+
+
+# ---------- native routes (mirror backend/app.py) ----------
+
+async def search_results(request, send):
+    name = request.args.get("name", "")
+    category = request.args.get("category", "")
+    query = request.args.get("q", "")
+    limit = request.arg_int("limit")
+    if query and limit is None:
+        limit = SEARCH_DEFAULT_LIMIT
+    if limit is not None:
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    ok, body = await async_database.restaurant_search(
+        [name, category], query=query, limit=limit, as_json=True)
+    if not ok:
+        return await _error(send, 400, body)
+    await _send(send, 200, _json_object({"restaurants": body}))
+
+
+async def restaurant_details(request, send, rest_id):
+    keys = [catalog.CATALOG_KEY, catalog.menu_key(rest_id)]
+    ok_v, versions = await async_database.get_cache_versions(keys)
+    etag = _etag("restaurant", rest_id, *[versions[k] for k in keys]) if ok_v else None
+    if await _conditional(request, send, etag):
+        return
+
+    ok_r, rest = await async_database.load_restaurant_by_id(rest_id, as_json=True)
+    if not ok_r:
+        return await _error(send, 404, RESTAURANT_NOT_FOUND)
+    ok_m, menu = await async_database.load_menu_for_restaurant(rest_id)
+    if not ok_m:
+        return await _send(send, 200, _json_object({"restaurant": rest}, menu=[]))
+    await _send(send, 200, _json_object({"restaurant": rest}, menu=menu),
+                headers=_cache_headers(etag))
+
+
+async def restaurant_reviews(request, send, rest_id):
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor") or None
+    if limit:
+        try:
+            limit = int(limit)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return await _error(send, 400, "limit must be a positive integer")
+        limit = min(limit, database.MAX_PAGE_SIZE)
+    else:
+        limit = None
+
+    key = catalog.reviews_key(rest_id)
+    ok_v, versions = await async_database.get_cache_versions([key])
+    etag = _etag("reviews", rest_id, versions[key], limit, cursor) if ok_v else None
+    if await _conditional(request, send, etag):
+        return
+
+    ok, reviews = await async_database.get_reviews_by_restaurant(rest_id, limit=limit, cursor=cursor)
+    if not ok:
+        return await _error(send, 400, reviews)
+    next_cursor = None
+    if limit is not None and len(reviews) >= limit:
+        next_cursor = database.encode_cursor(reviews[-1])
+    await _send(send, 200, _json_object(reviews=reviews, next_cursor=next_cursor),
+                headers=_cache_headers(etag))
+
+
+ROUTES = [
+    (re.compile(r"^/api/search$"), search_results),
+    (re.compile(r"^/api/restaurants/(?P<rest_id>[^/]+)$"), restaurant_details),
+    (re.compile(r"^/api/restaurants/(?P<rest_id>[^/]+)/reviews$"), restaurant_reviews),
+]
+
+
+def _native_route(scope):
+    if scope["type"] != "http" or scope["method"] != "GET":
+        return None, None
+    for pattern, handler in ROUTES:
+        match = pattern.match(scope["path"])
+        if match:
+            # The in-memory search index and the open-hours index live in
+            # the sync catalog cache
+            if handler is search_results and (
+                    flask_app.config["SEARCH_BACKEND"] == "memory"
+                    or b"open_" in scope.get("query_string", b"")):
+                return None, None
+            return handler, match.groupdict()
+    return None, None
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await async_database.open_pool()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_database.close_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    handler, kwargs = _native_route(scope)
+    if handler is None:
+        return await _wsgi(scope, receive, send)
+    await handler(Request(scope), send, **kwargs)
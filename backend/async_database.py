@@ -0,0 +1,127 @@
+"""
+TigerBites async data access (ASGI mode)
+- psycopg 3 AsyncConnectionPool; a worker can have many requests
+  waiting on the database without holding a thread each
+- Same return contract as database.py: [True, data] or [False, message]
+- Covers the public read paths served natively by backend/asgi.py;
+  SQL and row shaping are shared with database.py
+- Shares the per-worker connection budget with database.pool
+"""
+
+from psycopg.rows import dict_row
+from psycopg.types.string import TextLoader
+from psycopg_pool import AsyncConnectionPool
+
+from backend import catalog
+from backend import database
+from backend import restaurant_rows
+
+# The data layer's per-worker budget is split between this pool and the
+# sync one, which still serves every route forwarded to Flask
+POOL_SIZE, SYNC_POOL_SIZE = database.pool_config.async_split(database.pool.maxconn)
+database.pool.resize(SYNC_POOL_SIZE)
+
+
+async def _configure(conn):
+    # Load uuids as str, like psycopg2, so database.py's row shaping applies as is
+    conn.adapters.register_loader("uuid", TextLoader)
+    await conn.set_autocommit(True)
+
+
+pool = AsyncConnectionPool(
+    database.DATABASE_URL,
+    min_size=1,
+    max_size=POOL_SIZE,
+    timeout=database.pool_config.timeout,
+    max_lifetime=database.pool_config.recycle,
+    configure=_configure,
+    open=False,
+)
+
+
+async def open_pool():
+    await pool.open()
+
+
+async def close_pool():
+    await pool.close()
+
+
+async def get_cache_versions(keys):
+    """Async database.get_cache_versions."""
+    catalog.ensure_listener(database.DATABASE_URL)
+    versions = catalog.known_versions(keys)
+    if versions is not None:
+        return [True, versions]
+    try:
+        async with pool.connection() as conn:
+            cur = await conn.execute(
+                "SELECT key, version FROM public.cache_versions WHERE key = ANY(%s)",
+                (list(keys),),
+            )
+            found = dict(await cur.fetchall())
+            return [True, {key: found.get(key, 0) for key in keys}]
+    except Exception as ex:
+        return database._err_response(ex)
+
+
+async def restaurant_search(params, query="", limit=None, as_json=False):
+    """Async database.restaurant_search."""
+    sql, args = database._restaurant_search_query(params, query, limit)
+    try:
+        async with pool.connection() as conn:
+            cur = await conn.execute(sql, args)
+            rows = [restaurant_rows.RestaurantRow(t) for t in await cur.fetchall()]
+            if as_json:
+                return [True, restaurant_rows.encode_array(rows)]
+            return [True, [row.to_dict() for row in rows]]
+    except Exception as ex:
+        return database._err_response(ex)
+
+
+async def load_restaurant_by_id(rest_id, as_json=False):
+    """Async database.load_restaurant_by_id."""
+    try:
+        async with pool.connection() as conn:
+            cur = await conn.execute(
+                f"SELECT {restaurant_rows.COLUMNS} {restaurant_rows.FROM} WHERE r.id = %s",
+                (rest_id,),
+            )
+            t = await cur.fetchone()
+            if not t:
+                return [False, "Not found"]
+            row = restaurant_rows.RestaurantRow(t)
+            if as_json:
+                return [True, restaurant_rows.fragment(row)]
+            return [True, row.to_dict()]
+    except Exception as ex:
+        return database._err_response(ex)
+
+
+async def load_menu_for_restaurant(rest_id):
+    """Async database.load_menu_for_restaurant."""
+    try:
+        async with pool.connection() as conn:
+            cur = conn.cursor(row_factory=dict_row)
+            await cur.execute(database.MENU_SQL, (rest_id,))
+            return [True, database._menu_items_from_rows(await cur.fetchall())]
+    except Exception as ex:
+        return database._err_response(ex)
+
+
+async def get_reviews_by_restaurant(rest_id, limit=None, cursor=None):
+    """Async database.get_reviews_by_restaurant."""
+    try:
+        after_ts, after_id = database._decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        async with pool.connection() as conn:
+            cur = conn.cursor(row_factory=dict_row)
+            await cur.execute(
+                database.REVIEWS_BY_RESTAURANT_SQL,
+                (rest_id, after_ts, after_ts, after_id, limit),
+            )
+            return [True, [database._review_from_row(row) for row in await cur.fetchall()]]
+    except Exception as ex:
+        return database._err_response(ex)
@@ -6,6 +6,8 @@
 #          and Joshua Lau '26
 #-----------------------------------------------------------------------
 
+import os
+import time
 import urllib.request
 import urllib.parse
 import re
@@ -18,6 +20,9 @@ from backend import database
 
 _CAS_URL = 'https://fed.princeton.edu/cas/'
 
+# How long the user row cached in the session is trusted (seconds)
+_USER_CONTEXT_TTL = float(os.getenv('TB_USER_CONTEXT_TTL', '300'))
+
 #-----------------------------------------------------------------------
 
 @app.route('/api/profile', methods=['GET'])
@@ -25,8 +30,8 @@ def api_profile():
     if not is_authenticated():
         flask.abort(403)
     username = get_username()
-    ok, user_data = database.get_user_by_username(username)
-    if not ok:
+    user_data = get_user_context()
+    if user_data is None:
         # User not found in DB, return session data
         return flask.jsonify({
             "user": get_user_info(),
@@ -39,7 +44,7 @@ def api_profile():
             "dietary_restrictions": [],
             "admin_status": False
         })
-    # Return data from database (favorite_cuisine, allergies, and dietary_restrictions are arrays)
+    # Return data from the user context (favorite_cuisine, allergies, and dietary_restrictions are arrays)
     return flask.jsonify({
         "user": get_user_info(),
         "username": user_data.get('netid', ''),
@@ -87,6 +92,8 @@ def api_profile_update():
     if not ok:
         print(f"DEBUG: Error updating user: {user_data}")
         return flask.jsonify({"error": user_data}), 400
+
+    set_user_context(user_data)
     
     return flask.jsonify({
         "username": user_data.get('netid', ''),
@@ -217,6 +224,93 @@ def get_email():
 
 #-----------------------------------------------------------------------
 
+# The user context is the user's DB row (id, admin_status, preference
+# arrays, ...). It is loaded at most once per request and cached in the
+# session for _USER_CONTEXT_TTL seconds, so most requests need no
+# users lookup at all.
+
+def set_user_context(user_data):
+
+    context = {
+        'id': str(user_data.get('id')) if user_data.get('id') is not None else None,
+        'netid': user_data.get('netid', ''),
+        'email': user_data.get('email', ''),
+        'firstname': user_data.get('firstname', ''),
+        'fullname': user_data.get('fullname', ''),
+        'favorite_cuisine': list(user_data.get('favorite_cuisine') or []),
+        'allergies': list(user_data.get('allergies') or []),
+        'dietary_restrictions': list(user_data.get('dietary_restrictions') or []),
+        'admin_status': bool(user_data.get('admin_status')),
+        'loaded_at': time.time(),
+    }
+    flask.session['user_context'] = context
+    flask.g.user_context = context
+    return context
+
+#-----------------------------------------------------------------------
+
+def _load_user_context(username):
+
+    ok, user_data = database.get_user_by_username(username)
+    if not ok:
+        # User not in DB, insert them now
+        email = get_email()
+        firstname = get_firstname()
+        fullname = get_fullname()
+        print(f"DEBUG authenticate(): User {username} not in DB, inserting now")
+        ok, user_data = database.upsert_user(username, email, firstname, fullname)
+        if not ok:
+            return None
+    return set_user_context(user_data)
+
+#-----------------------------------------------------------------------
+
+# Return the current user's context, or None if there is no logged-in
+# user or the database could not provide one.
+
+def get_user_context():
+
+    if 'user_context' in flask.g:
+        return flask.g.user_context
+
+    username = get_username()
+    if not username:
+        return None
+
+    context = flask.session.get('user_context')
+    if (context is None
+            or context.get('netid') != username
+            or time.time() - context.get('loaded_at', 0) > _USER_CONTEXT_TTL):
+        context = _load_user_context(username)
+
+    flask.g.user_context = context
+    return context
+
+#-----------------------------------------------------------------------
+
+# Same return shape as database.get_admin_status, read from the context.
+
+def get_admin_status():
+
+    context = get_user_context()
+    if context is None:
+        return [False, "User not found"]
+    return [True, context['admin_status']]
+
+#-----------------------------------------------------------------------
+
+# Like authenticate(), but a session that is already logged in is
+# trusted as is, without loading the user context. For routes that only
+# serve the SPA shell; the API calls it makes do the full check.
+
+def require_login():
+
+    if 'user_info' in flask.session:
+        return
+    authenticate()
+
+#-----------------------------------------------------------------------
+
 # Authenticate the user. Do not return unless the user is
 # successfully authenticated.
 
@@ -225,15 +319,7 @@ def authenticate():
     # If the user_info is in the session, then the user was
     # authenticated previously. Ensure they're in the database and return.
     if 'user_info' in flask.session:
-        username = get_username()
-        ok, user_data = database.get_user_by_username(username)
-        if not ok:
-            # User not in DB, insert them now
-            email = get_email()
-            firstname = get_firstname()
-            fullname = get_fullname()
-            print(f"DEBUG authenticate(): User {username} not in DB, inserting now")
-            database.upsert_user(username, email, firstname, fullname)
+        get_user_context()
         return
 
     # If the request does not contain a login ticket, then redirect
@@ -264,6 +350,8 @@ def authenticate():
     print(f"DEBUG authenticate(): Inserting user - username: {username}, email: {email}, firstname: {firstname}, fullname: {fullname}")
     ok, result = database.upsert_user(username, email, firstname, fullname)
     print(f"DEBUG authenticate(): upsert_user result - ok: {ok}, result: {result}")
+    if ok:
+        set_user_context(result)
     
     # Redirect to home page (stripping the ticket parameter)
     flask.abort(flask.redirect(strip_ticket(flask.request.url)))
@@ -0,0 +1,268 @@
+"""
+TigerBites catalog cache
+- Keeps the restaurant list and its pre-encoded JSON bytes per process
+- Versions live in public.cache_versions; writers bump them and NOTIFY
+- A listener thread per process drops the cache when a NOTIFY arrives
+  and mirrors every key's version for ETags
+- VersionedCache keeps small per-key results (group preferences) that
+  stay valid until their cache_versions key is bumped
+"""
+
+import os
+import sys
+import time
+import uuid
+import select
+import threading
+from collections import OrderedDict
+
+import psycopg2
+
+from backend import restaurant_rows
+from data_management.db_manager import CACHE_CHANNEL
+
+CATALOG_KEY = "catalog"
+
+
+def _canonical_id(value):
+    # Canonical uuid text, so URL spellings and DB values share one key
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return value
+
+
+def reviews_key(restaurant_id):
+    return f"reviews:{_canonical_id(restaurant_id)}"
+
+
+def menu_key(restaurant_id):
+    return f"menu:{_canonical_id(restaurant_id)}"
+
+
+def group_key(group_id):
+    return f"group:{_canonical_id(group_id)}"
+
+
+# Safety net if a NOTIFY is ever missed (or the listener is disabled)
+MAX_AGE = float(os.getenv("TB_CATALOG_MAX_AGE", "300"))
+LISTEN_ENABLED = os.getenv("TB_CATALOG_LISTEN", "1") != "0"
+
+
+class CatalogEntry:
+    """
+    One loaded snapshot of the restaurants table.
+    Structures derived from it (search index, ...) are built on first use
+    and dropped together with the snapshot.
+    """
+
+    __slots__ = ("version", "loaded_at", "restaurants", "fragments",
+                 "json_bytes", "_derived", "_derived_lock")
+
+    def __init__(self, version, rows):
+        """rows: restaurant_rows.RestaurantRow list."""
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.restaurants = [row.to_dict() for row in rows]
+        # id -> JSON bytes, so subsets of the catalog can be sent without re-encoding
+        self.fragments = {row.id: restaurant_rows.fragment(row) for row in rows}
+        self.json_bytes = b"[" + b",".join(self.fragments[row.id] for row in rows) + b"]"
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def derived(self, key, builder):
+        """Return the structure stored under key, building it once with builder()."""
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = builder()
+                    self._derived[key] = value
+        return value
+
+
+class CatalogCache:
+    """Thread-safe holder for the current CatalogEntry."""
+
+    def __init__(self, max_age=MAX_AGE):
+        self._lock = threading.Lock()
+        self._entry = None
+        self._generation = 0
+        self.max_age = max_age
+
+    def get(self, loader):
+        """
+        Return the cached entry, calling loader() -> (version, rows)
+        when it is missing or too old.
+        """
+        entry = self._entry
+        if entry is not None and time.monotonic() - entry.loaded_at < self.max_age:
+            return entry
+
+        generation = self._generation
+        version, rows = loader()
+        entry = CatalogEntry(version, rows)
+        with self._lock:
+            # Do not store a snapshot that was invalidated while loading
+            if generation == self._generation:
+                self._entry = entry
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+cache = CatalogCache()
+
+
+class VersionedCache:
+    """Bounded LRU of values, each valid for one version of its key."""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # key -> (version, value)
+
+    def get(self, key, version):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != version:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._items[key] = (version, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+group_preferences = VersionedCache(int(os.getenv("TB_GROUP_CACHE_SIZE", "1024")))
+
+
+# ---------- LISTEN/NOTIFY ----------
+
+class _Listener(threading.Thread):
+    """Dedicated connection that LISTENs for cache version bumps."""
+
+    def __init__(self, dsn):
+        super().__init__(name="tb-catalog-listener", daemon=True)
+        self.dsn = dsn
+        self.pid = os.getpid()
+        self.connected = False
+
+    def run(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as c:
+                    c.execute(f"LISTEN {CACHE_CHANNEL}")
+                    # Read after LISTEN so no bump falls in between
+                    c.execute("SELECT key, version FROM public.cache_versions")
+                    _reset_versions(c.fetchall())
+                self.connected = True
+                backoff = 1
+                # Anything could have changed while we were not listening
+                cache.invalidate()
+
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        _handle_notify(conn.notifies.pop(0).payload)
+            except Exception as ex:
+                print(f"{sys.argv[0]}: catalog listener: {ex}", file=sys.stderr)
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+# key -> version, as last seen by the listener
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def _reset_versions(rows):
+    with _versions_lock:
+        _versions.clear()
+        _versions.update((key, version) for key, version in rows)
+
+
+def _handle_notify(payload):
+    """Payload is '<key>:<version>' as sent by db_manager.bump_cache_version."""
+    key, _, version = (payload or "").rpartition(":")
+    if key == CATALOG_KEY:
+        cache.invalidate()
+    # Record the version after invalidating, so a reader never pairs the
+    # new version with the old snapshot
+    try:
+        version = int(version)
+    except ValueError:
+        return
+    note_versions({key: version})
+
+
+def note_versions(versions):
+    """
+    Record {key: version} bumps; writers call this right after their
+    commit so this process's ETags move on before the NOTIFY comes back.
+    """
+    with _versions_lock:
+        for key, version in versions.items():
+            if version > _versions.get(key, 0):
+                _versions[key] = version
+
+
+def known_versions(keys):
+    """
+    {key: version} from the listener's mirror (0 for never-bumped keys),
+    or None when the listener is not connected and the mirror may be stale.
+    """
+    listener = _listener
+    if listener is None or listener.pid != os.getpid() or not listener.connected:
+        return None
+    with _versions_lock:
+        return {key: _versions.get(key, 0) for key in keys}
+
+
+def ensure_listener(dsn):
+    """Start the listener thread once per process (and again after a fork)."""
+    global _listener
+    if not LISTEN_ENABLED:
+        return
+    listener = _listener
+    if listener is not None and listener.pid == os.getpid() and listener.is_alive():
+        return
+    with _listener_lock:
+        listener = _listener
+        if listener is not None and listener.pid == os.getpid() and listener.is_alive():
+            return
+        _listener = _Listener(dsn)
+        _listener.start()
@@ -0,0 +1,135 @@
+"""
+TigerBites response compression
+- Opt-in (COMPRESS_ENABLED / TB_COMPRESS=1) gzip or brotli for text bodies
+- Negotiated from Accept-Encoding; brotli only if the module is installed
+- Bodies under COMPRESS_MIN_SIZE are sent as is
+- Per-route overrides with the @compress(...) decorator
+- Responses with a strong ETag (catalog-backed payloads) have their
+  compressed bytes cached per (ETag, encoding)
+"""
+
+import os
+import gzip
+import threading
+from collections import OrderedDict
+
+import flask
+
+from backend.top import app
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+app.config.setdefault('COMPRESS_ENABLED', os.getenv('TB_COMPRESS', '0') == '1')
+app.config.setdefault('COMPRESS_MIN_SIZE', int(os.getenv('TB_COMPRESS_MIN_SIZE', '1024')))
+app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+app.config.setdefault('COMPRESS_BROTLI_QUALITY', 5)
+app.config.setdefault('COMPRESS_CACHE_SIZE', 64)
+app.config.setdefault('COMPRESS_MIMETYPES', {
+    'application/json', 'text/html', 'text/plain', 'text/css',
+    'text/javascript', 'application/javascript', 'image/svg+xml',
+})
+
+# ETag suffix per encoding, so each representation has its own strong ETag
+_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+_cache = OrderedDict()  # (etag, encoding) -> bytes
+_cache_lock = threading.Lock()
+
+
+def compress(enabled=True, min_size=None):
+    """Per-route override, e.g. @compress(min_size=256) or @compress(False)."""
+    def decorator(view):
+        view.compress_options = {'enabled': enabled, 'min_size': min_size}
+        return view
+    return decorator
+
+
+def etag_variants(etag):
+    """The plain ETag and every representation ETag derived from it."""
+    return [etag] + [etag + suffix for suffix in _SUFFIXES.values()]
+
+
+def matching_etag(if_none_match, etag):
+    """The variant of etag the client sent in If-None-Match, or None."""
+    for variant in etag_variants(etag):
+        if if_none_match.contains_weak(variant):
+            return variant
+    return None
+
+
+def _choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def _encode(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=app.config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def _cached_encode(etag, data, encoding):
+    key = (etag, encoding)
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+            return body
+    body = _encode(data, encoding)
+    with _cache_lock:
+        _cache[key] = body
+        while len(_cache) > app.config['COMPRESS_CACHE_SIZE']:
+            _cache.popitem(last=False)
+    return body
+
+
+def _route_options():
+    view = app.view_functions.get(flask.request.endpoint)
+    return getattr(view, 'compress_options', None) or {}
+
+
+@app.after_request
+def _compress_response(response):
+    options = _route_options()
+    if not options.get('enabled', app.config['COMPRESS_ENABLED']):
+        return response
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding(flask.request.accept_encodings)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    min_size = options.get('min_size')
+    if len(data) < (app.config['COMPRESS_MIN_SIZE'] if min_size is None else min_size):
+        return response
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        body = _cached_encode(etag, data, encoding)
+        etag = etag + _SUFFIXES[encoding]
+        response.set_etag(etag)
+        if flask.request.if_none_match.contains_weak(etag):
+            # The client already has this representation
+            response.status_code = 304
+            response.set_data(b'')
+            response.headers.pop('Content-Length', None)
+            return response
+    else:
+        body = _encode(data, encoding)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
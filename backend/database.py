@@ -1,11 +1,31 @@
 import sys
 import os
+import time
+import base64
+import threading
+import contextvars
+import uuid
+import weakref
+from datetime import datetime
 from pathlib import Path
 import csv
 from dotenv import load_dotenv
 import psycopg2
 import psycopg2.extras
-from psycopg2.pool import SimpleConnectionPool
+from backend import catalog
+from backend import geo
+from backend import metrics
+from backend import open_hours
+from backend import prepared
+from backend import recommend
+from backend import restaurant_rows
+from backend import search_index
+from backend.db_pool import BlockingConnectionPool, PoolConfig
+from data_management.db_manager import (
+    apply_menu_changes, bump_cache_versions,
+    refresh_search_documents,
+)
+from data_management.hours import parse_hours
 
 load_dotenv()
 
@@ -17,12 +37,35 @@ if not DATABASE_URL:
         "Set it to a valid Postgres URL."
     )
 
-# Small connection pool
-pool = SimpleConnectionPool(
-    minconn=1,
-    maxconn=2,  
-    dsn=DATABASE_URL
+# Per-process connection pool, sized from TB_DB_POOL_* env vars.
+# The session store and the catalog listener take their share first.
+pool_config = PoolConfig()
+pool = BlockingConnectionPool(
+    DATABASE_URL,
+    maxconn=pool_config.data_size(reserved=1 if catalog.LISTEN_ENABLED else 0),
+    timeout=pool_config.timeout,
+    recycle=pool_config.recycle,
+    idle_check=pool_config.idle_check,
+    connection_factory=metrics.TimedConnection,
 )
+metrics.register_pool("data", pool.stats)
+
+# Optional read replica. Read-only calls go there unless the caller's
+# session wrote within REPLICA_STICKY_SECONDS (read-your-writes), or the
+# replica has not replayed the cache_versions bump a versioned read needs.
+REPLICA_URL = os.getenv("TB_DATABASE_REPLICA_URL") or None
+REPLICA_STICKY_SECONDS = float(os.getenv("TB_REPLICA_STICKY_SECONDS", "5"))
+replica_pool = None
+if REPLICA_URL:
+    replica_pool = BlockingConnectionPool(
+        REPLICA_URL,
+        maxconn=pool_config.replica_size(),
+        timeout=pool_config.timeout,
+        recycle=pool_config.recycle,
+        idle_check=pool_config.idle_check,
+        connection_factory=metrics.TimedConnection,
+    )
+    metrics.register_pool("replica", replica_pool.stats)
 
 # Paths for menu CSVs
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -35,15 +78,132 @@ def _err_response(ex):
     return [False, "A server error occurred. Please contact the system administrator."]
 
 
-def _get_conn():
-    return pool.getconn()
+def _get_conn(readonly=False, version_keys=()):
+    """
+    Check out a primary connection, or with readonly=True a replica one
+    when a replica is configured and the current session is not sticky.
+    version_keys: cache_versions keys the caller's result is cached or
+    ETagged under; the replica is skipped until it has replayed their
+    latest bump.
+    """
+    if readonly and replica_pool is not None and not _reads_pinned_to_primary():
+        conn = _checkout(replica_pool)
+        if not version_keys or _replica_caught_up(conn, version_keys):
+            return conn
+        _put_conn(conn)
+    return _checkout(pool)
+
+
+def _checkout(from_pool):
+    start = time.perf_counter()
+    conn = from_pool.getconn()
+    metrics.record_pool_wait(time.perf_counter() - start)
+    return conn
 
 
 def _put_conn(conn):
-    if conn is not None:
+    if conn is None:
+        return
+    with _pending_lock:
+        # Bumps that were never committed
+        _pending_versions.pop(conn, None)
+    if replica_pool is not None and replica_pool.owns(conn):
+        replica_pool.putconn(conn)
+    else:
         pool.putconn(conn)
 
 
+def _replica_caught_up(conn, keys):
+    """Whether the replica has every key at the version the listener last saw."""
+    expected = catalog.known_versions(keys)
+    if expected is None:
+        # Listener not connected: no way to tell how far behind it is
+        return False
+    try:
+        with conn.cursor() as c:
+            c.execute(
+                "SELECT key, version FROM public.cache_versions WHERE key = ANY(%s)",
+                (list(keys),),
+            )
+            found = dict(c.fetchall())
+        conn.rollback()
+    except psycopg2.Error:
+        return False
+    return all(found.get(key, 0) >= version for key, version in expected.items())
+
+
+def pool_stats():
+    """Checkout-wait and in-use numbers for the data-layer pool."""
+    return pool.stats()
+
+
+# ---------- read-your-writes ----------
+
+class _Routing:
+    """Per-request replica routing state."""
+
+    __slots__ = ("primary_until", "wrote")
+
+    def __init__(self, primary_until):
+        self.primary_until = primary_until
+        self.wrote = False
+
+
+_routing = contextvars.ContextVar("tb_db_routing", default=None)
+
+# connection -> {key: version} bumped in its open transaction
+_pending_versions = weakref.WeakKeyDictionary()
+_pending_lock = threading.Lock()
+
+
+def _bump(c, *keys):
+    """Bump cache_versions keys in c's transaction; _commit publishes them."""
+    versions = bump_cache_versions(c, keys)
+    with _pending_lock:
+        _pending_versions.setdefault(c.connection, {}).update(versions)
+
+
+def begin_request(primary_until=0.0):
+    """
+    Start routing for a request. primary_until is the wall-clock time
+    (from the caller's session) until which its reads stay on the primary.
+    """
+    _routing.set(_Routing(primary_until or 0.0))
+
+
+def end_request():
+    """
+    Stop routing for the request; returns the new primary_until to store
+    in its session if it committed a write, else None.
+    """
+    state = _routing.get()
+    _routing.set(None)
+    if state is None or not state.wrote or replica_pool is None:
+        return None
+    return state.primary_until
+
+
+def _reads_pinned_to_primary():
+    state = _routing.get()
+    return state is not None and time.time() < state.primary_until
+
+
+def _commit(conn):
+    """
+    Commit, publish the cache versions it bumped to this process, and
+    keep the current session's reads on the primary for a while.
+    """
+    conn.commit()
+    with _pending_lock:
+        versions = _pending_versions.pop(conn, None)
+    if versions:
+        catalog.note_versions(versions)
+    state = _routing.get()
+    if state is not None:
+        state.wrote = True
+        state.primary_until = time.time() + REPLICA_STICKY_SECONDS
+
+
 def _canonical_name(value: str) -> str:
     """Lowercase for matching."""
     if not value:
@@ -52,205 +212,483 @@ def _canonical_name(value: str) -> str:
     return "".join(ch for ch in value if ch.isalnum())
 
 
+# In-process index of CSV menu orders, keyed by canonical restaurant name.
+# Only consulted for menu rows that have no persisted menu_position.
+_menu_order_lock = threading.Lock()
+_menu_order_dir_mtime = None
+_menu_order_files = {}
+_menu_order_cache = {}
+
+
+def reload_menu_order_index():
+    """Drop the cached CSV menu orders so the next lookup rescans the folder."""
+    global _menu_order_dir_mtime
+    with _menu_order_lock:
+        _menu_order_dir_mtime = None
+        _menu_order_files.clear()
+        _menu_order_cache.clear()
+
+
+def _scan_menu_order_files():
+    """Map canonical restaurant name to its menu CSV path."""
+    files = {}
+    for path in MENU_DATA_DIR.iterdir():
+        if not path.is_file():
+            continue
+        if path.suffix.lower() != ".csv":
+            continue
+        if "__MACOSX" in str(path):
+            continue
+
+        # Filenames look like "Thai Village - thai_village_menu.csv"
+        prefix = path.name.split(" - ", 1)[0]
+        files.setdefault(_canonical_name(prefix), path)
+    return files
+
+
+def _read_menu_order(csv_path):
+    """Build name to index mapping from one menu CSV."""
+    order = {}
+    idx = 0
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            name = (row.get("Item") or "").strip()
+            if not name:
+                continue
+            if name not in order:
+                order[name] = idx
+                idx += 1
+    return order
+
+
 def _load_menu_order_for_restaurant(restaurant_name: str):
     """
-    Build name to index mapping from that restaurant's CSV.
+    Return the name to index mapping for that restaurant's CSV.
+    The folder is scanned once and each CSV parsed once; both are
+    re-read only when their mtime changes.
     If anything fails, return None so we fall back to DB order.
     """
+    global _menu_order_dir_mtime
     try:
         if not restaurant_name or not MENU_DATA_DIR.exists():
             return None
 
         target_key = _canonical_name(restaurant_name)
-        csv_path = None
+        with _menu_order_lock:
+            dir_mtime = MENU_DATA_DIR.stat().st_mtime
+            if dir_mtime != _menu_order_dir_mtime:
+                _menu_order_files.clear()
+                _menu_order_files.update(_scan_menu_order_files())
+                _menu_order_cache.clear()
+                _menu_order_dir_mtime = dir_mtime
+
+            csv_path = _menu_order_files.get(target_key)
+            if csv_path is None:
+                return None
+
+            mtime = csv_path.stat().st_mtime
+            cached = _menu_order_cache.get(target_key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            order = _read_menu_order(csv_path) or None
+            _menu_order_cache[target_key] = (mtime, order)
+            return order
+    except Exception:
+        # Any problem: just let DB order stand
+        return None
 
-        # Find CSV whose filename prefix matches restaurant name
-        for path in MENU_DATA_DIR.iterdir():
-            if not path.is_file():
-                continue
-            if path.suffix.lower() != ".csv":
-                continue
-            if "__MACOSX" in str(path):
-                continue
 
-            # Filenames look like "Thai Village - thai_village_menu.csv"
-            prefix = path.name.split(" - ", 1)[0]
-            if _canonical_name(prefix) == target_key:
-                csv_path = path
-                break
+def _load_catalog():
+    """Read the restaurants table and its catalog version for the cache."""
+    conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
+    try:
+        with conn.cursor() as c:
+            c.execute(
+                "SELECT version FROM public.cache_versions WHERE key = %s",
+                (catalog.CATALOG_KEY,),
+            )
+            v_row = c.fetchone()
+            c.execute(f"SELECT {restaurant_rows.COLUMNS} {restaurant_rows.FROM}")
+            rows = [restaurant_rows.RestaurantRow(t) for t in c.fetchall()]
+            return (v_row[0] if v_row else 0), rows
+    finally:
+        _put_conn(conn)
+
+
+def _catalog_entry():
+    catalog.ensure_listener(DATABASE_URL)
+    return catalog.cache.get(_load_catalog)
+
+
+def load_catalog_version():
+    """Version of the cached catalog (the ETag source for catalog payloads)."""
+    try:
+        return [True, _catalog_entry().version]
+    except Exception as ex:
+        return _err_response(ex)
 
-        if csv_path is None:
-            return None
 
-        order = {}
-        idx = 0
-        with csv_path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                name = (row.get("Item") or "").strip()
-                if not name:
-                    continue
-                if name not in order:
-                    order[name] = idx
-                    idx += 1
-
-        return order or None
-    except Exception:
-        # Any problem: just let DB order stand
-        return None
+def get_cache_versions(keys):
+    """
+    Return {key: version} for cache_versions keys, from the NOTIFY mirror
+    when the listener is connected and from the table otherwise.
+    """
+    catalog.ensure_listener(DATABASE_URL)
+    versions = catalog.known_versions(keys)
+    if versions is not None:
+        return [True, versions]
+    try:
+        conn = _get_conn()
+        try:
+            with conn.cursor() as c:
+                c.execute(
+                    "SELECT key, version FROM public.cache_versions WHERE key = ANY(%s)",
+                    (list(keys),),
+                )
+                found = dict(c.fetchall())
+                return [True, {key: found.get(key, 0) for key in keys}]
+        finally:
+            _put_conn(conn)
+    except Exception as ex:
+        return _err_response(ex)
 
 
 def load_all_restaurants():
-    """Return all restaurants."""
+    """
+    Return all restaurants from the process-wide catalog cache.
+    The list is shared between requests; treat it as read-only.
+    """
     try:
-        conn = _get_conn()
+        return [True, _catalog_entry().restaurants]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def load_all_restaurants_json(open_at=None):
+    """
+    Return all restaurants as pre-encoded JSON bytes; with open_at
+    (a minute of the week), only those open at that minute.
+    """
+    try:
+        entry = _catalog_entry()
+        if open_at is None:
+            return [True, entry.json_bytes]
+        positions = _open_index(entry).open_positions(open_at)
+        return [True, b"[" + b",".join(
+            entry.fragments[entry.restaurants[i]["id"]] for i in positions) + b"]"]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def _load_open_intervals():
+    """{id: open_intervals} for the open-hours index."""
+    conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
+    try:
+        with conn.cursor() as c:
+            c.execute("SELECT id, open_intervals FROM restaurants")
+            return dict(c.fetchall())
+    finally:
+        _put_conn(conn)
+
+
+def _open_index(entry):
+    def build():
+        intervals = _load_open_intervals()
+        return open_hours.OpenIndex([intervals.get(r["id"]) for r in entry.restaurants])
+    return entry.derived(open_hours.INDEX_KEY, build)
+
+
+def open_restaurant_ids(open_at):
+    """[True, ids of catalog restaurants open at open_at (a minute of the week)]."""
+    try:
+        entry = _catalog_entry()
+        positions = _open_index(entry).open_positions(open_at)
+        return [True, [entry.restaurants[i]["id"] for i in positions]]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def _like_escape(value):
+    """Escape ILIKE wildcards so user input matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _restaurant_search_query(params, query, limit, only_ids=None):
+    """(sql, args) for restaurant_search; shared with async_database."""
+    name = params[0] if len(params) > 0 else ""
+    category = params[1] if len(params) > 1 else ""
+    query = (query or "").strip()
+    if query:
+        sql = f"""
+            SELECT {restaurant_rows.COLUMNS},
+                   ts_rank_cd(r.search_tsv, q.tsq)
+                     + word_similarity(%(query)s, r.search_text) AS rank
+            {restaurant_rows.FROM}
+            CROSS JOIN (SELECT websearch_to_tsquery('english', %(query)s) AS tsq) q
+            WHERE r.name ILIKE %(name)s AND r.category ILIKE %(category)s
+              AND (%(only_ids)s::uuid[] IS NULL OR r.id = ANY(%(only_ids)s::uuid[]))
+              AND (r.search_tsv @@ q.tsq OR %(query)s <%% r.search_text)
+            ORDER BY rank DESC, lower(r.name) COLLATE "C", r.id
+            LIMIT %(limit)s
+        """
+    else:
+        sql = f"""
+            SELECT {restaurant_rows.COLUMNS}
+            {restaurant_rows.FROM}
+            WHERE r.name ILIKE %(name)s AND r.category ILIKE %(category)s
+              AND (%(only_ids)s::uuid[] IS NULL OR r.id = ANY(%(only_ids)s::uuid[]))
+            ORDER BY lower(r.name) COLLATE "C", r.id
+            LIMIT %(limit)s
+        """
+    return sql, {
+        "name": f"%{_like_escape(name)}%",
+        "category": f"%{_like_escape(category)}%",
+        "query": query,
+        "limit": limit,
+        "only_ids": list(only_ids) if only_ids is not None else None,
+    }
+
+
+def restaurant_search(params, query="", limit=None, as_json=False, only_ids=None):
+    """
+    Search restaurants.
+    params: [name, category] substring filters (trigram-indexed ILIKE).
+    query: optional free text matched against name, category, description
+    and menu items, with trigram typo tolerance; results are ranked.
+    as_json: return one pre-encoded JSON array instead of dicts.
+    only_ids: optional restaurant ids to restrict to (e.g. open_restaurant_ids).
+    """
+    sql, args = _restaurant_search_query(params, query, limit, only_ids)
+    try:
+        conn = _get_conn(readonly=True)
         try:
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                c.execute("SELECT * FROM restaurants")
-                rows = c.fetchall()
-                out = []
-                for row in rows:
-                    out.append({
-                        "id": row.get("id"),
-                        "created_at": row.get("created_at").isoformat(),
-                        "name": row.get("name"),
-                        "description": row.get("description"),
-                        "location": row.get("location"),
-                        "category": row.get("category"),
-                        "hours": row.get("hours"),
-                        "avg_price": float(row.get("avg_price")) if row.get("avg_price") is not None else None,
-                        "latitude": row.get("latitude"),
-                        "longitude": row.get("longitude"),
-                        "picture": row.get("picture"),
-                        "yelp_rating": float(row.get("yelp_rating")) if row.get("yelp_rating") is not None else None,
-                        "website_url": row.get("website_url"),
-                    })
-                return [True, out]
+            with conn.cursor() as c:
+                c.execute(sql, args)
+                rows = [restaurant_rows.RestaurantRow(t) for t in c.fetchall()]
+                if as_json:
+                    return [True, restaurant_rows.encode_array(rows)]
+                return [True, [row.to_dict() for row in rows]]
         finally:
             _put_conn(conn)
     except Exception as ex:
         return _err_response(ex)
 
 
-def restaurant_search(params):
-    """Search restaurants by name and category substring."""
+def _load_menu_documents():
+    """(restaurant_id, name, description) for every menu item, for the search index."""
+    conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
+    try:
+        with conn.cursor() as c:
+            c.execute("SELECT restaurant_id, name, description FROM menu_items")
+            return c.fetchall()
+    finally:
+        _put_conn(conn)
+
+
+def restaurant_search_in_memory(params, query="", limit=None, as_json=False, only_ids=None):
+    """
+    Same contract as restaurant_search. name/category filters are answered
+    from an index built over the cached catalog (rebuilt whenever the
+    catalog is invalidated); free text goes to restaurant_search so its
+    matches and ranking do not depend on the backend.
+    """
+    if (query or "").strip():
+        return restaurant_search(params, query, limit, as_json, only_ids)
     name = params[0] if len(params) > 0 else ""
     category = params[1] if len(params) > 1 else ""
+    try:
+        entry = _catalog_entry()
+        index = entry.derived(
+            search_index.INDEX_KEY,
+            lambda: search_index.SearchIndex(entry.restaurants),
+        )
+        results = index.search(name, category, limit, only_ids)
+        if as_json:
+            return [True, b"[" + b",".join(entry.fragments[r["id"]] for r in results) + b"]"]
+        return [True, results]
+    except Exception as ex:
+        return _err_response(ex)
+
 
+def restaurants_in_view(bbox=None, center=None, radius_m=None):
+    """
+    [(restaurant dict, JSON bytes)] inside bbox (west, south, east, north)
+    and within radius_m of center (lat, lng). The bbox is answered by the
+    GiST index on point(longitude, latitude); the radius is checked here.
+    """
+    if center is not None and radius_m is not None:
+        bbox = geo.intersect(bbox, geo.radius_bbox(center[0], center[1], radius_m))
+    if bbox == ():
+        return [True, []]
     try:
-        conn = _get_conn()
+        conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
         try:
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
-                sql = (
-                    "SELECT * "
-                    "FROM restaurants "
-                    "WHERE name ILIKE %s AND category ILIKE %s "
-                    "ORDER BY name ASC"
+            with conn.cursor() as c:
+                sql = f"SELECT {restaurant_rows.COLUMNS} {restaurant_rows.FROM}"
+                args = ()
+                if bbox is not None:
+                    sql += """
+                    WHERE point(r.longitude, r.latitude)
+                          <@ box(point(%s, %s), point(%s, %s))
+                    """
+                    args = bbox
+                c.execute(sql, args)
+                rows = [restaurant_rows.RestaurantRow(t) for t in c.fetchall()]
+        finally:
+            _put_conn(conn)
+        if center is not None and radius_m is not None:
+            rows = [
+                row for row in rows
+                if row.latitude is not None and row.longitude is not None
+                and geo.haversine_m(center[0], center[1], row.latitude, row.longitude) <= radius_m
+            ]
+        return [True, [(row.to_dict(), restaurant_rows.fragment(row)) for row in rows]]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def restaurants_in_view_in_memory(bbox=None, center=None, radius_m=None):
+    """Same as restaurants_in_view, from the cached catalog's grid index."""
+    try:
+        entry = _catalog_entry()
+        index = entry.derived(geo.INDEX_KEY, lambda: geo.GeoIndex(entry.restaurants))
+        return [True, [
+            (entry.restaurants[i], entry.fragments[entry.restaurants[i]["id"]])
+            for i in index.query(bbox, center, radius_m)
+        ]]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def get_user_ratings(user_id):
+    """(restaurant_id, rating) for every review the user wrote."""
+    try:
+        conn = _get_conn(readonly=True)
+        try:
+            with conn.cursor() as c:
+                c.execute(
+                    "SELECT restaurant_id, rating FROM public.reviews WHERE user_id = %s",
+                    (user_id,),
                 )
-                c.execute(sql, (f"%{name}%", f"%{category}%"))
-                rows = c.fetchall()
-                out = []
-                for row in rows:
-                    out.append({
-                        "id": row.get("id"),
-                        "created_at": row.get("created_at").isoformat(),
-                        "name": row.get("name"),
-                        "description": row.get("description"),
-                        "location": row.get("location"),
-                        "category": row.get("category"),
-                        "hours": row.get("hours"),
-                        "avg_price": float(row.get("avg_price")) if row.get("avg_price") is not None else None,
-                        "latitude": row.get("latitude"),
-                        "longitude": row.get("longitude"),
-                        "picture": row.get("picture"),
-                        "yelp_rating": float(row.get("yelp_rating")) if row.get("yelp_rating") is not None else None,
-                        "website_url": row.get("website_url"),
-                    })
-                return [True, out]
+                return [True, c.fetchall()]
         finally:
             _put_conn(conn)
     except Exception as ex:
         return _err_response(ex)
 
 
-def load_restaurant_by_id(rest_id):
-    """Return one restaurant by id."""
+def recommend_restaurants(profile, ratings=(), limit=None, as_json=False):
+    """
+    Catalog restaurants ranked for one user (best first, at most limit).
+    profile: user context dict (favorite_cuisine, dietary_restrictions,
+    allergies); ratings: get_user_ratings rows.
+    """
     try:
-        conn = _get_conn()
+        entry = _catalog_entry()
+        model = entry.derived(
+            recommend.MODEL_KEY,
+            lambda: recommend.RecommendModel(entry.restaurants, _load_menu_documents()),
+        )
+        weights = model.user_vector(
+            favorite_cuisines=profile.get("favorite_cuisine"),
+            dietary_restrictions=profile.get("dietary_restrictions"),
+            allergies=profile.get("allergies"),
+            ratings=ratings,
+        )
+        order = model.rank(weights, limit)
+        if as_json:
+            return [True, b"[" + b",".join(entry.fragments[model.ids[i]] for i in order) + b"]"]
+        return [True, [entry.restaurants[i] for i in order]]
+    except Exception as ex:
+        return _err_response(ex)
+
+
+RESTAURANT_BY_ID = prepared.register(
+    "tb_restaurant_by_id",
+    f"SELECT {restaurant_rows.COLUMNS} {restaurant_rows.FROM} WHERE r.id = %s",
+)
+
+
+def load_restaurant_by_id(rest_id, as_json=False):
+    """Return one restaurant by id (pre-encoded JSON bytes with as_json)."""
+    try:
+        conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
         try:
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                c.execute("SELECT * FROM restaurants WHERE id = %s", (rest_id,))
-                row = c.fetchone()
-                if not row:
+            with conn.cursor() as c:
+                prepared.execute(c, RESTAURANT_BY_ID, (rest_id,))
+                t = c.fetchone()
+                if not t:
                     return [False, "Not found"]
-
-                data = {
-                    "id": row.get("id"),
-                    "created_at": row.get("created_at").isoformat(),
-                    "name": row.get("name"),
-                    "description": row.get("description"),
-                    "location": row.get("location"),
-                    "category": row.get("category"),
-                    "hours": row.get("hours"),
-                    "avg_price": float(row.get("avg_price")) if row.get("avg_price") is not None else None,
-                    "latitude": row.get("latitude"),
-                    "longitude": row.get("longitude"),
-                    "picture": row.get("picture"),
-                    "yelp_rating": float(row.get("yelp_rating")) if row.get("yelp_rating") is not None else None,
-                    "website_url": row.get("website_url"),
-                }
-                return [True, data]
+                row = restaurant_rows.RestaurantRow(t)
+                if as_json:
+                    return [True, restaurant_rows.fragment(row)]
+                return [True, row.to_dict()]
         finally:
             _put_conn(conn)
     except Exception as ex:
         return _err_response(ex)
 
 
+MENU_SQL = """
+    SELECT
+        m.id,
+        m.restaurant_id,
+        m.name,
+        m.description,
+        m.avg_price,
+        m.menu_position,
+        r.name AS restaurant_name
+    FROM menu_items m
+    JOIN restaurants r ON m.restaurant_id = r.id
+    WHERE m.restaurant_id = %s
+    ORDER BY m.menu_position ASC NULLS LAST
+"""
+MENU_STATEMENT = prepared.register("tb_menu_by_restaurant", MENU_SQL)
+
+
+def _menu_items_from_rows(rows):
+    """Shape MENU_SQL rows (any mapping rows) into the API's menu item dicts."""
+    items = []
+    restaurant_name = None
+    unpositioned = False
+    for row in rows:
+        if restaurant_name is None:
+            restaurant_name = row.get("restaurant_name")
+        if row.get("menu_position") is None:
+            unpositioned = True
+        items.append({
+            "id": str(row.get("id")) if row.get("id") is not None else None,
+            "restaurant_id": str(row.get("restaurant_id")) if row.get("restaurant_id") is not None else None,
+            "name": row.get("name"),
+            "description": row.get("description"),
+            "price": float(row.get("avg_price")) if row.get("avg_price") is not None else None,
+        })
+
+    # Rows loaded before menu_position existed: apply CSV order
+    order_map = None
+    if unpositioned:
+        order_map = _load_menu_order_for_restaurant(restaurant_name)
+    if order_map:
+        default_index = len(order_map)
+        items.sort(key=lambda item: order_map.get(item.get("name"), default_index))
+    return items
+
+
 def load_menu_for_restaurant(rest_id):
     """
     Return menu items for a restaurant.
     Each item: id, restaurant_id, name, description, price.
-    Order tries to match the CSV for that restaurant.
+    Order follows menu_position written by the CSV loader; rows without
+    a position fall back to the cached CSV order.
     """
     try:
-        conn = _get_conn()
+        conn = _get_conn(readonly=True, version_keys=(catalog.menu_key(rest_id),))
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                sql = """
-                    SELECT
-                        m.id,
-                        m.restaurant_id,
-                        m.name,
-                        m.description,
-                        m.avg_price,
-                        r.name AS restaurant_name
-                    FROM menu_items m
-                    JOIN restaurants r ON m.restaurant_id = r.id
-                    WHERE m.restaurant_id = %s
-                """
-                c.execute(sql, (rest_id,))
-                rows = c.fetchall()
-
-                items = []
-                restaurant_name = None
-                for row in rows:
-                    if restaurant_name is None:
-                        restaurant_name = row.get("restaurant_name")
-                    items.append({
-                        "id": str(row.get("id")) if row.get("id") is not None else None,
-                        "restaurant_id": str(row.get("restaurant_id")) if row.get("restaurant_id") is not None else None,
-                        "name": row.get("name"),
-                        "description": row.get("description"),
-                        "price": float(row.get("avg_price")) if row.get("avg_price") is not None else None,
-                    })
-
-                # Try to apply CSV order
-                order_map = _load_menu_order_for_restaurant(restaurant_name)
-                if order_map:
-                    default_index = len(order_map)
-                    items.sort(key=lambda item: order_map.get(item.get("name"), default_index))
-
-                return [True, items]
+                prepared.execute(c, MENU_STATEMENT, (rest_id,))
+                return [True, _menu_items_from_rows(c.fetchall())]
         finally:
             _put_conn(conn)
     except Exception as ex:
@@ -275,7 +713,8 @@ def update_restaurant(restaurant):
                     longitude = %s,
                     name = %s,
                     picture = %s,
-                    yelp_rating = %s
+                    yelp_rating = %s,
+                    open_intervals = %s
                 WHERE id = %s
                 RETURNING *;
                 """
@@ -290,11 +729,16 @@ def update_restaurant(restaurant):
                     restaurant.get("name"),
                     restaurant.get("picture"),
                     restaurant.get("yelp_rating"),
+                    parse_hours(restaurant.get("hours")),
                     restaurant.get("id"),
                 )
                 c.execute(sql, values)
                 updated = c.fetchone()
-                conn.commit()
+                if updated:
+                    refresh_search_documents(c, [updated["id"]])
+                _bump(c, catalog.CATALOG_KEY)
+                _commit(conn)
+                catalog.cache.invalidate()
                 return [True, dict(updated)]
         finally:
             _put_conn(conn)
@@ -304,36 +748,31 @@ def update_restaurant(restaurant):
 
 def update_menu_items(restaurant_id, items):
     """
-    Update menu items for a restaurant.
-    items: list of dicts {id, name, description, price}.
+    Update, insert and delete menu items for a restaurant in one statement.
+    items: list of dicts {op, id, name, description, price, menu_position};
+    op defaults to 'update' when id is given and 'insert' otherwise.
+    Returns per-item results from db_manager.apply_menu_changes.
     """
+    changes = []
+    for item in items or []:
+        changes.append({
+            "op": item.get("op") or ("update" if item.get("id") else "insert"),
+            "id": item.get("id"),
+            "name": item.get("name"),
+            "description": item.get("description"),
+            "avg_price": item.get("price"),
+            "menu_position": item.get("menu_position"),
+        })
     try:
         conn = _get_conn()
         try:
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                updated = 0
-                for item in items or []:
-                    c.execute(
-                        """
-                        UPDATE public.menu_items
-                        SET name = %s,
-                            description = %s,
-                            avg_price = %s
-                        WHERE id = %s AND restaurant_id = %s
-                        RETURNING id
-                        """,
-                        (
-                            item.get("name"),
-                            item.get("description"),
-                            item.get("price"),
-                            item.get("id"),
-                            restaurant_id,
-                        ),
-                    )
-                    if c.fetchone():
-                        updated += 1
-                conn.commit()
-                return [True, updated]
+            with conn.cursor() as c:
+                results = apply_menu_changes(c, restaurant_id, changes)
+                refresh_search_documents(c, [restaurant_id])
+                _bump(c, catalog.CATALOG_KEY, catalog.menu_key(restaurant_id))
+                _commit(conn)
+                catalog.cache.invalidate()
+                return [True, results]
         finally:
             _put_conn(conn)
     except Exception as ex:
@@ -365,7 +804,7 @@ def upsert_user(username, email, firstname, fullname):
                     firstname = EXCLUDED.firstname,
                     fullname = EXCLUDED.fullname
                 RETURNING id, netid, email, firstname, fullname,
-                          favorite_cuisine, allergies, dietary_restrictions
+                          favorite_cuisine, allergies, dietary_restrictions, admin_status
                 """
                 print(
                     "DEBUG upsert_user: Executing SQL with values - "
@@ -374,7 +813,7 @@ def upsert_user(username, email, firstname, fullname):
                 c.execute(sql, (username, email, firstname, fullname))
                 row = c.fetchone()
                 print(f"DEBUG upsert_user: Query result row: {row}")
-                conn.commit()
+                _commit(conn)
                 if row:
                     return [True, _user_row_to_dict(row)]
                 return [False, "Failed to insert/update user"]
@@ -385,19 +824,21 @@ def upsert_user(username, email, firstname, fullname):
         return _err_response(ex)
 
 
+USER_BY_NETID = prepared.register("tb_user_by_netid", """
+    SELECT id, netid, email, firstname, fullname,
+           favorite_cuisine, allergies, dietary_restrictions, admin_status
+    FROM public.users
+    WHERE netid = %s
+""")
+
+
 def get_user_by_username(username):
     """Get one user by netid."""
     try:
         conn = _get_conn()
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                sql = """
-                SELECT id, netid, email, firstname, fullname,
-                       favorite_cuisine, allergies, dietary_restrictions, admin_status
-                FROM public.users
-                WHERE netid = %s
-                """
-                c.execute(sql, (username,))
+                prepared.execute(c, USER_BY_NETID, (username,))
                 row = c.fetchone()
                 if row:
                     return [True, _user_row_to_dict(row)]
@@ -408,6 +849,14 @@ def get_user_by_username(username):
         return _err_response(ex)
 
 
+def _bump_user_groups(c, netid):
+    """Bump the version of every group netid belongs to; returns the keys."""
+    c.execute("SELECT group_id FROM group_members WHERE user_netid = %s", (netid,))
+    keys = [catalog.group_key(row[0]) for row in c.fetchall()]
+    _bump(c, *keys)
+    return keys
+
+
 def update_favorite_cuisine(username, favorite_cuisine):
     """Update favorite_cuisine array for a user."""
     try:
@@ -424,11 +873,14 @@ def update_favorite_cuisine(username, favorite_cuisine):
                 SET favorite_cuisine = %s
                 WHERE netid = %s
                 RETURNING id, netid, email, firstname, fullname,
-                          favorite_cuisine, allergies, dietary_restrictions
+                          favorite_cuisine, allergies, dietary_restrictions, admin_status
                 """
                 c.execute(sql, (cuisine_array, username))
                 row = c.fetchone()
-                conn.commit()
+                group_keys = _bump_user_groups(c, username) if row else []
+                _commit(conn)
+                # This process sees its own write before the NOTIFY comes back
+                catalog.group_preferences.discard(group_keys)
                 if row:
                     return [True, _user_row_to_dict(row)]
                 return [False, "User not found"]
@@ -454,11 +906,14 @@ def update_allergies(username, allergies):
                 SET allergies = %s
                 WHERE netid = %s
                 RETURNING id, netid, email, firstname, fullname,
-                          favorite_cuisine, allergies, dietary_restrictions
+                          favorite_cuisine, allergies, dietary_restrictions, admin_status
                 """
                 c.execute(sql, (arr, username))
                 row = c.fetchone()
-                conn.commit()
+                group_keys = _bump_user_groups(c, username) if row else []
+                _commit(conn)
+                # This process sees its own write before the NOTIFY comes back
+                catalog.group_preferences.discard(group_keys)
                 if row:
                     return [True, _user_row_to_dict(row)]
                 return [False, "User not found"]
@@ -484,11 +939,14 @@ def update_dietary_restrictions(username, dietary_restrictions):
                 SET dietary_restrictions = %s
                 WHERE netid = %s
                 RETURNING id, netid, email, firstname, fullname,
-                          favorite_cuisine, allergies, dietary_restrictions
+                          favorite_cuisine, allergies, dietary_restrictions, admin_status
                 """
                 c.execute(sql, (arr, username))
                 row = c.fetchone()
-                conn.commit()
+                group_keys = _bump_user_groups(c, username) if row else []
+                _commit(conn)
+                # This process sees its own write before the NOTIFY comes back
+                catalog.group_preferences.discard(group_keys)
                 if row:
                     return [True, _user_row_to_dict(row)]
                 return [False, "User not found"]
@@ -498,23 +956,77 @@ def update_dietary_restrictions(username, dietary_restrictions):
         return _err_response(ex)
 
 
+# ---------- pagination ----------
+
+# Review and feedback lists are keyset-paginated on (created_at, id) DESC
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(row):
+    """Opaque cursor pointing just after this row (a serialized review/feedback dict)."""
+    raw = f"{row['created_at']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Return (created_at, id) for a cursor, (None, None) if empty; ValueError if malformed."""
+    if not cursor:
+        return None, None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except Exception as ex:
+        raise ValueError("Invalid cursor") from ex
+
+
 # ---------- reviews ----------
 
-def upsert_review(rest_id, username, rating, comment):
-    """Insert a review for a restaurant by a user."""
+def _apply_rating_delta(c, restaurant_id, rating, delta):
+    """Add delta (+1/-1) reviews of this rating to restaurant_rating_stats."""
+    hist = [delta if rating == i else 0 for i in range(1, 6)]
+    c.execute(
+        """
+        INSERT INTO public.restaurant_rating_stats AS s
+            (restaurant_id, review_count, rating_sum,
+             rating_1, rating_2, rating_3, rating_4, rating_5)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (restaurant_id) DO UPDATE SET
+            review_count = s.review_count + EXCLUDED.review_count,
+            rating_sum   = s.rating_sum + EXCLUDED.rating_sum,
+            rating_1     = s.rating_1 + EXCLUDED.rating_1,
+            rating_2     = s.rating_2 + EXCLUDED.rating_2,
+            rating_3     = s.rating_3 + EXCLUDED.rating_3,
+            rating_4     = s.rating_4 + EXCLUDED.rating_4,
+            rating_5     = s.rating_5 + EXCLUDED.rating_5,
+            updated_at   = now()
+        """,
+        (restaurant_id, delta, delta * (rating or 0), *hist),
+    )
+    # Catalog payloads carry these stats
+    _bump(c, catalog.CATALOG_KEY, catalog.reviews_key(restaurant_id))
+
+
+def upsert_review(rest_id, username, rating, comment, user_id=None):
+    """
+    Insert a review for a restaurant by a user.
+    Pass user_id when the caller already knows it to skip the users lookup.
+    """
     try:
         conn = _get_conn()
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                c.execute(
-                    "SELECT id FROM public.users WHERE netid = %s",
-                    (username,),
-                )
-                user_row = c.fetchone()
-                if not user_row:
-                    return [False, "User not found"]
+                if user_id is None:
+                    c.execute(
+                        "SELECT id FROM public.users WHERE netid = %s",
+                        (username,),
+                    )
+                    user_row = c.fetchone()
+                    if not user_row:
+                        return [False, "User not found"]
+                    user_id = user_row["id"]
 
-                user_id = user_row["id"]
                 sql = """
                 INSERT INTO public.reviews (restaurant_id, user_id, rating, comment)
                 VALUES (%s, %s, %s, %s)
@@ -522,7 +1034,10 @@ def upsert_review(rest_id, username, rating, comment):
                 """
                 c.execute(sql, (rest_id, user_id, rating, comment))
                 row = c.fetchone()
-                conn.commit()
+                if row:
+                    _apply_rating_delta(c, row["restaurant_id"], row["rating"], 1)
+                _commit(conn)
+                catalog.cache.invalidate()
 
                 if row:
                     review = dict(row)
@@ -538,10 +1053,14 @@ def upsert_review(rest_id, username, rating, comment):
         return _err_response(ex)
 
 
-def get_all_reviews():
-    """Get all reviews with user and restaurant info."""
+def get_all_reviews(limit=None, cursor=None):
+    """Get reviews with user and restaurant info, newest first (one page if limit is set)."""
     try:
-        conn = _get_conn()
+        after_ts, after_id = _decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 sql = """
@@ -551,9 +1070,11 @@ def get_all_reviews():
                 FROM public.reviews r
                 JOIN public.users u ON r.user_id = u.id
                 JOIN public.restaurants rest ON r.restaurant_id = rest.id
-                ORDER BY r.created_at DESC
+                WHERE (%s::timestamptz IS NULL OR (r.created_at, r.id) < (%s::timestamptz, %s::uuid))
+                ORDER BY r.created_at DESC, r.id DESC
+                LIMIT %s
                 """
-                c.execute(sql)
+                c.execute(sql, (after_ts, after_ts, after_id, limit))
                 rows = c.fetchall()
 
                 reviews = []
@@ -571,42 +1092,56 @@ def get_all_reviews():
         return _err_response(ex)
 
 
-def get_reviews_by_restaurant(rest_id):
-    """Get all reviews for a given restaurant."""
+REVIEWS_BY_RESTAURANT_SQL = """
+    SELECT r.id, r.restaurant_id, r.rating, r.comment, r.created_at,
+           u.netid AS username, u.firstname, u.fullname
+    FROM public.reviews r
+    JOIN public.users u ON r.user_id = u.id
+    WHERE r.restaurant_id = %s
+      AND (%s::timestamptz IS NULL OR (r.created_at, r.id) < (%s::timestamptz, %s::uuid))
+    ORDER BY r.created_at DESC, r.id DESC
+    LIMIT %s
+"""
+REVIEWS_BY_RESTAURANT = prepared.register("tb_reviews_by_restaurant", REVIEWS_BY_RESTAURANT_SQL)
+
+
+def _review_from_row(row):
+    review = dict(row)
+    review["created_at"] = review["created_at"].isoformat()
+    review["id"] = str(review["id"])
+    review["restaurant_id"] = str(review["restaurant_id"])
+    return review
+
+
+def get_reviews_by_restaurant(rest_id, limit=None, cursor=None):
+    """Get reviews for a given restaurant, newest first (one page if limit is set)."""
     try:
-        conn = _get_conn()
+        after_ts, after_id = _decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        conn = _get_conn(readonly=True, version_keys=(catalog.reviews_key(rest_id),))
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                sql = """
-                SELECT r.id, r.restaurant_id, r.rating, r.comment, r.created_at,
-                       u.netid AS username, u.firstname, u.fullname
-                FROM public.reviews r
-                JOIN public.users u ON r.user_id = u.id
-                WHERE r.restaurant_id = %s
-                ORDER BY r.created_at DESC
-                """
-                c.execute(sql, (rest_id,))
-                rows = c.fetchall()
-
-                reviews = []
-                for row in rows:
-                    review = dict(row)
-                    review["created_at"] = review["created_at"].isoformat()
-                    review["id"] = str(review["id"])
-                    review["restaurant_id"] = str(review["restaurant_id"])
-                    reviews.append(review)
-
-                return [True, reviews]
+                prepared.execute(
+                    c, REVIEWS_BY_RESTAURANT,
+                    (rest_id, after_ts, after_ts, after_id, limit),
+                )
+                return [True, [_review_from_row(row) for row in c.fetchall()]]
         finally:
             _put_conn(conn)
     except Exception as ex:
         return _err_response(ex)
 
 
-def get_reviews_by_user(username):
-    """Get all reviews written by one user."""
+def get_reviews_by_user(username, limit=None, cursor=None):
+    """Get reviews written by one user, newest first (one page if limit is set)."""
     try:
-        conn = _get_conn()
+        after_ts, after_id = _decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 sql = """
@@ -616,9 +1151,11 @@ def get_reviews_by_user(username):
                 JOIN public.users u ON r.user_id = u.id
                 JOIN public.restaurants rest ON r.restaurant_id = rest.id
                 WHERE u.netid = %s
-                ORDER BY r.created_at DESC
+                  AND (%s::timestamptz IS NULL OR (r.created_at, r.id) < (%s::timestamptz, %s::uuid))
+                ORDER BY r.created_at DESC, r.id DESC
+                LIMIT %s
                 """
-                c.execute(sql, (username,))
+                c.execute(sql, (username, after_ts, after_ts, after_id, limit))
                 rows = c.fetchall()
 
                 reviews = []
@@ -646,11 +1183,14 @@ def delete_review(review_id, username):
                 DELETE FROM public.reviews r
                 USING public.users u
                 WHERE r.id = %s AND r.user_id = u.id AND u.netid = %s
-                RETURNING r.id
+                RETURNING r.id, r.restaurant_id, r.rating
                 """
                 c.execute(sql, (review_id, username))
                 row = c.fetchone()
-                conn.commit()
+                if row:
+                    _apply_rating_delta(c, row["restaurant_id"], row["rating"], -1)
+                _commit(conn)
+                catalog.cache.invalidate()
                 if row:
                     return [True, None]
                 return [False, "Review not found or unauthorized"]
@@ -669,11 +1209,14 @@ def delete_review_force(review_id):
                 sql = """
                 DELETE FROM public.reviews
                 WHERE id = %s
-                RETURNING id
+                RETURNING id, restaurant_id, rating
                 """
                 c.execute(sql, (review_id,))
                 row = c.fetchone()
-                conn.commit()
+                if row:
+                    _apply_rating_delta(c, row["restaurant_id"], row["rating"], -1)
+                _commit(conn)
+                catalog.cache.invalidate()
                 if row:
                     return [True, None]
                 return [False, "Review not found"]
@@ -683,12 +1226,95 @@ def delete_review_force(review_id):
         return _err_response(ex)
 
 
+# ---------- restaurant page ----------
+
+_BUNDLE_REVIEW_COLUMNS = """
+    rv.id, rv.restaurant_id, rv.rating, rv.comment, rv.created_at,
+    u.netid AS username, u.firstname, u.fullname
+"""
+
+# Restaurant row (rating stats included), menu, one page of reviews and
+# the viewer's own reviews as one row: menu and reviews come back as JSON
+# arrays shaped like MENU_SQL and REVIEWS_BY_RESTAURANT_SQL rows.
+RESTAURANT_BUNDLE = prepared.register("tb_restaurant_bundle", f"""
+    SELECT {restaurant_rows.COLUMNS},
+        (
+            SELECT COALESCE(json_agg(m ORDER BY m.menu_position ASC NULLS LAST), '[]'::json)
+            FROM (
+                SELECT mi.id, mi.restaurant_id, mi.name, mi.description, mi.avg_price,
+                       mi.menu_position, r.name AS restaurant_name
+                FROM menu_items mi
+                WHERE mi.restaurant_id = r.id
+            ) m
+        ) AS menu,
+        (
+            SELECT COALESCE(json_agg(v ORDER BY v.created_at DESC, v.id DESC), '[]'::json)
+            FROM (
+                SELECT {_BUNDLE_REVIEW_COLUMNS}
+                FROM public.reviews rv
+                JOIN public.users u ON rv.user_id = u.id
+                WHERE rv.restaurant_id = r.id
+                ORDER BY rv.created_at DESC, rv.id DESC
+                LIMIT %s
+            ) v
+        ) AS reviews,
+        (
+            SELECT COALESCE(json_agg(v ORDER BY v.created_at DESC, v.id DESC), '[]'::json)
+            FROM (
+                SELECT {_BUNDLE_REVIEW_COLUMNS}
+                FROM public.reviews rv
+                JOIN public.users u ON rv.user_id = u.id
+                WHERE rv.restaurant_id = r.id AND rv.user_id = %s::uuid
+            ) v
+        ) AS viewer_reviews
+    {restaurant_rows.FROM}
+    WHERE r.id = %s
+""")
+
+
+def _review_from_json(obj):
+    obj["created_at"] = datetime.fromisoformat(obj["created_at"])
+    return _review_from_row(obj)
+
+
+def load_restaurant_bundle(rest_id, viewer_id=None, limit=None):
+    """
+    Everything the restaurant page shows, from one query on one connection:
+    {"restaurant": JSON bytes, "menu": [...], "reviews": [...] (newest
+    first, at most limit), "viewer_reviews": [...] (viewer_id's reviews)}.
+    """
+    try:
+        keys = (catalog.CATALOG_KEY, catalog.menu_key(rest_id), catalog.reviews_key(rest_id))
+        conn = _get_conn(readonly=True, version_keys=keys)
+        try:
+            with conn.cursor() as c:
+                prepared.execute(c, RESTAURANT_BUNDLE, (limit, viewer_id, rest_id))
+                t = c.fetchone()
+        finally:
+            _put_conn(conn)
+        if not t:
+            return [False, "Not found"]
+        menu, reviews, viewer_reviews = t[-3:]
+        return [True, {
+            "restaurant": restaurant_rows.fragment(restaurant_rows.RestaurantRow(t)),
+            "menu": _menu_items_from_rows(menu),
+            "reviews": [_review_from_json(r) for r in reviews],
+            "viewer_reviews": [_review_from_json(r) for r in viewer_reviews],
+        }]
+    except Exception as ex:
+        return _err_response(ex)
+
+
 # ---------- feedback ----------
 
-def get_all_feedback():
-    """Get all feedback entries with user info."""
+def get_all_feedback(limit=None, cursor=None):
+    """Get feedback entries with user info, newest first (one page if limit is set)."""
     try:
-        conn = _get_conn()
+        after_ts, after_id = _decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 sql = """
@@ -696,9 +1322,11 @@ def get_all_feedback():
                        u.netid AS username, u.firstname, u.fullname
                 FROM public.feedback f
                 JOIN public.users u ON f.user_id = u.id
-                ORDER BY f.created_at DESC
+                WHERE (%s::timestamptz IS NULL OR (f.created_at, f.id) < (%s::timestamptz, %s::uuid))
+                ORDER BY f.created_at DESC, f.id DESC
+                LIMIT %s
                 """
-                c.execute(sql)
+                c.execute(sql, (after_ts, after_ts, after_id, limit))
                 rows = c.fetchall()
 
                 feedback_list = []
@@ -715,10 +1343,14 @@ def get_all_feedback():
         return _err_response(ex)
 
 
-def get_feedback_by_restaurant(rest_id):
-    """Get feedback entries for one restaurant."""
+def get_feedback_by_restaurant(rest_id, limit=None, cursor=None):
+    """Get feedback entries for one restaurant, newest first (one page if limit is set)."""
     try:
-        conn = _get_conn()
+        after_ts, after_id = _decode_cursor(cursor)
+    except ValueError as ex:
+        return [False, str(ex)]
+    try:
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 sql = """
@@ -727,9 +1359,11 @@ def get_feedback_by_restaurant(rest_id):
                 FROM public.feedback f
                 JOIN public.users u ON f.user_id = u.id
                 WHERE f.restaurant_id = %s
-                ORDER BY f.created_at DESC
+                  AND (%s::timestamptz IS NULL OR (f.created_at, f.id) < (%s::timestamptz, %s::uuid))
+                ORDER BY f.created_at DESC, f.id DESC
+                LIMIT %s
                 """
-                c.execute(sql, (rest_id,))
+                c.execute(sql, (rest_id, after_ts, after_ts, after_id, limit))
                 rows = c.fetchall()
 
                 feedback_list = []
@@ -746,17 +1380,21 @@ def get_feedback_by_restaurant(rest_id):
         return _err_response(ex)
 
 
-def submit_feedback(rest_id, username, response):
-    """Insert feedback for a restaurant by a user."""
+def submit_feedback(rest_id, username, response, user_id=None):
+    """
+    Insert feedback for a restaurant by a user.
+    Pass user_id when the caller already knows it to skip the users lookup.
+    """
     try:
         conn = _get_conn()
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
-                c.execute("SELECT id FROM public.users WHERE netid = %s", (username,))
-                user_row = c.fetchone()
-                if not user_row:
-                    return [False, "User not found"]
-                user_id = user_row["id"]
+                if user_id is None:
+                    c.execute("SELECT id FROM public.users WHERE netid = %s", (username,))
+                    user_row = c.fetchone()
+                    if not user_row:
+                        return [False, "User not found"]
+                    user_id = user_row["id"]
 
                 sql = """
                 INSERT INTO public.feedback (restaurant_id, user_id, response)
@@ -765,7 +1403,7 @@ def submit_feedback(rest_id, username, response):
                 """
                 c.execute(sql, (rest_id, user_id, response))
                 row = c.fetchone()
-                conn.commit()
+                _commit(conn)
 
                 if row:
                     feedback = dict(row)
@@ -794,7 +1432,7 @@ def delete_feedback(feedback_id):
                 """
                 c.execute(sql, (feedback_id,))
                 row = c.fetchone()
-                conn.commit()
+                _commit(conn)
                 if row:
                     return [True, None]
                 return [False, "Feedback not found or unauthorized"]
@@ -843,7 +1481,7 @@ def create_group(group_name, creator_netid, selected_restaurant_id=None):
                     """,
                     (g_row["id"], creator_netid),
                 )
-                conn.commit()
+                _commit(conn)
 
                 data = dict(g_row)
                 data["id"] = str(data["id"])
@@ -879,7 +1517,9 @@ def add_member_to_group(group_id, member_netid):
                     """,
                     (group_id, member_netid),
                 )
-                conn.commit()
+                _bump(c, catalog.group_key(group_id))
+                _commit(conn)
+                catalog.group_preferences.discard([catalog.group_key(group_id)])
                 return [True, None]
         finally:
             _put_conn(conn)
@@ -902,7 +1542,10 @@ def remove_member_from_group(group_id, member_netid):
                     (group_id, member_netid),
                 )
                 row = c.fetchone()
-                conn.commit()
+                if row:
+                    _bump(c, catalog.group_key(group_id))
+                _commit(conn)
+                catalog.group_preferences.discard([catalog.group_key(group_id)])
                 if row:
                     return [True, None]
                 return [False, "Membership not found"]
@@ -924,7 +1567,9 @@ def delete_group(group_id):
 
                 c.execute("DELETE FROM group_members WHERE group_id = %s", (group_id,))
                 c.execute("DELETE FROM groups WHERE id = %s", (group_id,))
-                conn.commit()
+                _bump(c, catalog.group_key(group_id))
+                _commit(conn)
+                catalog.group_preferences.discard([catalog.group_key(group_id)])
                 return [True, "deleted"]
         finally:
             _put_conn(conn)
@@ -957,7 +1602,7 @@ def update_group_selected_restaurant(group_id, restaurant_id):
                     (restaurant_id, group_id),
                 )
                 row = c.fetchone()
-                conn.commit()
+                _commit(conn)
                 if not row:
                     return [False, "Group not found"]
 
@@ -1042,7 +1687,7 @@ def update_group_meal_time(group_id, scheduled_meal_at):
                     (scheduled_meal_at, group_id),
                 )
                 row = c.fetchone()
-                conn.commit()
+                _commit(conn)
                 if not row:
                     return [False, "Group not found"]
                 data = dict(row)
@@ -1057,10 +1702,318 @@ def update_group_meal_time(group_id, scheduled_meal_at):
         return _err_response(ex)
 
 
+# ---------- group mutations (membership check + change + re-read) ----------
+
+# Errors the app maps to 404 / 403
+GROUP_NOT_FOUND = "Group not found"
+NOT_GROUP_MEMBER = "Not a group member"
+
+def _group_result_select(*status_columns):
+    """
+    Final SELECT shared by the mutation statements below. The CTEs g
+    (the group), actor (requester's membership), grp (group row after the
+    change) and members (members after the change) must be defined.
+    status_columns are extra select-list expressions for the checks.
+    """
+    extra = "".join(f"           {column},\n" for column in status_columns)
+    return f"""
+    SELECT EXISTS (SELECT 1 FROM g) AS group_found,
+           EXISTS (SELECT 1 FROM actor) AS is_member,
+{extra}           grp.id, grp.group_name, grp.creator_netid,
+           grp.selected_restaurant_id, grp.created_at, grp.scheduled_meal_at,
+           rest.name AS restaurant_name,
+           m.netid, m.role, m.joined_at, m.firstname, m.fullname
+    FROM (SELECT 1) one
+    LEFT JOIN grp ON true
+    LEFT JOIN restaurants rest ON grp.selected_restaurant_id = rest.id
+    LEFT JOIN members m ON true
+    ORDER BY m.joined_at ASC
+"""
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def _group_from_rows(rows):
+    """Build the get_group_with_members dict from flat group x member rows."""
+    first = rows[0]
+    data = {
+        "id": str(first["id"]),
+        "group_name": first["group_name"],
+        "creator_netid": first["creator_netid"],
+        "selected_restaurant_id": first["selected_restaurant_id"],
+        "created_at": first["created_at"].isoformat(),
+        "scheduled_meal_at": first["scheduled_meal_at"],
+        "restaurant_name": first["restaurant_name"],
+    }
+    if data.get("scheduled_meal_at"):
+        data["scheduled_meal_at"] = data["scheduled_meal_at"].isoformat()
+    members = []
+    for row in rows:
+        if row["netid"] is None:
+            continue
+        members.append({
+            "netid": row["netid"],
+            "role": row["role"],
+            "joined_at": row["joined_at"].isoformat(),
+            "firstname": row["firstname"],
+            "fullname": row["fullname"],
+        })
+    data["members"] = members
+    return data
+
+
+def _run_group_mutation(sql, params, extra_checks=None, bump_key=None):
+    """
+    Execute one group mutation statement and return [ok, group or error].
+    extra_checks(first_row) may return an error message to report.
+    bump_key is a cache_versions key bumped when the mutation commits.
+    """
+    try:
+        conn = _get_conn()
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
+                c.execute(sql, params)
+                rows = c.fetchall()
+                first = rows[0]
+                error = None
+                if not first["group_found"]:
+                    error = GROUP_NOT_FOUND
+                elif extra_checks is not None:
+                    error = extra_checks(first)
+                if error is None and not first["is_member"]:
+                    error = NOT_GROUP_MEMBER
+                if error is None and first["id"] is None:
+                    error = GROUP_NOT_FOUND
+                if error is not None:
+                    conn.rollback()
+                    return [False, error]
+                if bump_key is not None:
+                    _bump(c, bump_key)
+                _commit(conn)
+                if bump_key is not None:
+                    catalog.group_preferences.discard([bump_key])
+                return [True, _group_from_rows(rows)]
+        finally:
+            _put_conn(conn)
+    except Exception as ex:
+        return _err_response(ex)
+
+
+def add_group_member_as(group_id, actor_netid, member_netid):
+    """Add member_netid to the group if actor_netid is a member; return the updated group."""
+    if not _is_uuid(group_id):
+        return [False, GROUP_NOT_FOUND]
+    sql = """
+        WITH g AS (
+            SELECT id FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        actor AS (
+            SELECT role FROM group_members
+            WHERE group_id = %(group_id)s::uuid AND user_netid = %(actor)s
+        ),
+        target AS (
+            SELECT netid, firstname, fullname FROM users WHERE netid = %(member)s
+        ),
+        ins AS (
+            INSERT INTO group_members (group_id, user_netid, role)
+            SELECT %(group_id)s::uuid, t.netid, 'member'
+            FROM target t
+            WHERE EXISTS (SELECT 1 FROM g) AND EXISTS (SELECT 1 FROM actor)
+            ON CONFLICT (group_id, user_netid) DO NOTHING
+            RETURNING user_netid, role, joined_at
+        ),
+        grp AS (
+            SELECT id, group_name, creator_netid, selected_restaurant_id,
+                   created_at, scheduled_meal_at
+            FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        members AS (
+            SELECT gm.user_netid AS netid, gm.role, gm.joined_at,
+                   u.firstname, u.fullname
+            FROM group_members gm
+            JOIN users u ON gm.user_netid = u.netid
+            WHERE gm.group_id = %(group_id)s::uuid
+            UNION ALL
+            SELECT i.user_netid, i.role, i.joined_at, t.firstname, t.fullname
+            FROM ins i
+            JOIN target t ON t.netid = i.user_netid
+        ),
+        status AS (
+            SELECT EXISTS (SELECT 1 FROM target) AS target_found
+        )
+    """ + _group_result_select("(SELECT target_found FROM status) AS target_found")
+
+    def checks(row):
+        if row["is_member"] and not row["target_found"]:
+            return "User not found"
+        return None
+
+    return _run_group_mutation(
+        sql,
+        {"group_id": group_id, "actor": actor_netid, "member": member_netid},
+        checks,
+        bump_key=catalog.group_key(group_id),
+    )
+
+
+def remove_group_member_as(group_id, actor_netid, member_netid):
+    """Remove member_netid (never the leader) if actor_netid is a member; return the updated group."""
+    if not _is_uuid(group_id):
+        return [False, GROUP_NOT_FOUND]
+    sql = """
+        WITH g AS (
+            SELECT id FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        actor AS (
+            SELECT role FROM group_members
+            WHERE group_id = %(group_id)s::uuid AND user_netid = %(actor)s
+        ),
+        target AS (
+            SELECT role FROM group_members
+            WHERE group_id = %(group_id)s::uuid AND user_netid = %(member)s
+        ),
+        del AS (
+            DELETE FROM group_members gm
+            WHERE gm.group_id = %(group_id)s::uuid
+              AND gm.user_netid = %(member)s
+              AND gm.role <> 'leader'
+              AND EXISTS (SELECT 1 FROM actor)
+            RETURNING gm.user_netid
+        ),
+        grp AS (
+            SELECT id, group_name, creator_netid, selected_restaurant_id,
+                   created_at, scheduled_meal_at
+            FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        members AS (
+            SELECT gm.user_netid AS netid, gm.role, gm.joined_at,
+                   u.firstname, u.fullname
+            FROM group_members gm
+            JOIN users u ON gm.user_netid = u.netid
+            WHERE gm.group_id = %(group_id)s::uuid
+              AND gm.user_netid NOT IN (SELECT user_netid FROM del)
+        ),
+        status AS (
+            SELECT (SELECT role FROM target) AS target_role,
+                   EXISTS (SELECT 1 FROM del) AS deleted
+        )
+    """ + _group_result_select(
+        "(SELECT target_role FROM status) AS target_role",
+        "(SELECT deleted FROM status) AS deleted",
+    )
+
+    def checks(row):
+        # Same precedence as before: leader check comes before membership
+        if row["target_role"] == "leader":
+            return "Cannot remove group leader"
+        if row["is_member"] and not row["deleted"]:
+            return "Membership not found"
+        return None
+
+    return _run_group_mutation(
+        sql,
+        {"group_id": group_id, "actor": actor_netid, "member": member_netid},
+        checks,
+        bump_key=catalog.group_key(group_id),
+    )
+
+
+def set_group_restaurant_as(group_id, actor_netid, restaurant_id):
+    """Set or clear the selected restaurant if actor_netid is a member; return the updated group."""
+    if not _is_uuid(group_id):
+        return [False, GROUP_NOT_FOUND]
+    if restaurant_id is not None and not _is_uuid(restaurant_id):
+        return [False, "Restaurant not found"]
+    sql = """
+        WITH g AS (
+            SELECT id FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        actor AS (
+            SELECT role FROM group_members
+            WHERE group_id = %(group_id)s::uuid AND user_netid = %(actor)s
+        ),
+        chosen AS (
+            SELECT id FROM restaurants WHERE id = %(restaurant_id)s::uuid
+        ),
+        grp AS (
+            UPDATE groups
+            SET selected_restaurant_id = %(restaurant_id)s::uuid
+            WHERE id = %(group_id)s::uuid
+              AND EXISTS (SELECT 1 FROM actor)
+              AND (%(restaurant_id)s::uuid IS NULL OR EXISTS (SELECT 1 FROM chosen))
+            RETURNING id, group_name, creator_netid, selected_restaurant_id,
+                      created_at, scheduled_meal_at
+        ),
+        members AS (
+            SELECT gm.user_netid AS netid, gm.role, gm.joined_at,
+                   u.firstname, u.fullname
+            FROM group_members gm
+            JOIN users u ON gm.user_netid = u.netid
+            WHERE gm.group_id = %(group_id)s::uuid
+        ),
+        status AS (
+            SELECT (%(restaurant_id)s::uuid IS NULL
+                    OR EXISTS (SELECT 1 FROM chosen)) AS restaurant_found
+        )
+    """ + _group_result_select("(SELECT restaurant_found FROM status) AS restaurant_found")
+
+    def checks(row):
+        if row["is_member"] and not row["restaurant_found"]:
+            return "Restaurant not found"
+        return None
+
+    return _run_group_mutation(
+        sql,
+        {"group_id": group_id, "actor": actor_netid, "restaurant_id": restaurant_id},
+        checks,
+    )
+
+
+def set_group_meal_as(group_id, actor_netid, scheduled_meal_at):
+    """Set or clear scheduled_meal_at if actor_netid is a member; return the updated group."""
+    if not _is_uuid(group_id):
+        return [False, GROUP_NOT_FOUND]
+    sql = """
+        WITH g AS (
+            SELECT id FROM groups WHERE id = %(group_id)s::uuid
+        ),
+        actor AS (
+            SELECT role FROM group_members
+            WHERE group_id = %(group_id)s::uuid AND user_netid = %(actor)s
+        ),
+        grp AS (
+            UPDATE groups
+            SET scheduled_meal_at = %(scheduled)s
+            WHERE id = %(group_id)s::uuid
+              AND EXISTS (SELECT 1 FROM actor)
+            RETURNING id, group_name, creator_netid, selected_restaurant_id,
+                      created_at, scheduled_meal_at
+        ),
+        members AS (
+            SELECT gm.user_netid AS netid, gm.role, gm.joined_at,
+                   u.firstname, u.fullname
+            FROM group_members gm
+            JOIN users u ON gm.user_netid = u.netid
+            WHERE gm.group_id = %(group_id)s::uuid
+        )
+    """ + _group_result_select()
+
+    return _run_group_mutation(
+        sql,
+        {"group_id": group_id, "actor": actor_netid, "scheduled": scheduled_meal_at},
+    )
+
+
 def list_groups_for_user(netid):
     """List groups that this user belongs to."""
     try:
-        conn = _get_conn()
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 c.execute(
@@ -1099,7 +2052,7 @@ def search_users(query, limit=10):
         return [True, []]
     like = f"%{q}%"
     try:
-        conn = _get_conn()
+        conn = _get_conn(readonly=True)
         try:
             with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
                 c.execute(
@@ -1132,7 +2085,7 @@ def search_users(query, limit=10):
 def get_available_cuisines():
     """Get distinct category values from restaurants."""
     try:
-        conn = _get_conn()
+        conn = _get_conn(readonly=True, version_keys=(catalog.CATALOG_KEY,))
         try:
             with conn.cursor(
                 cursor_factory=psycopg2.extras.DictCursor
@@ -1154,90 +2107,118 @@ def get_available_cuisines():
         return _err_response(ex)
 
 
-def get_group_preferences(group_id):
-    """Aggregate preferences for all members in a group."""
+GROUP_PREFERENCES_SQL = """
+    WITH members AS (
+        SELECT u.netid, u.favorite_cuisine, u.dietary_restrictions, u.allergies
+        FROM group_members gm
+        JOIN users u ON gm.user_netid = u.netid
+        WHERE gm.group_id = %(group_id)s::uuid
+    ),
+    cuisines AS (
+        SELECT initcap(btrim(item)) AS name, count(*) AS n
+        FROM members m, unnest(m.favorite_cuisine) AS item
+        WHERE btrim(item) <> ''
+        GROUP BY 1
+    )
+    SELECT EXISTS (SELECT 1 FROM groups WHERE id = %(group_id)s::uuid) AS group_found,
+           ARRAY(SELECT netid FROM members) AS member_netids,
+           ARRAY(SELECT name FROM cuisines
+                 ORDER BY n DESC, name COLLATE "C" LIMIT 3) AS recommended_cuisines,
+           COALESCE((SELECT json_object_agg(name, n) FROM cuisines), '{}')
+               AS cuisine_counts,
+           ARRAY(SELECT DISTINCT initcap(btrim(item)) COLLATE "C"
+                 FROM members m, unnest(m.dietary_restrictions) AS item
+                 WHERE btrim(item) <> '' ORDER BY 1) AS dietary_restrictions,
+           ARRAY(SELECT DISTINCT initcap(btrim(item)) COLLATE "C"
+                 FROM members m, unnest(m.allergies) AS item
+                 WHERE btrim(item) <> '' ORDER BY 1) AS allergies
+"""
+
+
+def _load_group_preferences(group_id):
+    """(group_found, member netids, aggregated preferences) in one query."""
+    conn = _get_conn(readonly=True, version_keys=(catalog.group_key(group_id),))
     try:
-        conn = _get_conn()
-        try:
-            with conn.cursor(
-                cursor_factory=psycopg2.extras.DictCursor
-            ) as c:
-                c.execute(
-                    """
-                    SELECT u.favorite_cuisine, u.dietary_restrictions, u.allergies
-                    FROM group_members gm
-                    JOIN users u ON gm.user_netid = u.netid
-                    WHERE gm.group_id = %s
-                    """,
-                    (group_id,),
-                )
-                rows = c.fetchall()
-
-                if not rows:
-                    return [
-                        True,
-                        {
-                            "recommended_cuisines": [],
-                            "dietary_restrictions": [],
-                            "allergies": [],
-                            "cuisine_counts": {},
-                        },
-                    ]
-
-                cuisine_count = {}
-                dietary_set = set()
-                allergies_set = set()
-
-                for row in rows:
-                    cuisines = row["favorite_cuisine"] or []
-                    restrictions = row["dietary_restrictions"] or []
-                    allergies = row["allergies"] or []
-
-                    for c_item in cuisines:
-                        if c_item:
-                            name = c_item.strip().title()
-                            cuisine_count[name] = cuisine_count.get(name, 0) + 1
-
-                    for d_item in restrictions:
-                        if d_item:
-                            dietary_set.add(d_item.strip().title())
+        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as c:
+            c.execute(GROUP_PREFERENCES_SQL, {"group_id": group_id})
+            row = c.fetchone()
+            prefs = {
+                "recommended_cuisines": list(row["recommended_cuisines"]),
+                "dietary_restrictions": list(row["dietary_restrictions"]),
+                "allergies": list(row["allergies"]),
+                "cuisine_counts": row["cuisine_counts"],
+            }
+            return row["group_found"], frozenset(row["member_netids"]), prefs
+    finally:
+        _put_conn(conn)
+
+
+def _restaurants_by_category(restaurants):
+    index = {}
+    for rest in restaurants:
+        category = (rest["category"] or "").strip().lower()
+        if category:
+            index.setdefault(category, []).append(rest)
+    return index
+
+
+def _group_candidates(cuisines):
+    """Catalog restaurants whose category is one of cuisines, in cuisine order."""
+    entry = _catalog_entry()
+    by_category = entry.derived(
+        "by_category", lambda: _restaurants_by_category(entry.restaurants)
+    )
+    candidates = []
+    for cuisine in cuisines:
+        candidates.extend(by_category.get(cuisine.strip().lower(), []))
+    return candidates
 
-                    for a_item in allergies:
-                        if a_item:
-                            allergies_set.add(a_item.strip().title())
 
-                sorted_cuisines = sorted(
-                    cuisine_count.items(), key=lambda x: (-x[1], x[0])
-                )
-                top_cuisines = [c_name for c_name, _ in sorted_cuisines[:3]]
-
-                return [
-                    True,
-                    {
-                        "recommended_cuisines": top_cuisines,
-                        "dietary_restrictions": sorted(list(dietary_set)),
-                        "allergies": sorted(list(allergies_set)),
-                        "cuisine_counts": cuisine_count,
-                    },
-                ]
-        finally:
-            _put_conn(conn)
+def get_group_preferences(group_id, viewer_netid=None):
+    """
+    Aggregate preferences for all members in a group, plus candidate
+    restaurants whose category matches the recommended cuisines (most
+    favoured first). The aggregation is cached per group version.
+    With viewer_netid, GROUP_NOT_FOUND / NOT_GROUP_MEMBER are returned
+    when the group is missing or the viewer is not in it.
+    """
+    try:
+        key = catalog.group_key(group_id)
+        ok_v, versions = get_cache_versions([key])
+        version = versions[key] if ok_v else None
+        cached = None
+        if version is not None:
+            cached = catalog.group_preferences.get(key, version)
+        if cached is None:
+            cached = _load_group_preferences(group_id)
+            if version is not None:
+                catalog.group_preferences.put(key, version, cached)
+
+        group_found, members, prefs = cached
+        if viewer_netid is not None:
+            if not group_found:
+                return [False, GROUP_NOT_FOUND]
+            if viewer_netid not in members:
+                return [False, NOT_GROUP_MEMBER]
+        result = dict(prefs)
+        result["candidates"] = _group_candidates(prefs["recommended_cuisines"])
+        return [True, result]
     except Exception as ex:
         return _err_response(ex)
 
 
+ADMIN_STATUS = prepared.register(
+    "tb_admin_status", "SELECT admin_status FROM public.users WHERE netid = %s",
+)
+
+
 def get_admin_status(username):
     """Check if a user is admin."""
     try:
         conn = _get_conn()
         try:
             with conn.cursor() as c:
-                sql = """
-                SELECT admin_status
-                FROM public.users
-                WHERE netid = %s
-                """
-                c.execute(sql, (username,))
+                prepared.execute(c, ADMIN_STATUS, (username,))
                 row = c.fetchone()
                 if row:
                     return [True, row[0]]
@@ -0,0 +1,274 @@
+"""
+TigerBites connection pool
+- Thread-safe; waits up to a timeout when exhausted instead of raising
+- Sized per process (one gunicorn worker) from env vars
+- Health-checks idle connections and recycles old ones
+- Tracks checkout wait and in-use metrics
+"""
+
+import os
+import time
+import threading
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(PoolError):
+    """No connection became free within the checkout timeout."""
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class PoolConfig:
+    """
+    Connection budget for one process, read from env vars.
+    TB_DB_POOL_SIZE is the total; the session store gets
+    TB_DB_SESSION_POOL_SIZE of it and the data layer gets the rest.
+    """
+
+    def __init__(self):
+        self.size = max(2, _env_int("TB_DB_POOL_SIZE", 4))
+        self.session_size = max(1, _env_int("TB_DB_SESSION_POOL_SIZE", 1))
+        self.timeout = _env_float("TB_DB_POOL_TIMEOUT", 10.0)
+        self.recycle = _env_float("TB_DB_POOL_RECYCLE", 1800.0)
+        self.idle_check = _env_float("TB_DB_POOL_IDLE_CHECK", 30.0)
+        self._replica_size = _env_int("TB_DB_REPLICA_POOL_SIZE", 0)
+
+    def data_size(self, reserved=0):
+        """Connections left for the data layer after the session store and reserved ones."""
+        return max(1, self.size - self.session_size - reserved)
+
+    def replica_size(self):
+        """
+        Connections to the read replica. It is a separate server, so it has
+        its own budget; defaults to the data layer's share of the primary.
+        """
+        if self._replica_size > 0:
+            return self._replica_size
+        return self.data_size()
+
+    def async_split(self, budget):
+        """
+        (async, sync) connection counts when the ASGI app runs the data
+        layer on an async pool next to the sync one: one budget, split.
+        TB_DB_ASYNC_POOL_SIZE picks the async share (default: half,
+        rounded up); the sync pool keeps at least one connection.
+        """
+        if budget < 2:
+            return 1, 1
+        wanted = _env_int("TB_DB_ASYNC_POOL_SIZE", 0) or (budget + 1) // 2
+        async_size = min(max(1, wanted), budget - 1)
+        return async_size, budget - async_size
+
+    def session_engine_options(self):
+        """SQLAlchemy engine options for the session store, from the same budget."""
+        return {
+            'pool_size': self.session_size,
+            'max_overflow': 0,
+            'pool_timeout': self.timeout,
+            'pool_pre_ping': True,  # detect stale connections
+            'pool_recycle': int(self.recycle),
+        }
+
+
+class BlockingConnectionPool:
+    """psycopg2 pool with the same getconn/putconn/closeall interface as SimpleConnectionPool."""
+
+    def __init__(self, dsn, maxconn, timeout=10.0, recycle=1800.0,
+                 idle_check=30.0, connection_factory=None):
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_check = idle_check
+        self.connection_factory = connection_factory
+        self.closed = False
+
+        self._cond = threading.Condition()
+        self._idle = []      # (conn, created_at, returned_at), most recent last
+        self._in_use = {}    # id(conn) -> (conn, created_at)
+        self._pending = 0    # slots held while opening or validating outside the lock
+        self._waiting = 0
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recycled = 0
+
+    def _connect(self):
+        if self.connection_factory is not None:
+            return psycopg2.connect(self.dsn, connection_factory=self.connection_factory)
+        return psycopg2.connect(self.dsn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as c:
+                c.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for a free slot."""
+        if timeout is None:
+            timeout = self.timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        idle = None
+
+        with self._cond:
+            while True:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    idle = self._idle.pop()
+                    break
+                if len(self._in_use) + self._pending < self.maxconn:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"no connection available within {timeout:g}s "
+                        f"({self.maxconn} in use)"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._pending += 1
+
+        # Validate or open outside the lock; the slot stays reserved meanwhile
+        recycled = 0
+        try:
+            conn = None
+            now = time.monotonic()
+            if idle is not None:
+                conn, created_at, returned_at = idle
+                if now - created_at > self.recycle:
+                    self._close_quietly(conn)
+                    recycled = 1
+                    conn = None
+                elif now - returned_at > self.idle_check and not self._is_healthy(conn):
+                    self._close_quietly(conn)
+                    recycled = 1
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+                created_at = time.monotonic()
+        except Exception:
+            with self._cond:
+                self._pending -= 1
+                self._recycled += recycled
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._pending -= 1
+            self._recycled += recycled
+            self._in_use[id(conn)] = (conn, created_at)
+            self._checkouts += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection; rolls back any open transaction first."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            raise PoolError("trying to put unkeyed connection")
+        created_at = entry[1]
+
+        keep = not close and not conn.closed and not self.closed
+        if keep:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                keep = False
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    keep = False
+        recycled = keep and time.monotonic() - created_at > self.recycle
+        if recycled:
+            keep = False
+        if not keep:
+            self._close_quietly(conn)
+
+        with self._cond:
+            if recycled:
+                self._recycled += 1
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def resize(self, maxconn):
+        """Change the connection limit; idle connections over it are closed."""
+        with self._cond:
+            self.maxconn = maxconn
+            surplus = []
+            while self._idle and len(self._idle) + len(self._in_use) > maxconn:
+                surplus.append(self._idle.pop(0)[0])
+            self._cond.notify_all()
+        for conn in surplus:
+            self._close_quietly(conn)
+
+    def owns(self, conn):
+        """Whether conn is checked out from this pool."""
+        with self._cond:
+            return id(conn) in self._in_use
+
+    def closeall(self):
+        with self._cond:
+            self.closed = True
+            conns = [c for c, _, _ in self._idle] + [c for c, _ in self._in_use.values()]
+            self._idle.clear()
+            self._in_use.clear()
+            self._cond.notify_all()
+        for conn in conns:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """Snapshot of pool gauges and counters."""
+        with self._cond:
+            return {
+                "max": self.maxconn,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "pending": self._pending,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_max": self._wait_max,
+            }
@@ -0,0 +1,155 @@
+"""
+TigerBites geo index
+- Grid-bucketed index over catalog coordinates (CELL_DEGREES cells),
+  built once per catalog snapshot (CatalogEntry.derived)
+- Viewport (bbox) and center/radius lookups only visit overlapping cells
+- Grid clustering for low zoom levels, so /api/map stays bounded
+"""
+
+import math
+from collections import defaultdict
+
+# Key of the index in catalog.CatalogEntry.derived
+INDEX_KEY = "geo_index"
+
+# ~1.1 km of latitude; a viewport over a town touches a handful of cells
+CELL_DEGREES = 0.01
+
+EARTH_RADIUS_M = 6371008.8
+
+# At this zoom and below /api/map returns clusters instead of every restaurant
+CLUSTER_MAX_ZOOM = 13
+# Cluster cell edge in screen pixels (256 px web-mercator tiles)
+CLUSTER_CELL_PX = 64
+# Deepest zoom level the map tiles go to
+MAX_ZOOM = 22
+
+MAX_RADIUS_M = 50000
+
+
+def parse_bbox(text):
+    """'west,south,east,north' (GeoJSON order) -> tuple; ValueError if invalid."""
+    parts = [float(p) for p in text.split(",")]
+    if len(parts) != 4 or not all(math.isfinite(p) for p in parts):
+        raise ValueError("bbox must be west,south,east,north")
+    west, south, east, north = parts
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox must be west,south,east,north")
+    return west, south, east, north
+
+
+def parse_zoom(text):
+    """Integer zoom level in 0..MAX_ZOOM; ValueError if invalid."""
+    zoom = int(text)
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    return zoom
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat, lng, radius_m):
+    """Bounding box (west, south, east, north) of a circle."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    return (max(-180.0, lng - dlng), max(-90.0, lat - dlat),
+            min(180.0, lng + dlng), min(90.0, lat + dlat))
+
+
+def intersect(a, b):
+    """Intersection of two bboxes (None means unbounded); () if they do not overlap."""
+    if a is None or b is None:
+        return a or b
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    if box[0] > box[2] or box[1] > box[3]:
+        return ()
+    return box
+
+
+def _cell(value):
+    return math.floor(value / CELL_DEGREES)
+
+
+class GeoIndex:
+    """Restaurants bucketed by grid cell; positions follow the catalog order."""
+
+    def __init__(self, restaurants):
+        self.points = []  # (position, lat, lng)
+        self.cells = defaultdict(list)
+        for position, rest in enumerate(restaurants):
+            lat, lng = rest.get("latitude"), rest.get("longitude")
+            if lat is None or lng is None:
+                continue
+            lat, lng = float(lat), float(lng)
+            self.points.append((position, lat, lng))
+            self.cells[(_cell(lat), _cell(lng))].append((position, lat, lng))
+
+    def query(self, bbox=None, center=None, radius_m=None):
+        """
+        Catalog positions inside bbox and within radius_m of center
+        (lat, lng), in catalog order.
+        """
+        if center is not None and radius_m is not None:
+            bbox = intersect(bbox, radius_bbox(center[0], center[1], radius_m))
+        if bbox == ():
+            return []
+        if bbox is None:
+            candidates = self.points
+        else:
+            west, south, east, north = bbox
+            rows = range(_cell(south), _cell(north) + 1)
+            cols = range(_cell(west), _cell(east) + 1)
+            if len(rows) * len(cols) > len(self.cells):
+                # Viewport wider than the data: scanning beats probing empty cells
+                candidates = self.points
+            else:
+                candidates = [p for r in rows for c in cols for p in self.cells.get((r, c), ())]
+            candidates = [
+                p for p in candidates
+                if south <= p[1] <= north and west <= p[2] <= east
+            ]
+        if center is not None and radius_m is not None:
+            candidates = [
+                p for p in candidates
+                if haversine_m(center[0], center[1], p[1], p[2]) <= radius_m
+            ]
+        return sorted(position for position, _, _ in candidates)
+
+
+def cluster_cell_degrees(zoom):
+    """Degrees of longitude covered by CLUSTER_CELL_PX pixels at zoom."""
+    return 360.0 / (2 ** zoom) * CLUSTER_CELL_PX / 256
+
+
+def cluster(points, zoom):
+    """
+    Group (key, lat, lng) points into grid clusters for zoom.
+    Returns (singles, clusters): keys of points alone in their cell, and
+    {latitude, longitude, count, bbox} for every cell with several.
+    """
+    size = cluster_cell_degrees(zoom)
+    cells = defaultdict(list)
+    for point in points:
+        cells[(math.floor(point[1] / size), math.floor(point[2] / size))].append(point)
+
+    singles, clusters = [], []
+    for members in cells.values():
+        if len(members) == 1:
+            singles.append(members[0][0])
+            continue
+        lats = [p[1] for p in members]
+        lngs = [p[2] for p in members]
+        clusters.append({
+            "latitude": sum(lats) / len(lats),
+            "longitude": sum(lngs) / len(lngs),
+            "count": len(members),
+            "bbox": [min(lngs), min(lats), max(lngs), max(lats)],
+        })
+    singles.sort()
+    clusters.sort(key=lambda c: (-c["count"], c["latitude"], c["longitude"]))
+    return singles, clusters
@@ -0,0 +1,299 @@
+"""
+TigerBites request metrics
+- Times every Flask request and the DB work done inside it
+  (queries, time in cursor.execute, time waiting for a pool connection)
+- Adds a Server-Timing header to each response
+- Serves per-route histograms and pool gauges at /metrics in
+  Prometheus text format (Bearer TB_METRICS_TOKEN; 404 while it is unset)
+"""
+
+import os
+import hmac
+import time
+import threading
+import contextvars
+
+import flask
+import psycopg2.extensions
+
+from backend.top import app
+
+METRICS_TOKEN = os.getenv("TB_METRICS_TOKEN", "")
+
+# Seconds; roughly what the Prometheus client uses by default
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """DB work attributed to the current request."""
+
+    __slots__ = ("started", "queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+_current = contextvars.ContextVar("tb_request_stats", default=None)
+
+
+def current():
+    """RequestStats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def record_query(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+
+def record_pool_wait(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+# ---------- cursor timing ----------
+
+class _TimedCursorMixin:
+    """Adds the time spent in execute/executemany/copy to the request stats."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query(time.perf_counter() - start)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(time.perf_counter() - start)
+
+
+_timed_cursor_classes = {}
+_timed_cursor_lock = threading.Lock()
+
+
+def _timed_cursor_class(base):
+    cls = _timed_cursor_classes.get(base)
+    if cls is None:
+        with _timed_cursor_lock:
+            cls = _timed_cursor_classes.get(base)
+            if cls is None:
+                cls = type("Timed" + base.__name__, (_TimedCursorMixin, base), {})
+                _timed_cursor_classes[base] = cls
+    return cls
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    """Connection whose cursors (of any cursor_factory) are timed."""
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _timed_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
+
+# ---------- per-route registry ----------
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class _RouteStats:
+    __slots__ = ("duration", "db", "pool_wait", "queries")
+
+    def __init__(self):
+        self.duration = _Histogram()
+        self.db = _Histogram()
+        self.pool_wait = 0.0
+        self.queries = 0
+
+
+_lock = threading.Lock()
+_routes = {}      # (route, method) -> _RouteStats
+_responses = {}   # (route, method, status) -> count
+_pools = {}       # name -> callable returning BlockingConnectionPool.stats()
+
+
+def register_pool(name, stats_fn):
+    """Export stats_fn() as tb_db_pool_* gauges labelled pool=name."""
+    _pools[name] = stats_fn
+
+
+def observe_request(route, method, status, duration, stats):
+    with _lock:
+        entry = _routes.get((route, method))
+        if entry is None:
+            entry = _routes[(route, method)] = _RouteStats()
+        entry.duration.observe(duration)
+        entry.db.observe(stats.db_seconds)
+        entry.pool_wait += stats.pool_wait_seconds
+        entry.queries += stats.queries
+        key = (route, method, status)
+        _responses[key] = _responses.get(key, 0) + 1
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+        _responses.clear()
+
+
+# ---------- Prometheus text format ----------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histogram(lines, name, labels, hist):
+    cumulative = 0
+    for bound, n in zip(_BUCKETS, hist.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=repr(bound))} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.total}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+
+def render():
+    """All metrics as Prometheus exposition text."""
+    with _lock:
+        routes = sorted(_routes.items())
+        responses = sorted(_responses.items())
+
+        lines = [
+            "# HELP tb_http_request_duration_seconds Request latency by route.",
+            "# TYPE tb_http_request_duration_seconds histogram",
+        ]
+        for (route, method), entry in routes:
+            _render_histogram(lines, "tb_http_request_duration_seconds",
+                              {"route": route, "method": method}, entry.duration)
+
+        lines += [
+            "# HELP tb_http_request_db_seconds Time spent executing queries per request.",
+            "# TYPE tb_http_request_db_seconds histogram",
+        ]
+        for (route, method), entry in routes:
+            _render_histogram(lines, "tb_http_request_db_seconds",
+                              {"route": route, "method": method}, entry.db)
+
+        lines += [
+            "# HELP tb_http_request_queries_total Queries executed by route.",
+            "# TYPE tb_http_request_queries_total counter",
+        ]
+        for (route, method), entry in routes:
+            lines.append(f"tb_http_request_queries_total{_labels(route=route, method=method)} "
+                         f"{entry.queries}")
+
+        lines += [
+            "# HELP tb_http_request_pool_wait_seconds_total Time spent waiting for a DB connection by route.",
+            "# TYPE tb_http_request_pool_wait_seconds_total counter",
+        ]
+        for (route, method), entry in routes:
+            lines.append(f"tb_http_request_pool_wait_seconds_total"
+                         f"{_labels(route=route, method=method)} {entry.pool_wait}")
+
+        lines += [
+            "# HELP tb_http_responses_total Responses by route and status.",
+            "# TYPE tb_http_responses_total counter",
+        ]
+        for (route, method, status), n in responses:
+            lines.append(f"tb_http_responses_total"
+                         f"{_labels(route=route, method=method, status=status)} {n}")
+
+    gauges = ("max", "in_use", "idle", "pending", "waiting")
+    counters = ("checkouts", "timeouts", "recycled", "wait_seconds_total")
+    pool_stats = {}
+    for name, stats_fn in sorted(_pools.items()):
+        try:
+            pool_stats[name] = stats_fn()
+        except Exception:
+            continue
+    for field in gauges:
+        lines.append(f"# TYPE tb_db_pool_{field} gauge")
+        for name, stats in pool_stats.items():
+            lines.append(f"tb_db_pool_{field}{_labels(pool=name)} {stats[field]}")
+    for field in counters:
+        metric = field if field.endswith("_total") else field + "_total"
+        lines.append(f"# TYPE tb_db_pool_{metric} counter")
+        for name, stats in pool_stats.items():
+            lines.append(f"tb_db_pool_{metric}{_labels(pool=name)} {stats[field]}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ---------- Flask hooks ----------
+
+def server_timing(stats, duration):
+    """Server-Timing header value (milliseconds)."""
+    return (
+        f"app;dur={duration * 1000:.1f}, "
+        f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.queries} queries\", "
+        f"pool;dur={stats.pool_wait_seconds * 1000:.1f}"
+    )
+
+
+@app.before_request
+def _start_request_timer():
+    _current.set(RequestStats())
+
+
+@app.after_request
+def _finish_request_timer(response):
+    stats = _current.get()
+    if stats is None:
+        return response
+    duration = time.perf_counter() - stats.started
+    rule = flask.request.url_rule
+    route = rule.rule if rule is not None else "unmatched"
+    observe_request(route, flask.request.method, response.status_code, duration, stats)
+    response.headers["Server-Timing"] = server_timing(stats, duration)
+    return response
+
+
+@app.teardown_request
+def _clear_request_timer(exc=None):
+    # Worker threads are reused; do not leak stats into the next request
+    _current.set(None)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    if not METRICS_TOKEN:
+        flask.abort(404)
+    header = flask.request.headers.get("Authorization", "")
+    if not hmac.compare_digest(header.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        flask.abort(403)
+    return flask.Response(render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,73 @@
+"""
+TigerBites open-hours index
+- restaurants.open_intervals (minutes of the week, compiled from hours by
+  data_management.hours) folded into one weekly timeline per catalog
+  snapshot (CatalogEntry.derived)
+- The timeline only has a segment per distinct open/close minute, each
+  holding a bitmask of catalog positions, so a lookup is one bisect
+- Times are America/New_York
+"""
+
+import bisect
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from data_management.hours import MINUTES_PER_DAY, MINUTES_PER_WEEK
+
+# Key of the index in catalog.CatalogEntry.derived
+INDEX_KEY = "open_index"
+
+TZ = ZoneInfo("America/New_York")
+
+
+def parse_open_at(value):
+    """ISO 8601 or epoch seconds -> aware datetime (naive ISO is New York time)."""
+    value = (value or "").strip()
+    try:
+        return datetime.fromtimestamp(float(value), TZ)
+    except ValueError:
+        pass
+    when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=TZ)
+    return when
+
+
+def minute_of_week(when=None):
+    """Minutes since Monday 00:00 New York time (now if when is None)."""
+    when = datetime.now(TZ) if when is None else when.astimezone(TZ)
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+class OpenIndex:
+    """Which catalog positions are open at a minute of the week."""
+
+    def __init__(self, intervals_by_position):
+        """intervals_by_position: one flat open_intervals list (or None) per position."""
+        opens, closes = {}, {}
+        for position, intervals in enumerate(intervals_by_position):
+            bit = 1 << position
+            for i in range(0, len(intervals or ()), 2):
+                opens[intervals[i]] = opens.get(intervals[i], 0) | bit
+                closes[intervals[i + 1]] = closes.get(intervals[i + 1], 0) | bit
+
+        self.boundaries = sorted({0, MINUTES_PER_WEEK} | opens.keys() | closes.keys())
+        self.masks = []
+        current = 0
+        for minute in self.boundaries:
+            current = (current & ~closes.get(minute, 0)) | opens.get(minute, 0)
+            self.masks.append(current)
+
+    def open_mask(self, minute):
+        """Bitmask of positions open at minute (0 <= minute < one week)."""
+        return self.masks[bisect.bisect_right(self.boundaries, minute) - 1]
+
+    def open_positions(self, minute):
+        """Sorted catalog positions open at minute."""
+        mask = self.open_mask(minute)
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(low.bit_length() - 1)
+            mask ^= low
+        return positions
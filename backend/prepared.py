@@ -0,0 +1,108 @@
+"""
+TigerBites prepared statements
+- Hot lookups are registered once and PREPAREd on each pooled connection
+  the first time they run there; later calls send only EXECUTE, so
+  Postgres skips parsing and (once it settles on a generic plan) planning
+- The first use on a connection sends PREPARE and EXECUTE in one round trip
+- Connections are tracked weakly: a recycled or reconnected connection is
+  a new object and simply prepares again
+- If the server no longer has a statement (DISCARD ALL, a pooler in
+  between), the call falls back to plain text and prepares again next time
+- TB_DB_PREPARE=0 sends every statement as plain text
+"""
+
+import os
+import re
+import threading
+import weakref
+
+import psycopg2.errors
+import psycopg2.extensions
+
+ENABLED = os.getenv("TB_DB_PREPARE", "1") != "0"
+
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
+class Statement:
+    """One registered query, written with psycopg2 %s placeholders."""
+
+    __slots__ = ("name", "sql", "prepare_sql", "execute_sql")
+
+    def __init__(self, name, sql, types=()):
+        self.name = name
+        self.sql = sql
+        count = 0
+
+        def number(match):
+            nonlocal count
+            if match.group(0) == "%%":
+                return "%"
+            count += 1
+            return f"${count}"
+
+        body = _PLACEHOLDER_RE.sub(number, sql)
+        type_list = f" ({', '.join(types)})" if types else ""
+        self.prepare_sql = f"PREPARE {name}{type_list} AS {body}".encode("utf-8")
+        args = f" ({', '.join(['%s'] * count)})" if count else ""
+        self.execute_sql = f"EXECUTE {name}{args}"
+
+
+_statements = {}
+
+# connection -> names prepared on it
+_prepared = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def register(name, sql, types=()):
+    """Register a statement under a unique name; returns it for execute()."""
+    statement = Statement(name, sql, types)
+    if _statements.setdefault(name, statement) is not statement:
+        raise ValueError(f"prepared statement {name!r} is already registered")
+    return statement
+
+
+def _prepared_on(conn):
+    with _lock:
+        names = _prepared.get(conn)
+        if names is None:
+            names = _prepared[conn] = set()
+        return names
+
+
+def execute(cursor, statement, args=()):
+    """
+    cursor.execute(statement.sql, args), but as EXECUTE of a statement
+    prepared on the cursor's connection. The text fallback only kicks in
+    when the connection had no transaction open; inside one the error
+    is raised as usual.
+    """
+    if not ENABLED:
+        return cursor.execute(statement.sql, args)
+
+    conn = cursor.connection
+    names = _prepared_on(conn)
+    idle = conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    run = cursor.mogrify(statement.execute_sql, args)
+    try:
+        if statement.name in names:
+            return cursor.execute(run)
+        # Unknown if the PREPARE went through when the EXECUTE fails, so
+        # only record it once both did
+        result = cursor.execute(statement.prepare_sql + b"; " + run)
+        names.add(statement.name)
+        return result
+    except psycopg2.errors.DuplicatePreparedStatement:
+        if not idle:
+            raise
+        conn.rollback()
+        names.add(statement.name)
+        return cursor.execute(run)
+    except psycopg2.errors.InvalidSqlStatementName:
+        if not idle:
+            raise
+        conn.rollback()
+        names.discard(statement.name)
+        return cursor.execute(statement.sql, args)
+
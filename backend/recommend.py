@@ -0,0 +1,220 @@
+"""
+TigerBites recommendations
+- Each restaurant is a feature vector: category one-hot, price, Yelp
+  rating, review aggregates and tags derived from its menu
+- A user is a weight vector over the same features, from their profile
+  (favorite cuisines, dietary restrictions, allergies) and their ratings
+- Scoring every restaurant is one matrix-vector product; the model is
+  built once per catalog snapshot (CatalogEntry.derived)
+"""
+
+import re
+import math
+
+import numpy as np
+
+# Key of the model in catalog.CatalogEntry.derived
+MODEL_KEY = "recommend_model"
+
+# Menu/description keywords per tag
+TAGS = {
+    "vegetarian": ("vegetarian", "veggie", "tofu", "paneer", "falafel"),
+    "vegan": ("vegan", "plant based", "plant-based"),
+    "gluten_free": ("gluten free", "gluten-free"),
+    "halal": ("halal",),
+    "kosher": ("kosher",),
+    "spicy": ("spicy", "chili", "jalapeno", "sriracha", "hot sauce"),
+    "seafood": ("shrimp", "salmon", "tuna", "fish", "crab", "lobster", "shellfish"),
+    "peanut": ("peanut", "satay"),
+    "dairy": ("cheese", "milk", "cream", "butter", "yogurt"),
+    "gluten": ("bread", "pasta", "noodle", "flour", "wheat", "bun", "pizza"),
+}
+TAG_NAMES = tuple(TAGS)
+
+# Profile words (lowercased, trimmed) -> tag, for restrictions and allergies
+_PROFILE_TAGS = {
+    "vegetarian": "vegetarian",
+    "vegan": "vegan",
+    "gluten free": "gluten_free",
+    "gluten-free": "gluten_free",
+    "celiac": "gluten_free",
+    "halal": "halal",
+    "kosher": "kosher",
+    "spicy": "spicy",
+    "shellfish": "seafood",
+    "seafood": "seafood",
+    "fish": "seafood",
+    "peanut": "peanut",
+    "peanuts": "peanut",
+    "nuts": "peanut",
+    "dairy": "dairy",
+    "lactose": "dairy",
+    "milk": "dairy",
+    "gluten": "gluten",
+    "wheat": "gluten",
+}
+
+# Weights of the user vector
+FAVORITE_WEIGHT = 1.0
+RATING_WEIGHT = 0.5        # per review, scaled by (rating - 3) / 2
+RESTRICTION_WEIGHT = 0.5
+ALLERGY_WEIGHT = -1.0
+PRICE_WEIGHT = 0.3
+QUALITY_WEIGHTS = {"yelp": 0.3, "rating": 0.3, "popularity": 0.1}
+
+# Bayesian prior for review averages: this many reviews at the mean
+_PRIOR_COUNT = 5
+
+_TAG_RES = {
+    tag: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")(?:e?s)?\b",
+                    re.IGNORECASE)
+    for tag, words in TAGS.items()
+}
+
+
+def _normalize(value):
+    return (value or "").strip().lower()
+
+
+def _zscore(values):
+    """Standardize, with missing values (NaN) at the mean."""
+    present = ~np.isnan(values)
+    if not present.any():
+        return np.zeros_like(values)
+    mean = values[present].mean()
+    std = values[present].std() or 1.0
+    return np.where(present, (values - mean) / std, 0.0)
+
+
+def _column(restaurants, key):
+    return np.array(
+        [math.nan if r.get(key) is None else float(r[key]) for r in restaurants],
+        dtype=np.float64,
+    )
+
+
+class RecommendModel:
+    """Feature matrix for one catalog snapshot; rows follow its restaurant order."""
+
+    def __init__(self, restaurants, menu_items=()):
+        """
+        restaurants: catalog dicts (CatalogEntry.restaurants)
+        menu_items: (restaurant_id, name, description) rows
+        """
+        self.ids = [r["id"] for r in restaurants]
+        self.row_of = {rid: i for i, rid in enumerate(self.ids)}
+        n = len(self.ids)
+
+        self.categories = sorted({_normalize(r.get("category")) for r in restaurants} - {""})
+        self.category_col = {c: j for j, c in enumerate(self.categories)}
+        self.category_of_row = [self.category_col.get(_normalize(r.get("category"))) for r in restaurants]
+
+        # Column layout of the feature matrix
+        k = len(self.categories)
+        self.price_col = k
+        self.yelp_col = k + 1
+        self.rating_col = k + 2
+        self.popularity_col = k + 3
+        self.tag_col = {tag: k + 4 + j for j, tag in enumerate(TAG_NAMES)}
+        width = k + 4 + len(TAG_NAMES)
+
+        features = np.zeros((n, width), dtype=np.float64)
+        for i, j in enumerate(self.category_of_row):
+            if j is not None:
+                features[i, j] = 1.0
+
+        self.price_z = _zscore(_column(restaurants, "avg_price"))
+        features[:, self.price_col] = self.price_z
+        features[:, self.yelp_col] = _zscore(_column(restaurants, "yelp_rating"))
+
+        counts = np.array([r.get("review_count") or 0 for r in restaurants], dtype=np.float64)
+        averages = _column(restaurants, "avg_rating")
+        rated = ~np.isnan(averages)
+        prior = averages[rated].mean() if rated.any() else 0.0
+        smoothed = np.where(
+            rated,
+            (np.nan_to_num(averages) * counts + prior * _PRIOR_COUNT) / (counts + _PRIOR_COUNT),
+            math.nan,
+        )
+        features[:, self.rating_col] = _zscore(smoothed)
+        features[:, self.popularity_col] = _zscore(np.log1p(counts))
+
+        features[:, k + 4:] = self._tag_features(restaurants, menu_items)
+        self.features = features
+
+    def _tag_features(self, restaurants, menu_items):
+        """Share of a restaurant's menu items per tag; 1 if its own text mentions it."""
+        tags = np.zeros((len(self.ids), len(TAG_NAMES)), dtype=np.float64)
+        item_counts = np.zeros(len(self.ids), dtype=np.float64)
+        for rid, name, description in menu_items:
+            i = self.row_of.get(str(rid))
+            if i is None:
+                continue
+            item_counts[i] += 1
+            text = f"{name or ''} {description or ''}"
+            for j, tag in enumerate(TAG_NAMES):
+                if _TAG_RES[tag].search(text):
+                    tags[i, j] += 1
+        tags /= np.maximum(item_counts, 1)[:, None]
+
+        for i, r in enumerate(restaurants):
+            text = f"{r.get('name') or ''} {r.get('category') or ''} {r.get('description') or ''}"
+            for j, tag in enumerate(TAG_NAMES):
+                if _TAG_RES[tag].search(text):
+                    tags[i, j] = 1.0
+        return tags
+
+    def user_vector(self, favorite_cuisines=(), dietary_restrictions=(),
+                    allergies=(), ratings=()):
+        """
+        Weights over the feature columns.
+        ratings: (restaurant_id, rating 1-5) pairs from the user's reviews.
+        """
+        weights = np.zeros(self.features.shape[1], dtype=np.float64)
+        for cuisine in favorite_cuisines or ():
+            j = self.category_col.get(_normalize(cuisine))
+            if j is not None:
+                weights[j] += FAVORITE_WEIGHT
+
+        liked_prices = []
+        for rid, rating in ratings or ():
+            i = self.row_of.get(str(rid))
+            if i is None or rating is None:
+                continue
+            j = self.category_of_row[i]
+            if j is not None:
+                weights[j] += RATING_WEIGHT * (rating - 3) / 2
+            if rating >= 4:
+                liked_prices.append(self.price_z[i])
+        if liked_prices:
+            weights[self.price_col] = PRICE_WEIGHT * float(np.mean(liked_prices))
+
+        for word in dietary_restrictions or ():
+            tag = _PROFILE_TAGS.get(_normalize(word))
+            if tag is not None:
+                weights[self.tag_col[tag]] += RESTRICTION_WEIGHT
+        for word in allergies or ():
+            tag = _PROFILE_TAGS.get(_normalize(word))
+            if tag is not None:
+                weights[self.tag_col[tag]] += ALLERGY_WEIGHT
+
+        weights[self.yelp_col] += QUALITY_WEIGHTS["yelp"]
+        weights[self.rating_col] += QUALITY_WEIGHTS["rating"]
+        weights[self.popularity_col] += QUALITY_WEIGHTS["popularity"]
+        return weights
+
+    def scores(self, weights):
+        return self.features @ weights
+
+    def rank(self, weights, limit=None):
+        """Row indexes, best first (ties in catalog order), at most limit of them."""
+        scores = self.scores(weights)
+        n = len(scores)
+        candidates = np.arange(n)
+        if limit is not None and limit < n:
+            # Keep everything tied with the limit-th score so ties stay stable
+            cutoff = np.partition(scores, n - limit)[n - limit]
+            candidates = np.flatnonzero(scores >= cutoff)
+        # candidates are ascending, so a stable sort keeps ties in catalog order
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return order[:limit] if limit is not None else order
@@ -0,0 +1,109 @@
+"""
+TigerBites restaurant rows
+- One column list and one row type for every restaurant query
+- Rows are read from a plain tuple cursor (no DictCursor / row.get)
+- Each restaurant's JSON is encoded once and reused until its row changes
+"""
+
+import os
+import json
+import threading
+
+# Select list shared by the catalog, search and detail queries. row_version
+# changes whenever the restaurant or its rating stats row is rewritten.
+COLUMNS = """
+    r.id, r.created_at, r.name, r.description, r.location, r.category,
+    r.hours, r.avg_price, r.latitude, r.longitude, r.picture,
+    r.yelp_rating, r.website_url,
+    s.review_count, s.rating_sum,
+    s.rating_1, s.rating_2, s.rating_3, s.rating_4, s.rating_5,
+    r.xmin::text || ':' || COALESCE(s.xmin::text, '') AS row_version
+"""
+
+FROM = """
+    FROM restaurants r
+    LEFT JOIN restaurant_rating_stats s ON s.restaurant_id = r.id
+"""
+
+_WIDTH = 21
+
+# Upper bound on cached fragments; one per restaurant in practice
+_CACHE_SIZE = int(os.getenv("TB_ROW_JSON_CACHE", "4096"))
+
+
+class RestaurantRow:
+    """One restaurant as read with COLUMNS; extra trailing columns are ignored."""
+
+    __slots__ = (
+        "id", "created_at", "name", "description", "location", "category",
+        "hours", "avg_price", "latitude", "longitude", "picture",
+        "yelp_rating", "website_url",
+        "review_count", "rating_sum", "rating_histogram", "version",
+    )
+
+    def __init__(self, values):
+        (self.id, self.created_at, self.name, self.description, self.location,
+         self.category, self.hours, avg_price, self.latitude, self.longitude,
+         self.picture, yelp_rating, self.website_url,
+         review_count, rating_sum, r1, r2, r3, r4, r5,
+         self.version) = values[:_WIDTH]
+        self.avg_price = float(avg_price) if avg_price is not None else None
+        self.yelp_rating = float(yelp_rating) if yelp_rating is not None else None
+        self.review_count = review_count or 0
+        self.rating_sum = rating_sum or 0
+        self.rating_histogram = [r1 or 0, r2 or 0, r3 or 0, r4 or 0, r5 or 0]
+
+    def to_dict(self):
+        count = self.review_count
+        return {
+            "id": self.id,
+            "created_at": self.created_at.isoformat(),
+            "name": self.name,
+            "description": self.description,
+            "location": self.location,
+            "category": self.category,
+            "hours": self.hours,
+            "avg_price": self.avg_price,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "picture": self.picture,
+            "yelp_rating": self.yelp_rating,
+            "website_url": self.website_url,
+            "review_count": count,
+            "avg_rating": round(self.rating_sum / count, 2) if count else None,
+            "rating_histogram": list(self.rating_histogram),
+        }
+
+
+# ---------- pre-encoded JSON ----------
+
+_lock = threading.Lock()
+_fragments = {}  # id -> (version, bytes)
+
+
+def encode(value):
+    """Compact UTF-8 JSON, the encoding used for every cached response body."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def fragment(row):
+    """JSON bytes for one row, re-encoded only when its version changes."""
+    cached = _fragments.get(row.id)
+    if cached is not None and cached[0] == row.version:
+        return cached[1]
+    data = encode(row.to_dict())
+    with _lock:
+        if len(_fragments) >= _CACHE_SIZE and row.id not in _fragments:
+            _fragments.clear()
+        _fragments[row.id] = (row.version, data)
+    return data
+
+
+def encode_array(rows):
+    """JSON array bytes for rows, concatenated from the cached fragments."""
+    return b"[" + b",".join(fragment(row) for row in rows) + b"]"
+
+
+def clear_cache():
+    with _lock:
+        _fragments.clear()
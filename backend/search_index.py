@@ -0,0 +1,74 @@
+"""
+TigerBites in-process search
+- Trigram indexes over restaurant names and categories
+- Answers name/category /api/search requests without Postgres when
+  TB_SEARCH_BACKEND=memory, returning exactly what the SQL ILIKE path returns
+- Free text (q=) always goes to Postgres (database.restaurant_search_in_memory),
+  so stemming, typo tolerance and ranking are the same on both backends
+"""
+
+import os
+from collections import defaultdict
+
+SEARCH_BACKEND = os.getenv("TB_SEARCH_BACKEND", "sql")
+
+# Key of the index in catalog.CatalogEntry.derived
+INDEX_KEY = "search_index"
+
+
+class SearchIndex:
+    """Immutable index over one catalog snapshot."""
+
+    def __init__(self, restaurants):
+        """restaurants: catalog dicts (need id, name, category)."""
+        self._by_id = {}
+        for r in restaurants:
+            self._by_id[r["id"]] = r
+        # Same order as the SQL path's ORDER BY lower(r.name) COLLATE "C", r.id:
+        # code point order of the lowered name (= UTF-8 byte order), then id
+        self._ordered_ids = sorted(
+            self._by_id, key=lambda rid: ((self._by_id[rid].get("name") or "").lower(), rid)
+        )
+
+        # Substring filters: trigram -> ids, verified against the lowered text
+        self._lowered = {"name": {}, "category": {}}
+        self._substr = {"name": defaultdict(set), "category": defaultdict(set)}
+        for rid, r in self._by_id.items():
+            for field in ("name", "category"):
+                value = r.get(field)
+                if value is None:
+                    continue
+                lowered = value.lower()
+                self._lowered[field][rid] = lowered
+                for i in range(len(lowered) - 2):
+                    self._substr[field][lowered[i:i + 3]].add(rid)
+
+    # ---------- substring filters ----------
+
+    def _substring_ids(self, field, needle):
+        """ids whose field contains needle (case-insensitive), like ILIKE '%needle%'."""
+        lowered = self._lowered[field]
+        needle = needle.lower()
+        if len(needle) < 3:
+            return {rid for rid, text in lowered.items() if needle in text}
+        grams = [needle[i:i + 3] for i in range(len(needle) - 2)]
+        postings = self._substr[field]
+        candidates = set(postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            candidates &= postings.get(gram, set())
+            if not candidates:
+                return candidates
+        return {rid for rid in candidates if needle in lowered[rid]}
+
+    def search(self, name="", category="", limit=None, only_ids=None):
+        """database.restaurant_search without free text: list of catalog dicts."""
+        allowed = self._substring_ids("name", name or "")
+        allowed &= self._substring_ids("category", category or "")
+        if only_ids is not None:
+            allowed &= set(only_ids)
+
+        ids = [rid for rid in self._ordered_ids if rid in allowed]
+
+        if limit is not None:
+            ids = ids[:limit]
+        return [self._by_id[rid] for rid in ids]
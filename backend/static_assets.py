@@ -0,0 +1,116 @@
+"""
+TigerBites static delivery
+- index.html (the SPA shell) is read once and kept in memory, with the
+  bundle URL rewritten to /static/index.bundle.js?v=<content hash>
+- /static serves the .br / .gz files webpack writes next to each asset
+  in production builds, negotiated from Accept-Encoding; a variant older
+  than its source is ignored
+- Hash-versioned asset URLs are cached as immutable; others revalidate
+"""
+
+import os
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+
+import flask
+from werkzeug.security import safe_join
+
+from backend.top import app
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SHELL_PATH = BASE_DIR / "frontend" / "react" / "index.html"
+STATIC_DIR = Path(app.static_folder)
+BUNDLE_NAME = "index.bundle.js"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+
+# Preferred first
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_lock = threading.Lock()
+_shell = None         # (mtimes, body, etag)
+_hashes = {}          # filename -> (mtime, hash)
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def asset_hash(filename):
+    """Short content hash of a file in STATIC_DIR, or None if it is missing."""
+    path = STATIC_DIR / filename
+    mtime = _mtime(path)
+    if mtime is None:
+        return None
+    cached = _hashes.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    with _lock:
+        _hashes[filename] = (mtime, digest)
+    return digest
+
+
+def _build_shell():
+    html = SHELL_PATH.read_text(encoding="utf-8")
+    version = asset_hash(BUNDLE_NAME)
+    bundle_url = f"/static/{BUNDLE_NAME}" + (f"?v={version}" if version else "")
+    html = html.replace(f"../static/{BUNDLE_NAME}", bundle_url)
+    body = html.encode("utf-8")
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+def shell_response():
+    """The SPA shell from memory; rebuilt when index.html or the bundle changes."""
+    global _shell
+    mtimes = (_mtime(SHELL_PATH), _mtime(STATIC_DIR / BUNDLE_NAME))
+    shell = _shell
+    if shell is None or shell[0] != mtimes:
+        body, etag = _build_shell()
+        shell = (mtimes, body, etag)
+        with _lock:
+            _shell = shell
+    _, body, etag = shell
+
+    resp = flask.Response(body, mimetype="text/html")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(flask.request)
+
+
+def serve_static(filename):
+    """Replacement for Flask's static view with precompressed variants."""
+    path = safe_join(str(STATIC_DIR), filename)
+    if path is None or not os.path.isfile(path):
+        flask.abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    accepted = flask.request.accept_encodings
+    source_mtime = _mtime(Path(path))
+    encoding = None
+    for name, suffix in _ENCODINGS:
+        # A variant older than its source is left over from an earlier build
+        variant_mtime = _mtime(Path(path + suffix))
+        if accepted[name] and variant_mtime is not None and variant_mtime >= source_mtime:
+            encoding = name
+            path = path + suffix
+            break
+
+    version = flask.request.args.get("v")
+    immutable = version is not None and version == asset_hash(filename)
+
+    resp = flask.send_file(path, mimetype=mimetype, conditional=True, max_age=None)
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    resp.headers["Cache-Control"] = IMMUTABLE if immutable else REVALIDATE
+    return resp
+
+
+app.view_functions["static"] = serve_static
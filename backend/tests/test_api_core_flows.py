@@ -57,6 +57,64 @@ def test_map_endpoint_returns_restaurants(client):
     assert isinstance(data["restaurants"], list)
 
 
+def test_map_endpoint_revalidates_with_etag(client):
+    _login_session(client, username="map_etag_tester")
+
+    resp = client.get("/api/map")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert "no-cache" in resp.headers["Cache-Control"]
+
+    resp = client.get("/api/map", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+
+
+def test_map_endpoint_filters_by_viewport_and_clusters(client):
+    _login_session(client, username="map_viewport_tester")
+    ok, restaurants = database.load_all_restaurants()
+    located = [r for r in restaurants if r["latitude"] is not None and r["longitude"] is not None]
+    assert located
+    target = located[0]
+    lat, lng = target["latitude"], target["longitude"]
+
+    bbox = f"{lng - 0.001},{lat - 0.001},{lng + 0.001},{lat + 0.001}"
+    resp = client.get(f"/api/map?bbox={bbox}")
+    assert resp.status_code == 200
+    ids = [r["id"] for r in resp.get_json()["restaurants"]]
+    assert target["id"] in ids
+    assert len(ids) < len(restaurants) or len(located) == 1
+
+    resp = client.get(f"/api/map?lat={lat}&lng={lng}&radius=1")
+    assert target["id"] in [r["id"] for r in resp.get_json()["restaurants"]]
+
+    # World view at zoom 2: everything nearby collapses into clusters
+    resp = client.get("/api/map?bbox=-180,-90,180,90&zoom=2")
+    data = resp.get_json()
+    shown = len(data["restaurants"]) + sum(c["count"] for c in data["clusters"])
+    assert shown == len(located)
+
+    assert client.get("/api/map?bbox=1,2,3").status_code == 400
+    assert client.get("/api/map?zoom=-1100").status_code == 400
+    assert client.get("/api/map?zoom=100000").status_code == 400
+
+
+def test_open_filters_return_a_subset_of_the_catalog(client):
+    _login_session(client, username="open_filter_tester")
+    everything = client.get("/api/home").get_json()["restaurants"]
+
+    resp = client.get("/api/home?open_at=2024-07-01T12:00")
+    assert resp.status_code == 200
+    open_ids = {r["id"] for r in resp.get_json()["restaurants"]}
+    assert open_ids <= {r["id"] for r in everything}
+
+    resp = client.get("/api/search?open_at=2024-07-01T12:00")
+    assert resp.status_code == 200
+    assert {r["id"] for r in resp.get_json()["restaurants"]} == open_ids
+
+    assert client.get("/api/search?open_at=not-a-time").status_code == 400
+
+
 def test_search_endpoint_basic(client):
     ok_all, restaurants = database.load_all_restaurants()
     assert ok_all and restaurants
@@ -93,6 +151,14 @@ def test_restaurant_details_and_menu(client):
     assert isinstance(data["menu"], list)
 
 
+def test_unknown_restaurant_is_a_json_404(client):
+    for path in ("/api/restaurants/00000000-0000-0000-0000-000000000000",
+                 "/api/restaurants/00000000-0000-0000-0000-000000000000/bundle"):
+        resp = client.get(path)
+        assert resp.status_code == 404
+        assert resp.get_json() == {"error": "Restaurant not found"}
+
+
 def test_profile_get_and_update(client):
     username = "profile_tester"
 
@@ -158,6 +224,48 @@ def test_create_group_and_list_via_api(client):
     assert group_id in ids
 
 
+def test_group_member_mutations_return_updated_group(client):
+    leader = "group_leader_mut"
+    member = "group_member_mut"
+    outsider = "group_outsider_mut"
+    for netid in (member, outsider):
+        ok, _ = database.upsert_user(netid, f"{netid}@example.com", "Api", "Api Test")
+        assert ok
+
+    _login_session(client, username=leader)
+    resp = client.post("/api/groups", json={"group_name": "Mutation Group"})
+    assert resp.status_code == 201
+    group_id = resp.get_json()["group"]["id"]
+
+    resp = client.post(f"/api/groups/{group_id}/members", json={"netid": member})
+    assert resp.status_code == 200
+    netids = [m["netid"] for m in resp.get_json()["group"]["members"]]
+    assert netids == [leader, member]
+
+    resp = client.put(f"/api/groups/{group_id}/meal", json={"scheduled_meal_at": None})
+    assert resp.status_code == 200
+    assert resp.get_json()["group"]["scheduled_meal_at"] is None
+
+    resp = client.delete(f"/api/groups/{group_id}/members/{leader}")
+    assert resp.status_code == 400
+
+    _login_session(client, username=outsider)
+    resp = client.delete(f"/api/groups/{group_id}/members/{member}")
+    assert resp.status_code == 403
+
+    _login_session(client, username=leader)
+    resp = client.delete(f"/api/groups/{group_id}/members/{member}")
+    assert resp.status_code == 200
+    netids = [m["netid"] for m in resp.get_json()["group"]["members"]]
+    assert netids == [leader]
+
+    # A malformed id is an unknown group, not a server error
+    resp = client.post("/api/groups/not-a-uuid/members", json={"netid": member})
+    assert resp.status_code == 404
+    resp = client.put("/api/groups/not-a-uuid/meal", json={"scheduled_meal_at": None})
+    assert resp.status_code == 404
+
+
 def test_create_review_and_fetch_back(client):
     username = "review_tester"
     rest_id = _get_any_restaurant_id()
@@ -175,6 +283,30 @@ def test_create_review_and_fetch_back(client):
     assert any(r.get("id") == review["id"] for r in data["reviews"])
 
 
+def test_restaurant_bundle_matches_the_separate_endpoints(client):
+    username = "bundle_tester"
+    rest_id = _get_any_restaurant_id()
+    review = _create_review(client, username=username, rest_id=rest_id)
+
+    resp = client.get(f"/api/restaurants/{rest_id}/bundle?limit=5")
+    assert resp.status_code == 200
+    bundle = resp.get_json()
+
+    details = client.get(f"/api/restaurants/{rest_id}").get_json()
+    assert bundle["restaurant"] == details["restaurant"]
+    assert bundle["menu"] == details["menu"]
+    first_page = client.get(f"/api/restaurants/{rest_id}/reviews?limit=5").get_json()
+    assert bundle["reviews"] == first_page["reviews"]
+    assert bundle["next_cursor"] == first_page["next_cursor"]
+
+    assert review["id"] in [r["id"] for r in bundle["viewer_reviews"]]
+    assert bundle["viewer"]["username"] == username
+
+    etag = resp.headers["ETag"]
+    assert client.get(f"/api/restaurants/{rest_id}/bundle?limit=5",
+                      headers={"If-None-Match": etag}).status_code == 304
+
+
 def test_create_review_invalid_rating_and_long_comment(client):
     username = "review_invalid_tester"
     rest_id = _get_any_restaurant_id()
@@ -326,3 +458,28 @@ def test_getusername_with_session(client):
     assert resp.status_code == 200
     data = resp.get_json()
     assert data.get("username") == username
+
+
+def test_restaurant_reviews_keyset_pagination(client):
+    username = "pagination_tester"
+    rest_id = _get_any_restaurant_id()
+    first = _create_review(client, username, rest_id, comment="Page test one")
+    second = _create_review(client, username, rest_id, comment="Page test two")
+
+    resp = client.get(f"/api/restaurants/{rest_id}/reviews", query_string={"limit": 1})
+    assert resp.status_code == 200
+    page1 = resp.get_json()
+    assert len(page1["reviews"]) == 1
+    assert page1["reviews"][0]["id"] == second["id"]
+    assert page1["next_cursor"]
+
+    resp = client.get(
+        f"/api/restaurants/{rest_id}/reviews",
+        query_string={"limit": 1, "cursor": page1["next_cursor"]},
+    )
+    assert resp.status_code == 200
+    page2 = resp.get_json()
+    assert page2["reviews"][0]["id"] == first["id"]
+
+    resp = client.get(f"/api/restaurants/{rest_id}/reviews", query_string={"cursor": "bogus"})
+    assert resp.status_code == 400
@@ -0,0 +1,19 @@
+from backend import catalog
+
+RID = "5f1c8a52-3b0e-4d7a-9a61-0c2f7e4b9d10"
+
+
+def test_keys_use_canonical_ids():
+    for key_fn in (catalog.menu_key, catalog.reviews_key, catalog.group_key):
+        assert key_fn(RID.upper()) == key_fn(RID)
+        assert key_fn("{" + RID + "}") == key_fn(RID)
+    assert catalog.menu_key("not-a-uuid") == "menu:not-a-uuid"
+
+
+def test_note_versions_only_moves_forward():
+    key = catalog.reviews_key(RID)
+    catalog.note_versions({key: 3})
+    catalog.note_versions({key: 2})
+    assert catalog._versions[key] == 3
+    catalog._handle_notify(f"{key}:4")
+    assert catalog._versions[key] == 4
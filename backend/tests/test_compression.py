@@ -0,0 +1,47 @@
+import gzip
+
+import flask
+import pytest
+
+from backend import compression
+from backend.top import app
+
+
+@compression.compress(min_size=100)
+def _view():
+    pass
+
+
+@pytest.fixture
+def compress(monkeypatch):
+    """Run the after_request hook on a response without adding a route to the app."""
+    monkeypatch.setattr(compression, "_route_options", lambda: _view.compress_options)
+
+    def run(size, headers=None):
+        with app.test_request_context('/', headers=headers or {}):
+            resp = flask.Response(b'x' * size, mimetype='application/json')
+            resp.set_etag('v1')
+            return compression._compress_response(resp)
+    return run
+
+
+def test_large_bodies_are_gzipped_and_small_ones_skipped(compress):
+    resp = compress(5000, {'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resp.get_data()) == b'x' * 5000
+    assert resp.headers['ETag'] == '"v1-gzip"'
+    assert 'Accept-Encoding' in resp.headers['Vary']
+
+    resp = compress(50, {'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in resp.headers
+
+    resp = compress(5000)
+    assert 'Content-Encoding' not in resp.headers
+
+
+def test_compressed_etag_revalidates(compress):
+    resp = compress(5000, {'Accept-Encoding': 'gzip', 'If-None-Match': '"v1-gzip"'})
+    assert resp.status_code == 304
+
+    with app.test_request_context(headers={'If-None-Match': '"v1-gzip"'}):
+        assert compression.matching_etag(flask.request.if_none_match, 'v1') == 'v1-gzip'
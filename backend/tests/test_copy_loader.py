@@ -0,0 +1,58 @@
+import csv
+import io
+
+from data_management.db_manager import _CopyStream
+from data_management.db_manager import content_hash
+from data_management.load_menu_items_from_csv import diff_items, parse_file
+
+
+def test_copy_stream_keeps_nulls_distinct_from_empty_strings():
+    rows = [("id-1", 'Say "cheese"', None, 9.5, 0), ("id-1", "", None, None, 1)]
+    stream = _CopyStream(rows)
+    chunks = []
+    while True:
+        chunk = stream.read(5)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    data = "".join(chunks)
+
+    assert data == '"id-1","Say ""cheese""",,9.5,0\n"id-1","",,,1\n'
+    assert stream.count == 2
+    assert list(csv.reader(io.StringIO(data)))[0][1] == 'Say "cheese"'
+
+
+def test_parse_file_infers_restaurant_and_positions(tmp_path):
+    path = tmp_path / "Taco Place - Menu_menu.csv"
+    path.write_text("Item,Price,Description\nTaco,$3-$5,Corn\ntaco,4,Dup\nSoda,2,\n", encoding="utf-8")
+
+    name, fname, file_hash, items = parse_file(path)
+
+    assert name == "Taco Place"
+    assert fname == path.name
+    assert [(i["name"], i["menu_position"], i["avg_price"]) for i in items] == [
+        ("Taco", 0, 4.0), ("taco", 0, 4.0), ("Soda", 1, 2.0),
+    ]
+    # Unchanged since the last import: not parsed again
+    assert parse_file(path, known_hash=file_hash)[3] is None
+
+
+def test_diff_items_returns_only_changed_and_removed_rows():
+    items = [
+        {"name": "Taco", "description": "Corn", "avg_price": 4.0, "menu_position": 0},
+        {"name": "taco", "description": "Dup", "avg_price": 4.0, "menu_position": 0},
+        {"name": "Soda", "description": "", "avg_price": 2.5, "menu_position": 1},
+    ]
+    previous = {
+        "taco": content_hash("Taco", "Corn", 4.0, 0),
+        "soda": content_hash("Soda", "", 2.0, 1),
+        "churro": content_hash("Churro", "", 3.0, 2),
+    }
+
+    rows, hashes, removed = diff_items("rid", items, previous)
+    assert rows == [("rid", "Soda", "", 2.5, 1)]
+    assert list(hashes) == ["soda"]
+    assert removed == ["churro"]
+
+    rows, _, _ = diff_items("rid", items, previous, full=True)
+    assert [r[1] for r in rows] == ["Taco", "Soda"]
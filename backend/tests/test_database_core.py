@@ -75,6 +75,38 @@ def test_create_group_and_list_for_user():
         assert key in prefs
 
 
+def test_group_preferences_aggregate_and_follow_profile_updates():
+    leader, member = "prefs_leader", "prefs_member"
+    for netid in (leader, member):
+        assert database.upsert_user(netid, f"{netid}@example.com", "P", "P User")[0]
+    ok_group, group = database.create_group("Prefs Group", leader)
+    assert ok_group
+    group_id = group["id"]
+    assert database.add_member_to_group(group_id, member)[0]
+
+    database.update_favorite_cuisine(leader, [" italian", "Mexican"])
+    database.update_favorite_cuisine(member, ["ITALIAN "])
+    database.update_allergies(member, ["peanuts", ""])
+
+    ok, prefs = database.get_group_preferences(group_id, leader)
+    assert ok
+    assert prefs["recommended_cuisines"] == ["Italian", "Mexican"]
+    assert prefs["cuisine_counts"] == {"Italian": 2, "Mexican": 1}
+    assert prefs["allergies"] == ["Peanuts"]
+    assert all(r["category"].strip().lower() in ("italian", "mexican")
+               for r in prefs["candidates"])
+
+    # A profile update bumps the group's version, so the cached result is dropped
+    database.update_favorite_cuisine(leader, ["Thai"])
+    ok, prefs = database.get_group_preferences(group_id, leader)
+    assert ok
+    assert prefs["cuisine_counts"] == {"Italian": 1, "Thai": 1}
+
+    assert database.get_group_preferences(group_id, "not_in_group") == [
+        False, database.NOT_GROUP_MEMBER,
+    ]
+
+
 def test_get_user_by_username_round_trip():
     username = "db_user_test"
     email = "db_user@example.com"
@@ -90,3 +122,159 @@ def test_get_user_by_username_round_trip():
     assert user_data["email"] == email
     assert user_data["firstname"] == firstname
     assert user_data["fullname"] == fullname
+
+
+def test_reads_stick_to_primary_after_a_write(monkeypatch):
+    # The primary doubles as the "replica"; only the routing is under test
+    replica = database.BlockingConnectionPool(database.DATABASE_URL, maxconn=1)
+    monkeypatch.setattr(database, "replica_pool", replica)
+    try:
+        database.begin_request(0.0)
+        conn = database._get_conn(readonly=True)
+        assert replica.owns(conn)
+        database._put_conn(conn)
+
+        ok, _ = database.upsert_user("sticky_user", "sticky@example.com", "Sticky", "Sticky User")
+        assert ok
+        conn = database._get_conn(readonly=True)
+        assert not replica.owns(conn)
+        database._put_conn(conn)
+
+        primary_until = database.end_request()
+        assert primary_until is not None
+
+        # Next request from the same session is still pinned; a fresh one is not
+        database.begin_request(primary_until)
+        conn = database._get_conn(readonly=True)
+        assert not replica.owns(conn)
+        database._put_conn(conn)
+        assert database.end_request() is None
+    finally:
+        database.end_request()
+        replica.closeall()
+
+
+def test_hot_lookups_are_prepared_once_and_survive_discard():
+    username = "prepared_user"
+    ok, _ = database.upsert_user(username, "prepared@example.com", "Prep", "Prepared User")
+    assert ok
+
+    conn = database._get_conn()
+    try:
+        with conn.cursor() as c:
+            for _ in range(2):
+                database.prepared.execute(c, database.ADMIN_STATUS, (username,))
+                assert c.fetchone() == (False,)
+            c.execute(
+                "SELECT count(*) FROM pg_prepared_statements WHERE name = %s",
+                (database.ADMIN_STATUS.name,),
+            )
+            assert c.fetchone()[0] == 1
+            conn.rollback()
+
+            # Server-side state lost behind the registry's back: text fallback
+            c.execute("DEALLOCATE ALL")
+            conn.commit()
+            database.prepared.execute(c, database.ADMIN_STATUS, (username,))
+            assert c.fetchone() == (False,)
+    finally:
+        database._put_conn(conn)
+
+
+def test_rating_stats_follow_review_insert_and_delete():
+    username = "rating_stats_user"
+    ok_user, _ = database.upsert_user(
+        username, "stats@example.com", "Stats", "Stats User"
+    )
+    assert ok_user
+
+    ok_all, restaurants = database.load_all_restaurants()
+    assert ok_all and restaurants
+    rest_id = restaurants[0]["id"]
+
+    ok, before = database.load_restaurant_by_id(rest_id)
+    assert ok
+    assert len(before["rating_histogram"]) == 5
+
+    ok, review = database.upsert_review(rest_id, username, 4, "stats test")
+    assert ok
+    ok, during = database.load_restaurant_by_id(rest_id)
+    assert during["review_count"] == before["review_count"] + 1
+    assert during["rating_histogram"][3] == before["rating_histogram"][3] + 1
+    assert during["avg_rating"] is not None
+
+    ok, _ = database.delete_review(review["id"], username)
+    assert ok
+    ok, after = database.load_restaurant_by_id(rest_id)
+    assert after["review_count"] == before["review_count"]
+    assert after["rating_histogram"] == before["rating_histogram"]
+
+
+def test_restaurant_search_free_text_ranks_name_match_first():
+    ok_all, restaurants = database.load_all_restaurants()
+    assert ok_all and restaurants
+    sample = restaurants[0]
+
+    ok, results = database.restaurant_search(["", ""], query=sample["name"], limit=5)
+    assert ok
+    assert 0 < len(results) <= 5
+    assert any(r["id"] == sample["id"] for r in results)
+
+
+def test_free_text_search_is_the_same_on_both_backends():
+    ok_all, restaurants = database.load_all_restaurants()
+    assert ok_all and restaurants
+    name = restaurants[0]["name"]
+    queries = [name, name[:3], name.lower() + "s", "running", "run", "pizza burrito"]
+
+    for query in queries:
+        for limit in (None, 5):
+            ok_sql, sql = database.restaurant_search(["", ""], query=query, limit=limit)
+            ok_mem, mem = database.restaurant_search_in_memory(["", ""], query=query, limit=limit)
+            assert ok_sql and ok_mem
+            assert [r["id"] for r in mem] == [r["id"] for r in sql], query
+
+
+def test_update_menu_items_mixes_insert_update_delete():
+    ok_all, restaurants = database.load_all_restaurants()
+    assert ok_all and restaurants
+    rest_id = restaurants[0]["id"]
+
+    ok, results = database.update_menu_items(rest_id, [
+        {"name": "Bulk Test Item", "description": "first", "price": 3.5},
+        {"op": "update", "id": "00000000-0000-0000-0000-000000000000", "name": "x"},
+        {"op": "bogus"},
+    ])
+    assert ok
+    assert [r["status"] for r in results] == ["inserted", "not_found", "invalid"]
+    item_id = results[0]["id"]
+
+    ok, results = database.update_menu_items(rest_id, [
+        {"id": item_id, "name": "Bulk Test Item", "description": "second", "price": 4.0},
+    ])
+    assert ok and results[0]["status"] == "updated"
+
+    ok, results = database.update_menu_items(rest_id, [{"op": "delete", "id": item_id}])
+    assert ok and results[0]["status"] == "deleted"
+    ok, items = database.load_menu_for_restaurant(rest_id)
+    assert ok and item_id not in [i["id"] for i in items]
+
+
+def test_insert_without_position_keeps_the_stored_position():
+    ok_all, restaurants = database.load_all_restaurants()
+    assert ok_all and restaurants
+    rest_id = restaurants[0]["id"]
+
+    ok, results = database.update_menu_items(rest_id, [
+        {"name": "Position Test Item", "price": 2.0, "menu_position": -1},
+    ])
+    assert ok
+    item_id = results[0]["id"]
+
+    # Same name again without a position: upsert must not clear it
+    ok, _ = database.update_menu_items(rest_id, [{"name": "Position Test Item", "price": 2.5}])
+    assert ok
+    ok, items = database.load_menu_for_restaurant(rest_id)
+    assert ok and items[0]["id"] == item_id and items[0]["price"] == 2.5
+
+    database.update_menu_items(rest_id, [{"op": "delete", "id": item_id}])
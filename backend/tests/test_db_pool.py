@@ -0,0 +1,38 @@
+from backend.db_pool import BlockingConnectionPool, PoolConfig
+
+
+def test_async_split_stays_within_the_budget(monkeypatch):
+    monkeypatch.delenv("TB_DB_ASYNC_POOL_SIZE", raising=False)
+    config = PoolConfig()
+    assert config.async_split(2) == (1, 1)
+    assert config.async_split(5) == (3, 2)
+    assert config.async_split(1) == (1, 1)
+
+    monkeypatch.setenv("TB_DB_ASYNC_POOL_SIZE", "10")
+    assert config.async_split(4) == (3, 1)
+
+
+def test_resize_changes_the_limit_before_any_connection():
+    pool = BlockingConnectionPool("postgresql://unused", maxconn=4)
+    pool.resize(2)
+    assert pool.stats()["max"] == 2
+
+
+class _FakeConn:
+    closed = False
+
+    class info:
+        transaction_status = 0  # TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+def test_recycled_connections_are_counted(monkeypatch):
+    pool = BlockingConnectionPool("postgresql://unused", maxconn=2, recycle=-1)
+    monkeypatch.setattr(pool, "_connect", _FakeConn)
+    for _ in range(3):
+        conn = pool.getconn()
+        pool.putconn(conn)
+        assert conn.closed
+    assert pool.stats()["recycled"] == 3
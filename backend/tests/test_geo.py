@@ -0,0 +1,58 @@
+from backend import geo
+
+
+RESTAURANTS = [
+    {"id": "a", "latitude": 40.3500, "longitude": -74.6590},
+    {"id": "b", "latitude": 40.3510, "longitude": -74.6600},
+    {"id": "c", "latitude": None, "longitude": None},
+    {"id": "d", "latitude": 40.7128, "longitude": -74.0060},
+    {"id": "e", "latitude": 40.3600, "longitude": -74.6700},
+]
+
+
+def test_bbox_query_returns_catalog_positions_in_view():
+    index = geo.GeoIndex(RESTAURANTS)
+    assert index.query(geo.parse_bbox("-74.7,40.34,-74.65,40.36")) == [0, 1, 4]
+    assert index.query(geo.parse_bbox("-74.0061,40.7127,-74.0059,40.7129")) == [3]
+    assert index.query() == [0, 1, 3, 4]
+
+
+def test_radius_query_uses_great_circle_distance():
+    index = geo.GeoIndex(RESTAURANTS)
+    center = (40.3500, -74.6590)
+    assert index.query(center=center, radius_m=200) == [0, 1]
+    assert index.query(center=center, radius_m=80000) == [0, 1, 3, 4]
+    # Disjoint bbox and circle
+    assert index.query(geo.parse_bbox("-74.01,40.71,-74.0,40.72"), center, 200) == []
+
+
+def test_cluster_groups_nearby_points_at_low_zoom():
+    points = [(i, r["latitude"], r["longitude"]) for i, r in enumerate(RESTAURANTS)
+              if r["latitude"] is not None]
+    singles, clusters = geo.cluster(points, zoom=10)
+    assert singles == [3]
+    assert [c["count"] for c in clusters] == [3]
+    assert clusters[0]["bbox"] == [-74.67, 40.35, -74.659, 40.36]
+
+    singles, clusters = geo.cluster(points, zoom=18)
+    assert singles == [0, 1, 3, 4] and clusters == []
+
+
+def test_parse_bbox_rejects_bad_input():
+    for text in ("1,2,3", "a,b,c,d", "10,0,5,1", "0,0,1,nan"):
+        try:
+            geo.parse_bbox(text)
+        except ValueError:
+            continue
+        raise AssertionError(text)
+
+
+def test_parse_zoom_rejects_out_of_range_levels():
+    assert geo.parse_zoom("0") == 0
+    assert geo.parse_zoom(str(geo.MAX_ZOOM)) == geo.MAX_ZOOM
+    for text in ("-1", "-1100", "23", "100000", "2.5", "z"):
+        try:
+            geo.parse_zoom(text)
+        except ValueError:
+            continue
+        raise AssertionError(text)
@@ -0,0 +1,45 @@
+from backend import metrics
+
+
+def test_render_exposes_route_histograms_and_counters():
+    metrics.reset()
+    stats = metrics.RequestStats()
+    stats.queries = 3
+    stats.db_seconds = 0.02
+    metrics.observe_request("/api/home", "GET", 200, 0.03, stats)
+    metrics.observe_request("/api/home", "GET", 200, 0.7, metrics.RequestStats())
+
+    text = metrics.render()
+    labels = 'route="/api/home",method="GET"'
+    assert f'tb_http_request_duration_seconds_bucket{{{labels},le="0.05"}} 1' in text
+    assert f'tb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f'tb_http_request_duration_seconds_count{{{labels}}} 2' in text
+    assert f'tb_http_request_queries_total{{{labels}}} 3' in text
+    assert f'tb_http_responses_total{{{labels},status="200"}} 2' in text
+
+
+def test_queries_are_attributed_only_inside_a_request():
+    metrics.record_query(1.0)  # no request: ignored
+    stats = metrics.RequestStats()
+    metrics._current.set(stats)
+    try:
+        metrics.record_query(0.5)
+        metrics.record_pool_wait(0.25)
+    finally:
+        metrics._current.set(None)
+    assert stats.queries == 1
+    assert stats.db_seconds == 0.5
+    assert 'db;dur=500.0;desc="1 queries"' in metrics.server_timing(stats, 1.0)
+
+
+def test_metrics_endpoint_needs_a_configured_token(monkeypatch):
+    client = metrics.app.test_client()
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 403
+    resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
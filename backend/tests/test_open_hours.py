@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from backend import open_hours
+from data_management.hours import parse_hours, is_open
+
+MON, TUE, SUN = 0, 1, 6
+
+
+def _at(day, hour, minute=0):
+    return day * 1440 + hour * 60 + minute
+
+
+def test_parse_hours_day_ranges_closed_days_and_split_shifts():
+    intervals = parse_hours(
+        "Mon closed Tue 4:30 PM – 10 PM Wed–Thu 11:30 AM – 2:30 PM 4:30 PM – 10 PM"
+    )
+    assert intervals[:2] == [_at(TUE, 16, 30), _at(TUE, 22)]
+    assert not is_open(intervals, _at(MON, 12))
+    assert is_open(intervals, _at(2, 12)) and not is_open(intervals, _at(2, 15))
+    assert parse_hours("Daily 8 AM – 8 PM") == [
+        v for d in range(7) for v in (_at(d, 8), _at(d, 20))
+    ]
+
+
+def test_parse_hours_past_midnight_wraps_to_next_day_and_week():
+    intervals = parse_hours("Sun 11 AM – 2 AM")
+    assert is_open(intervals, _at(MON, 1, 59))
+    assert not is_open(intervals, _at(MON, 2))
+    assert is_open(parse_hours("Fri–Sat 10 AM – 12 AM"), _at(5, 23, 59))
+
+
+def test_parse_hours_rejects_text_it_does_not_understand():
+    assert parse_hours("Call for hours") is None
+    assert parse_hours("Mon–Fri") is None
+    assert parse_hours("") is None
+    assert parse_hours("Mon 13 PM – 2 PM") is None
+
+
+def test_open_index_matches_per_restaurant_intervals():
+    rows = [
+        parse_hours("Daily 8 AM – 8 PM"),
+        parse_hours("Mon closed Tue–Sun 11 AM – 9 PM"),
+        None,
+        parse_hours("Sun 10 PM – 2 AM"),
+    ]
+    index = open_hours.OpenIndex(rows)
+    for minute in range(0, 7 * 1440, 15):
+        expected = [i for i, iv in enumerate(rows) if is_open(iv, minute)]
+        assert index.open_positions(minute) == expected
+
+
+def test_open_at_uses_new_york_time():
+    # 2024-07-01 was a Monday; 16:00 UTC is noon in New York (EDT)
+    when = open_hours.parse_open_at("2024-07-01T16:00:00Z")
+    assert open_hours.minute_of_week(when) == _at(MON, 12)
+    assert open_hours.minute_of_week(open_hours.parse_open_at("2024-07-01T12:00")) == _at(MON, 12)
+    epoch = datetime(2024, 7, 1, 16, tzinfo=timezone.utc).timestamp()
+    assert open_hours.minute_of_week(open_hours.parse_open_at(str(epoch))) == _at(MON, 12)
@@ -0,0 +1,19 @@
+from backend import prepared
+
+
+def test_statement_numbers_placeholders_and_keeps_literal_percent():
+    statement = prepared.Statement(
+        "tb_test_like", "SELECT 1 WHERE name ILIKE '%%x' AND id = %s AND n < %s",
+        types=("uuid", "integer"),
+    )
+    assert statement.prepare_sql == (
+        b"PREPARE tb_test_like (uuid, integer) AS "
+        b"SELECT 1 WHERE name ILIKE '%x' AND id = $1 AND n < $2"
+    )
+    assert statement.execute_sql == "EXECUTE tb_test_like (%s, %s)"
+
+
+def test_statement_without_parameters():
+    statement = prepared.Statement("tb_test_plain", "SELECT 1")
+    assert statement.prepare_sql == b"PREPARE tb_test_plain AS SELECT 1"
+    assert statement.execute_sql == "EXECUTE tb_test_plain"
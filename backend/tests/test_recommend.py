@@ -0,0 +1,49 @@
+from backend import recommend
+
+
+def _rest(rid, category, price=15.0, yelp=4.0, avg=None, count=0, description=""):
+    return {"id": rid, "name": f"R{rid}", "category": category, "avg_price": price,
+            "yelp_rating": yelp, "avg_rating": avg, "review_count": count,
+            "description": description}
+
+
+RESTAURANTS = [
+    _rest("1", "Italian", price=30),
+    _rest("2", "Mexican", price=12),
+    _rest("3", "Thai", price=14),
+    _rest("4", " mexican ", price=10, yelp=4.5),
+    _rest("5", "Sushi", price=40, description="Fresh salmon and tuna"),
+]
+
+
+def _ids(model, order):
+    return [model.ids[i] for i in order]
+
+
+def test_favorite_cuisines_rank_first_with_quality_as_tie_break():
+    model = recommend.RecommendModel(RESTAURANTS)
+    weights = model.user_vector(favorite_cuisines=["Mexican"])
+    assert _ids(model, model.rank(weights))[:2] == ["4", "2"]
+    assert len(model.rank(weights, limit=2)) == 2
+
+
+def test_ratings_and_allergies_shift_the_ranking():
+    menu = [("3", "Pad Thai", "rice noodles with peanuts")]
+    model = recommend.RecommendModel(RESTAURANTS, menu)
+
+    weights = model.user_vector(ratings=[("1", 5), ("2", 1)])
+    ranked = _ids(model, model.rank(weights))
+    assert ranked.index("1") < ranked.index("2")
+
+    favorites = ["Thai", "Sushi"]
+    weights = model.user_vector(favorite_cuisines=favorites)
+    assert set(_ids(model, model.rank(weights, limit=2))) == {"3", "5"}
+    weights = model.user_vector(favorite_cuisines=favorites, allergies=["Peanuts", "shellfish"])
+    assert set(_ids(model, model.rank(weights, limit=2))).isdisjoint({"3", "5"})
+
+
+def test_limit_keeps_ties_in_catalog_order():
+    model = recommend.RecommendModel([_rest(str(i), "Thai", yelp=None) for i in range(6)])
+    weights = model.user_vector()
+    assert _ids(model, model.rank(weights, limit=3)) == ["0", "1", "2"]
+    assert _ids(model, model.rank(weights)) == [str(i) for i in range(6)]
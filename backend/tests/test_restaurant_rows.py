@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from backend import restaurant_rows
+
+
+def _row(version="100:", rating_sum=None, review_count=None):
+    return restaurant_rows.RestaurantRow((
+        "r-1", datetime(2024, 1, 2, 3, 4, 5), "Thai Village", "Curries", "Nassau St",
+        "Thai", "11-9", Decimal("12.50"), 40.35, -74.66, None, Decimal("4.5"), None,
+        review_count, rating_sum, None, None, None, 1 if review_count else None, None,
+        version, 0.9,  # trailing rank column is ignored
+    ))
+
+
+def test_row_to_dict_matches_api_shape():
+    data = _row(rating_sum=4, review_count=1).to_dict()
+    assert data["created_at"] == "2024-01-02T03:04:05"
+    assert data["avg_price"] == 12.5
+    assert data["yelp_rating"] == 4.5
+    assert data["avg_rating"] == 4.0
+    assert data["rating_histogram"] == [0, 0, 0, 1, 0]
+    assert _row().to_dict()["avg_rating"] is None
+
+
+def test_fragments_are_reused_until_the_version_changes():
+    restaurant_rows.clear_cache()
+    first = restaurant_rows.fragment(_row("100:"))
+    assert restaurant_rows.fragment(_row("100:")) is first
+    changed = restaurant_rows.fragment(_row("101:", rating_sum=5, review_count=1))
+    assert changed is not first
+    assert json.loads(changed)["review_count"] == 1
+
+    body = restaurant_rows.encode_array([_row("101:", rating_sum=5, review_count=1)])
+    assert json.loads(body) == [json.loads(changed)]
@@ -0,0 +1,37 @@
+from backend.search_index import SearchIndex
+
+
+RESTAURANTS = [
+    {"id": "1", "name": "Lan Ramen", "category": "Japanese", "description": "Noodle bar"},
+    {"id": "2", "name": "Tacoria", "category": "Mexican", "description": "Tacos and vegan offerings"},
+    {"id": "3", "name": "Olives", "category": "Greek", "description": "Deli and bakery"},
+    {"id": "4", "name": None, "category": "Unknown", "description": ""},
+]
+
+
+def _index():
+    return SearchIndex(RESTAURANTS)
+
+
+def test_empty_filters_match_sql_semantics():
+    # Rows with a NULL name never match ILIKE, even with an empty pattern
+    ids = [r["id"] for r in _index().search()]
+    assert ids == ["1", "3", "2"]
+
+
+def test_name_order_matches_sql_lower_collate_c():
+    # ORDER BY lower(r.name) COLLATE "C", r.id: spaces and punctuation sort
+    # before letters, case is ignored, accents sort after ASCII, then id
+    names = {"a": "Zest", "b": "cafe", "c": "Café", "d": "Cafe", "e": "Caf e", "f": "Caf-e", "g": "CAFE"}
+    index = SearchIndex(
+        [{"id": rid, "name": name, "category": "x", "description": ""} for rid, name in names.items()]
+    )
+    assert [r["id"] for r in index.search()] == ["e", "f", "b", "d", "g", "c", "a"]
+
+
+def test_substring_filters_are_case_insensitive():
+    index = _index()
+    assert [r["id"] for r in index.search(name="RAM")] == ["1"]
+    assert [r["id"] for r in index.search(name="o", category="mex")] == ["2"]
+    assert index.search(name="100%") == []
+
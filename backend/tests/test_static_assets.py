@@ -0,0 +1,60 @@
+import os
+import gzip
+
+from backend import static_assets
+from backend.top import app
+
+
+def _setup(tmp_path, monkeypatch):
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    (static_dir / "index.bundle.js").write_text("console.log('hi');" * 100)
+    (static_dir / "index.bundle.js.gz").write_bytes(
+        gzip.compress((static_dir / "index.bundle.js").read_bytes())
+    )
+    shell = tmp_path / "index.html"
+    shell.write_text('<script src="../static/index.bundle.js"></script>')
+    monkeypatch.setattr(static_assets, "STATIC_DIR", static_dir)
+    monkeypatch.setattr(static_assets, "SHELL_PATH", shell)
+    monkeypatch.setattr(static_assets, "_shell", None)
+    monkeypatch.setattr(static_assets, "_hashes", {})
+
+
+def test_shell_references_hashed_bundle(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    version = static_assets.asset_hash("index.bundle.js")
+    with app.test_request_context("/"):
+        resp = static_assets.shell_response()
+    assert f"/static/index.bundle.js?v={version}".encode() in resp.get_data()
+    assert resp.headers["ETag"]
+
+
+def test_static_prefers_precompressed_variant(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    version = static_assets.asset_hash("index.bundle.js")
+    client = app.test_client()
+
+    resp = client.get(f"/static/index.bundle.js?v={version}",
+                      headers={"Accept-Encoding": "gzip, br"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in resp.headers["Cache-Control"]
+    assert resp.mimetype in ("text/javascript", "application/javascript")
+
+    resp = client.get("/static/index.bundle.js")
+    assert "Content-Encoding" not in resp.headers
+    assert resp.headers["Cache-Control"] == static_assets.REVALIDATE
+
+
+def test_static_ignores_variant_older_than_its_source(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    bundle = tmp_path / "static" / "index.bundle.js"
+    # A development build rewrote the bundle after the production one
+    bundle.write_text("console.log('new');" * 100)
+    stat = bundle.stat()
+    os.utime(bundle.with_suffix(".js.gz"), (stat.st_atime - 60, stat.st_mtime - 60))
+
+    resp = app.test_client().get("/static/index.bundle.js",
+                                 headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_data() == bundle.read_bytes()
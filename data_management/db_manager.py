@@ -5,15 +5,31 @@ TigerBites DB Manager
 - Ensures schema exists
 - Provides insert helpers (single and bulk)
 - Adds helpers for menu item bulk upsert and restaurant lookup by name
+- Applies menu updates/inserts/deletes in one set-based statement
+- COPY-based staging loads for restaurants and menu items
+- Import manifest (file and row hashes) for incremental CSV re-imports
+- Functions take an optional conn so a loader can reuse one connection
+- Bumps cache versions (and NOTIFYs app workers) when catalog data changes
+- Backfills per-restaurant rating stats (run with: backfill-rating-stats)
+- Maintains the restaurant search columns (trigram text + tsvector)
+- GiST index on restaurant coordinates for map viewport queries
+- Compiles hours text into restaurants.open_intervals on every write
+  (backfill existing rows with: backfill-open-hours)
 """
 
 import os
+import sys
+import json
+import hashlib
+from contextlib import contextmanager
 from pathlib import Path
 
 import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from data_management.hours import parse_hours
+
 ROOT_ENV = Path(__file__).resolve().parents[1] / ".env"
 if ROOT_ENV.exists():
     load_dotenv(ROOT_ENV)
@@ -22,6 +38,9 @@ else:
 
 DATABASE_URL = os.getenv("TB_DATABASE_URL")
 
+# LISTEN/NOTIFY channel used to tell app workers a cache version changed
+CACHE_CHANNEL = "tb_cache"
+
 
 def get_conn():
     if not DATABASE_URL:
@@ -29,7 +48,21 @@ def get_conn():
     return psycopg2.connect(DATABASE_URL)
 
 
-def create_restaurants_table():
+@contextmanager
+def _connection(conn=None):
+    """Use the caller's connection if given, else open one and close it afterwards."""
+    if conn is not None:
+        yield conn
+        return
+    conn = get_conn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def create_restaurants_table(conn=None):
     ddl = """
     CREATE EXTENSION IF NOT EXISTS "pgcrypto";
     CREATE TABLE IF NOT EXISTS public.restaurants (
@@ -47,13 +80,13 @@ def create_restaurants_table():
         yelp_rating DOUBLE PRECISION
     );
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(ddl)
         conn.commit()
 
-def migrate_restaurant_new_columns():
-    """Add picture (TEXT), yelp_rating (DOUBLE PRECISION), and website_url (TEXT) if missing."""
-    with get_conn() as conn, conn.cursor() as cur:
+def migrate_restaurant_new_columns(conn=None):
+    """Add picture, yelp_rating, website_url and open_intervals (parsed hours) if missing."""
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute("""
             ALTER TABLE public.restaurants
             ADD COLUMN IF NOT EXISTS picture TEXT;
@@ -66,9 +99,13 @@ def migrate_restaurant_new_columns():
             ALTER TABLE public.restaurants
             ADD COLUMN IF NOT EXISTS website_url TEXT;
         """)
+        cur.execute("""
+            ALTER TABLE public.restaurants
+            ADD COLUMN IF NOT EXISTS open_intervals INTEGER[];
+        """)
         conn.commit()
 
-def create_menu_items_table():
+def create_menu_items_table(conn=None):
     ddl = """
     CREATE EXTENSION IF NOT EXISTS "pgcrypto";
     CREATE TABLE IF NOT EXISTS public.menu_items (
@@ -77,15 +114,26 @@ def create_menu_items_table():
         restaurant_id uuid REFERENCES public.restaurants(id),
         name        TEXT,
         description TEXT,
-        avg_price   DOUBLE PRECISION
+        avg_price   DOUBLE PRECISION,
+        menu_position INTEGER
     );
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(ddl)
         conn.commit()
 
 
-def create_users_table():
+def migrate_menu_items_new_columns(conn=None):
+    """Add menu_position (INTEGER) if missing; it keeps the CSV order of a menu."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute("""
+            ALTER TABLE public.menu_items
+            ADD COLUMN IF NOT EXISTS menu_position INTEGER;
+        """)
+        conn.commit()
+
+
+def create_users_table(conn=None):
     ddl = """
     CREATE EXTENSION IF NOT EXISTS "pgcrypto";
     CREATE TABLE IF NOT EXISTS public.users (
@@ -101,12 +149,322 @@ def create_users_table():
         admin_status BOOLEAN DEFAULT FALSE
     );
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(ddl)
+        conn.commit()
+
+def create_cache_versions_table(conn=None):
+    ddl = """
+    CREATE TABLE IF NOT EXISTS public.cache_versions (
+        key        TEXT PRIMARY KEY,
+        version    BIGINT NOT NULL DEFAULT 1,
+        updated_at timestamptz NOT NULL DEFAULT now()
+    );
+    """
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(ddl)
+        conn.commit()
+
+
+def create_import_manifest_tables(conn=None):
+    """
+    What the CSV loaders last imported: a content hash per file and per row,
+    so re-runs can skip unchanged files and apply only changed/removed rows.
+    """
+    ddl = """
+    CREATE TABLE IF NOT EXISTS public.import_files (
+        kind          TEXT NOT NULL,
+        source        TEXT NOT NULL,
+        file_hash     TEXT NOT NULL,
+        restaurant_id uuid REFERENCES public.restaurants(id) ON DELETE CASCADE,
+        imported_at   timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (kind, source)
+    );
+    CREATE TABLE IF NOT EXISTS public.import_rows (
+        kind     TEXT NOT NULL,
+        source   TEXT NOT NULL,
+        row_key  TEXT NOT NULL,
+        row_hash TEXT NOT NULL,
+        PRIMARY KEY (kind, source, row_key),
+        FOREIGN KEY (kind, source)
+            REFERENCES public.import_files (kind, source) ON DELETE CASCADE
+    );
+    """
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(ddl)
+        conn.commit()
+
+
+def content_hash(*values):
+    """Stable hash of a file's bytes or of a row's parsed values."""
+    if len(values) == 1 and isinstance(values[0], bytes):
+        data = values[0]
+    else:
+        data = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_import_manifest(kind, conn=None):
+    """{source: file_hash} for everything previously imported as kind."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT source, file_hash FROM public.import_files WHERE kind = %s;",
+            (kind,),
+        )
+        return dict(cur.fetchall())
+
+
+def load_import_rows(kind, sources, conn=None):
+    """{source: {row_key: row_hash}} for the given sources."""
+    result = {source: {} for source in sources}
+    if not result:
+        return result
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT source, row_key, row_hash FROM public.import_rows
+            WHERE kind = %s AND source = ANY(%s);
+            """,
+            (kind, list(result)),
+        )
+        for source, row_key, row_hash in cur.fetchall():
+            result[source][row_key] = row_hash
+        return result
+
+
+def _record_import(cur, manifest):
+    """
+    Write a manifest update on the caller's cursor, in the same transaction
+    as the data it describes. manifest = {"kind", "files": [(source,
+    file_hash, restaurant_id)], "rows": [(source, row_key, row_hash)],
+    "removed": [(source, row_key)]}
+    """
+    kind = manifest["kind"]
+    if manifest.get("files"):
+        execute_values(
+            cur,
+            """
+            INSERT INTO public.import_files (kind, source, file_hash, restaurant_id)
+            VALUES %s
+            ON CONFLICT (kind, source) DO UPDATE SET
+                file_hash     = EXCLUDED.file_hash,
+                restaurant_id = EXCLUDED.restaurant_id,
+                imported_at   = now();
+            """,
+            [(kind, source, file_hash, rid) for source, file_hash, rid in manifest["files"]],
+        )
+    if manifest.get("removed"):
+        execute_values(
+            cur,
+            """
+            DELETE FROM public.import_rows i
+            USING (VALUES %s) AS d(kind, source, row_key)
+            WHERE i.kind = d.kind AND i.source = d.source AND i.row_key = d.row_key;
+            """,
+            [(kind, source, key) for source, key in manifest["removed"]],
+        )
+    if manifest.get("rows"):
+        execute_values(
+            cur,
+            """
+            INSERT INTO public.import_rows (kind, source, row_key, row_hash)
+            VALUES %s
+            ON CONFLICT (kind, source, row_key) DO UPDATE SET
+                row_hash = EXCLUDED.row_hash;
+            """,
+            [(kind, source, key, row_hash) for source, key, row_hash in manifest["rows"]],
+        )
+
+
+def bump_cache_version(cur, key):
+    """
+    Increment the version for key and NOTIFY listeners.
+    Runs on the caller's cursor so the NOTIFY is sent only when that
+    transaction commits.
+    """
+    cur.execute(
+        """
+        WITH v AS (
+            INSERT INTO public.cache_versions (key, version)
+            VALUES (%s, 1)
+            ON CONFLICT (key) DO UPDATE SET
+                version    = public.cache_versions.version + 1,
+                updated_at = now()
+            RETURNING key, version
+        )
+        SELECT v.version, pg_notify(%s, v.key || ':' || v.version)
+        FROM v;
+        """,
+        (key, CACHE_CHANNEL),
+    )
+    return cur.fetchone()[0]
+
+
+def bump_cache_versions(cur, keys):
+    """bump_cache_version for many keys in one statement; returns {key: new version}."""
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    cur.execute(
+        """
+        WITH v AS (
+            INSERT INTO public.cache_versions (key, version)
+            SELECT k, 1 FROM unnest(%s::text[]) AS k
+            ON CONFLICT (key) DO UPDATE SET
+                version    = public.cache_versions.version + 1,
+                updated_at = now()
+            RETURNING key, version
+        )
+        SELECT v.key, v.version, pg_notify(%s, v.key || ':' || v.version)
+        FROM v;
+        """,
+        (keys, CACHE_CHANNEL),
+    )
+    return {key: version for key, version, _ in cur.fetchall()}
+
+
+def create_restaurant_rating_stats_table(conn=None):
+    """Per-restaurant review count, rating sum and 1-5 histogram, kept current by the app."""
+    ddl = """
+    CREATE TABLE IF NOT EXISTS public.restaurant_rating_stats (
+        restaurant_id uuid PRIMARY KEY REFERENCES public.restaurants(id) ON DELETE CASCADE,
+        review_count INTEGER NOT NULL DEFAULT 0,
+        rating_sum   INTEGER NOT NULL DEFAULT 0,
+        rating_1     INTEGER NOT NULL DEFAULT 0,
+        rating_2     INTEGER NOT NULL DEFAULT 0,
+        rating_3     INTEGER NOT NULL DEFAULT 0,
+        rating_4     INTEGER NOT NULL DEFAULT 0,
+        rating_5     INTEGER NOT NULL DEFAULT 0,
+        updated_at   timestamptz NOT NULL DEFAULT now()
+    );
+    """
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(ddl)
         conn.commit()
 
-def ensure_restaurants_uniqueness():
-    with get_conn() as conn, conn.cursor() as cur:
+
+def backfill_restaurant_rating_stats(conn=None):
+    """Recompute restaurant_rating_stats from public.reviews."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        # Block review writes so the recomputed totals cannot miss a delta
+        cur.execute("LOCK TABLE public.reviews IN SHARE MODE;")
+        cur.execute("DELETE FROM public.restaurant_rating_stats;")
+        cur.execute(
+            """
+            INSERT INTO public.restaurant_rating_stats
+                (restaurant_id, review_count, rating_sum,
+                 rating_1, rating_2, rating_3, rating_4, rating_5)
+            SELECT restaurant_id,
+                   count(*),
+                   coalesce(sum(rating), 0),
+                   count(*) FILTER (WHERE rating = 1),
+                   count(*) FILTER (WHERE rating = 2),
+                   count(*) FILTER (WHERE rating = 3),
+                   count(*) FILTER (WHERE rating = 4),
+                   count(*) FILTER (WHERE rating = 5)
+            FROM public.reviews
+            WHERE restaurant_id IS NOT NULL
+            GROUP BY restaurant_id;
+            """
+        )
+        n = cur.rowcount
+        bump_cache_version(cur, "catalog")
+        conn.commit()
+        return n
+
+
+def backfill_open_intervals(conn=None):
+    """Compile restaurants.open_intervals from hours for every restaurant."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT id, hours FROM public.restaurants;")
+        values = [(rid, parse_hours(hours)) for rid, hours in cur.fetchall()]
+        if values:
+            execute_values(
+                cur,
+                """
+                UPDATE public.restaurants r
+                SET open_intervals = v.open_intervals
+                FROM (VALUES %s) AS v(id, open_intervals)
+                WHERE r.id = v.id::uuid
+                  AND r.open_intervals IS DISTINCT FROM v.open_intervals;
+                """,
+                values,
+                template="(%s, %s::integer[])",
+            )
+        bump_cache_version(cur, "catalog")
+        conn.commit()
+        return len(values)
+
+
+def refresh_search_documents(cur, restaurant_ids=None):
+    """
+    Rebuild restaurants.search_text (names for trigram typo matching) and
+    restaurants.search_tsv (weighted full text incl. menu items).
+    restaurant_ids=None refreshes every restaurant.
+    """
+    cur.execute(
+        """
+        UPDATE public.restaurants r
+        SET search_text = concat_ws(' ', r.name, r.category, m.item_names),
+            search_tsv  =
+                setweight(to_tsvector('english', coalesce(r.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(r.category, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(m.item_names, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(r.description, '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(m.item_descriptions, '')), 'D')
+        FROM (
+            SELECT rr.id,
+                   string_agg(mi.name, ' ') AS item_names,
+                   string_agg(mi.description, ' ') AS item_descriptions
+            FROM public.restaurants rr
+            LEFT JOIN public.menu_items mi ON mi.restaurant_id = rr.id
+            WHERE %(ids)s::uuid[] IS NULL OR rr.id = ANY(%(ids)s::uuid[])
+            GROUP BY rr.id
+        ) m
+        WHERE r.id = m.id;
+        """,
+        {"ids": list(restaurant_ids) if restaurant_ids is not None else None},
+    )
+
+
+def ensure_geo_index(conn=None):
+    """GiST index on point(longitude, latitude) for /api/map viewport queries."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS restaurants_geo_idx
+                ON public.restaurants USING gist (point(longitude, latitude));
+            """
+        )
+        conn.commit()
+
+
+def ensure_search_indexes(conn=None):
+    """pg_trgm + full-text columns and GIN indexes used by restaurant search."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            ALTER TABLE public.restaurants
+                ADD COLUMN IF NOT EXISTS search_text TEXT;
+            ALTER TABLE public.restaurants
+                ADD COLUMN IF NOT EXISTS search_tsv tsvector;
+            CREATE INDEX IF NOT EXISTS restaurants_name_trgm_idx
+                ON public.restaurants USING gin (name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS restaurants_category_trgm_idx
+                ON public.restaurants USING gin (category gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS restaurants_search_text_trgm_idx
+                ON public.restaurants USING gin (search_text gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS restaurants_search_tsv_idx
+                ON public.restaurants USING gin (search_tsv);
+            """
+        )
+        refresh_search_documents(cur)
+        conn.commit()
+
+
+def ensure_restaurants_uniqueness(conn=None):
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(
             """
             DO $$
@@ -125,8 +483,8 @@ def ensure_restaurants_uniqueness():
         conn.commit()
 
 
-def ensure_menu_items_uniqueness():
-    with get_conn() as conn, conn.cursor() as cur:
+def ensure_menu_items_uniqueness(conn=None):
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(
             """
             DO $$
@@ -145,29 +503,55 @@ def ensure_menu_items_uniqueness():
         conn.commit()
 
 
-def find_restaurant_id_by_name(restaurant_name: str):
+def ensure_review_feedback_indexes(conn=None):
+    """Composite indexes backing keyset pagination on (created_at, id)."""
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS reviews_created_at_id_idx
+                ON public.reviews (created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS reviews_restaurant_created_at_id_idx
+                ON public.reviews (restaurant_id, created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS reviews_user_created_at_id_idx
+                ON public.reviews (user_id, created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS feedback_created_at_id_idx
+                ON public.feedback (created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS feedback_restaurant_created_at_id_idx
+                ON public.feedback (restaurant_id, created_at DESC, id DESC);
+            """
+        )
+        conn.commit()
+
+
+def find_restaurant_id_by_name(restaurant_name: str, conn=None):
     sql = """
         SELECT id FROM public.restaurants
         WHERE lower(name) = lower(%s)
         ORDER BY created_at DESC
         LIMIT 1;
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    with _connection(conn) as conn, conn.cursor() as cur:
         cur.execute(sql, (restaurant_name,))
         row = cur.fetchone()
         return row[0] if row else None
 
 
-def insert_restaurant(restaurant_data, menu_data=None):
+def _with_open_intervals(restaurant):
+    """Copy of a restaurant dict with open_intervals compiled from its hours."""
+    return dict(restaurant, open_intervals=parse_hours(restaurant.get("hours")))
+
+
+def insert_restaurant(restaurant_data, menu_data=None, conn=None):
     if menu_data is None:
         menu_data = []
 
     upsert = """
         INSERT INTO public.restaurants
-            (name, description, location, hours, category, avg_price, latitude, longitude, picture, yelp_rating, website_url)
+            (name, description, location, hours, category, avg_price, latitude, longitude, picture, yelp_rating, website_url, open_intervals)
         VALUES
             (%(name)s, %(description)s, %(location)s, %(hours)s, %(category)s,
-             %(avg_price)s, %(latitude)s, %(longitude)s, %(picture)s, %(yelp_rating)s, %(website_url)s)
+             %(avg_price)s, %(latitude)s, %(longitude)s, %(picture)s, %(yelp_rating)s, %(website_url)s,
+             %(open_intervals)s)
         ON CONFLICT (name, location) DO UPDATE SET
             description = EXCLUDED.description,
             hours       = EXCLUDED.hours,
@@ -177,37 +561,44 @@ def insert_restaurant(restaurant_data, menu_data=None):
             longitude   = EXCLUDED.longitude,
             picture     = EXCLUDED.picture,
             yelp_rating = EXCLUDED.yelp_rating,
-            website_url = EXCLUDED.website_url
+            website_url = EXCLUDED.website_url,
+            open_intervals = EXCLUDED.open_intervals
         RETURNING id;
     """
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(upsert, restaurant_data)
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(upsert, _with_open_intervals(restaurant_data))
         rest_id = cur.fetchone()[0]
 
         for item in menu_data:
             cur.execute(
                 """
                 INSERT INTO public.menu_items
-                    (restaurant_id, name, description, avg_price)
-                VALUES (%s, %s, %s, %s)
+                    (restaurant_id, name, description, avg_price, menu_position)
+                VALUES (%s, %s, %s, %s, %s)
                 ON CONFLICT (restaurant_id, lower(name))
                 DO UPDATE SET
-                    description = EXCLUDED.description,
-                    avg_price   = EXCLUDED.avg_price;
+                    description   = EXCLUDED.description,
+                    avg_price     = EXCLUDED.avg_price,
+                    menu_position = EXCLUDED.menu_position;
                 """,
                 (
                     rest_id,
                     item.get("name"),
                     item.get("description"),
                     item.get("avg_price"),
+                    item.get("menu_position"),
                 ),
             )
 
+        refresh_search_documents(cur, [rest_id])
+        bump_cache_version(cur, "catalog")
+        if menu_data:
+            bump_cache_version(cur, f"menu:{rest_id}")
         conn.commit()
         return rest_id
 
 
-def bulk_insert_restaurants(rows):
+def bulk_insert_restaurants(rows, conn=None):
     if not rows:
         return 0
 
@@ -223,6 +614,7 @@ def bulk_insert_restaurants(rows):
         "picture",
         "yelp_rating",
         "website_url",
+        "open_intervals",
     ]
     sql = f"""
         INSERT INTO public.restaurants ({",".join(cols)})
@@ -236,43 +628,366 @@ def bulk_insert_restaurants(rows):
             longitude   = EXCLUDED.longitude,
             picture     = EXCLUDED.picture,
             yelp_rating = EXCLUDED.yelp_rating,
-            website_url = EXCLUDED.website_url;
+            website_url = EXCLUDED.website_url,
+            open_intervals = EXCLUDED.open_intervals;
     """
-    values = [tuple(r.get(c) for c in cols) for r in rows]
+    values = [tuple(_with_open_intervals(r).get(c) for c in cols) for r in rows]
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with _connection(conn) as conn, conn.cursor() as cur:
         execute_values(cur, sql, values)
+        refresh_search_documents(cur)
+        bump_cache_version(cur, "catalog")
         conn.commit()
         return len(rows)
 
 
-def bulk_upsert_menu_items(restaurant_id, items):
+MENU_OPS = ("update", "insert", "delete")
+
+_MENU_CHANGE_TEMPLATE = (
+    "(%s::int, %s::text, %s::uuid, %s::text, %s::text, "
+    "%s::double precision, %s::int)"
+)
+
+
+def _validate_menu_changes(changes):
+    """Index -> reason for changes that cannot be sent (bad op, missing key, duplicate)."""
+    invalid = {}
+    seen_ids = set()
+    seen_names = set()
+    for idx, change in enumerate(changes):
+        op = change.get("op")
+        if op not in MENU_OPS:
+            invalid[idx] = "invalid"
+        elif op in ("update", "delete"):
+            if not change.get("id") or change["id"] in seen_ids:
+                invalid[idx] = "invalid"
+            else:
+                seen_ids.add(change["id"])
+        else:
+            name = (change.get("name") or "").strip().lower()
+            if not name or name in seen_names:
+                invalid[idx] = "invalid"
+            else:
+                seen_names.add(name)
+    return invalid
+
+
+def apply_menu_changes(cur, restaurant_id, changes):
+    """
+    Apply menu item updates, inserts and deletes for one restaurant in a
+    single statement on the caller's cursor (the caller commits).
+    changes: dicts with op ('update' | 'insert' | 'delete'), id (update and
+    delete), name, description, avg_price, menu_position.
+    Updates keep the stored menu_position when none is given; inserts
+    upsert on (restaurant_id, lower(name)).
+    Returns one {"index", "op", "id", "status"} per change, in order;
+    status is updated, inserted, deleted, not_found or invalid.
+    """
+    invalid = _validate_menu_changes(changes)
+    results = [
+        {"index": idx, "op": change.get("op"), "id": change.get("id"),
+         "status": invalid.get(idx)}
+        for idx, change in enumerate(changes)
+    ]
+    rows = [
+        (idx, c["op"], c.get("id"), c.get("name"), c.get("description"),
+         c.get("avg_price"), c.get("menu_position"))
+        for idx, c in enumerate(changes) if idx not in invalid
+    ]
+    if not rows:
+        return results
+
+    values = b",".join(cur.mogrify(_MENU_CHANGE_TEMPLATE, row) for row in rows)
+    rid = cur.mogrify("%s::uuid", (restaurant_id,))
+    # Fully rendered with mogrify, so executed without parameters
+    sql = b"""
+        WITH input (idx, op, id, name, description, avg_price, menu_position) AS (
+            VALUES """ + values + b"""
+        ),
+        upd AS (
+            UPDATE public.menu_items m
+            SET name          = i.name,
+                description   = i.description,
+                avg_price     = i.avg_price,
+                menu_position = COALESCE(i.menu_position, m.menu_position)
+            FROM input i
+            WHERE i.op = 'update' AND m.id = i.id AND m.restaurant_id = """ + rid + b"""
+            RETURNING i.idx, m.id
+        ),
+        ins AS (
+            INSERT INTO public.menu_items
+                (restaurant_id, name, description, avg_price, menu_position)
+            SELECT """ + rid + b""", i.name, i.description, i.avg_price, i.menu_position
+            FROM input i
+            WHERE i.op = 'insert'
+            ORDER BY i.idx
+            ON CONFLICT (restaurant_id, lower(name)) DO UPDATE SET
+                description   = EXCLUDED.description,
+                avg_price     = EXCLUDED.avg_price,
+                menu_position = COALESCE(EXCLUDED.menu_position, menu_items.menu_position)
+            RETURNING id, lower(name) AS lname, (xmax = 0) AS created
+        ),
+        del AS (
+            DELETE FROM public.menu_items m
+            USING input i
+            WHERE i.op = 'delete' AND m.id = i.id AND m.restaurant_id = """ + rid + b"""
+            RETURNING i.idx, m.id
+        )
+        SELECT i.idx,
+               COALESCE(u.id, n.id, d.id) AS id,
+               CASE WHEN u.idx IS NOT NULL THEN 'updated'
+                    WHEN n.id IS NOT NULL AND n.created THEN 'inserted'
+                    WHEN n.id IS NOT NULL THEN 'updated'
+                    WHEN d.idx IS NOT NULL THEN 'deleted'
+                    ELSE 'not_found'
+               END AS status
+        FROM input i
+        LEFT JOIN upd u ON u.idx = i.idx
+        LEFT JOIN ins n ON i.op = 'insert' AND n.lname = lower(i.name)
+        LEFT JOIN del d ON d.idx = i.idx
+        ORDER BY i.idx;
+    """
+    cur.execute(sql)
+    for idx, item_id, status in cur.fetchall():
+        results[idx]["id"] = str(item_id) if item_id is not None else results[idx]["id"]
+        results[idx]["status"] = status
+    return results
+
+
+def bulk_upsert_menu_items(restaurant_id, items, conn=None):
     if not items:
         return 0
 
+    changes = [{"op": "insert",
+                "name": i.get("name"),
+                "description": i.get("description"),
+                "avg_price": i.get("avg_price"),
+                "menu_position": i.get("menu_position")} for i in items]
+
+    with _connection(conn) as conn, conn.cursor() as cur:
+        results = apply_menu_changes(cur, restaurant_id, changes)
+        refresh_search_documents(cur, [restaurant_id])
+        bump_cache_version(cur, "catalog")
+        bump_cache_version(cur, f"menu:{restaurant_id}")
+        conn.commit()
+        return sum(1 for r in results if r["status"] in ("inserted", "updated"))
+
+
+def ensure_schema(conn=None):
+    """Every create/migrate/ensure step, on one connection."""
+    with _connection(conn) as conn:
+        create_restaurants_table(conn)
+        migrate_restaurant_new_columns(conn)
+        create_menu_items_table(conn)
+        migrate_menu_items_new_columns(conn)
+        create_users_table(conn)
+        create_cache_versions_table(conn)
+        create_restaurant_rating_stats_table(conn)
+        ensure_restaurants_uniqueness(conn)
+        ensure_menu_items_uniqueness(conn)
+        ensure_review_feedback_indexes(conn)
+        ensure_search_indexes(conn)
+        ensure_geo_index(conn)
+        create_import_manifest_tables(conn)
+
+
+def find_restaurant_ids_by_names(names, conn=None):
+    """{name: id} for many names in one query (same match as find_restaurant_id_by_name)."""
+    names = sorted(set(names))
+    if not names:
+        return {}
     sql = """
-        INSERT INTO public.menu_items (restaurant_id, name, description, avg_price)
-        VALUES %s
-        ON CONFLICT (restaurant_id, lower(name)) DO UPDATE SET
-            description = EXCLUDED.description,
-            avg_price   = EXCLUDED.avg_price;
+        SELECT DISTINCT ON (n.name) n.name, r.id
+        FROM unnest(%s::text[]) AS n(name)
+        JOIN public.restaurants r ON lower(r.name) = lower(n.name)
+        ORDER BY n.name, r.created_at DESC;
+    """
+    with _connection(conn) as conn, conn.cursor() as cur:
+        cur.execute(sql, (names,))
+        return dict(cur.fetchall())
+
+
+# ---------- COPY-based bulk loading ----------
+
+def _copy_field(value):
+    # Unquoted empty is NULL in COPY csv; strings are always quoted
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, (list, tuple)):
+        # Array literal of numbers
+        return '"{' + ",".join(str(v) for v in value) + '}"'
+    return str(value)
+
+
+class _CopyStream:
+    """File-like object rendering rows as COPY csv lines as they are read."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._pending = ""
+        self.count = 0
+
+    def read(self, size=-1):
+        parts = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = ",".join(_copy_field(v) for v in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(parts)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+    readline = read
+
+
+def _copy_into_stage(cur, stage, columns, column_ddl, rows):
+    """Create a temp staging table (dropped at commit) and COPY rows into it."""
+    cur.execute(
+        f"CREATE TEMP TABLE {stage} (seq bigserial, {column_ddl}) ON COMMIT DROP;"
+    )
+    stream = _CopyStream(rows)
+    cur.copy_expert(
+        f"COPY {stage} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        stream,
+    )
+    return stream.count
+
+
+_RESTAURANT_COLUMNS = [
+    "name", "description", "location", "hours", "category", "avg_price",
+    "latitude", "longitude", "picture", "yelp_rating", "website_url",
+    "open_intervals",
+]
+
+
+def copy_restaurants(rows, conn=None, manifest=None):
     """
-    values = [(restaurant_id,
-               i.get("name"),
-               i.get("description"),
-               i.get("avg_price")) for i in items]
+    Stream restaurant dicts through COPY into a staging table and merge
+    them into public.restaurants with one INSERT ... ON CONFLICT.
+    manifest (see _record_import) is written in the same transaction.
+    Returns the number of rows staged.
+    """
+    columns = _RESTAURANT_COLUMNS
+    with _connection(conn) as conn, conn.cursor() as cur:
+        staged = _copy_into_stage(
+            cur, "restaurants_stage", columns,
+            """name TEXT, description TEXT, location TEXT, hours TEXT,
+               category TEXT, avg_price NUMERIC, latitude DOUBLE PRECISION,
+               longitude DOUBLE PRECISION, picture TEXT, yelp_rating NUMERIC,
+               website_url TEXT, open_intervals INTEGER[]""",
+            ([_with_open_intervals(r).get(c) for c in columns] for r in rows),
+        )
+        cur.execute(
+            f"""
+            INSERT INTO public.restaurants ({", ".join(columns)})
+            SELECT DISTINCT ON (name, location) {", ".join(columns)}
+            FROM restaurants_stage
+            ORDER BY name, location, seq DESC
+            ON CONFLICT (name, location) DO UPDATE SET
+                description = EXCLUDED.description,
+                hours       = EXCLUDED.hours,
+                category    = EXCLUDED.category,
+                avg_price   = EXCLUDED.avg_price,
+                latitude    = EXCLUDED.latitude,
+                longitude   = EXCLUDED.longitude,
+                picture     = EXCLUDED.picture,
+                yelp_rating = EXCLUDED.yelp_rating,
+                website_url = EXCLUDED.website_url,
+                open_intervals = EXCLUDED.open_intervals;
+            """
+        )
+        if staged:
+            refresh_search_documents(cur)
+            bump_cache_version(cur, "catalog")
+        if manifest:
+            _record_import(cur, manifest)
+        conn.commit()
+        return staged
 
-    with get_conn() as conn, conn.cursor() as cur:
-        execute_values(cur, sql, values)
+
+def copy_menu_items(rows, conn=None, removed=(), manifest=None):
+    """
+    Stream (restaurant_id, name, description, avg_price, menu_position)
+    tuples through COPY into a staging table and merge them into
+    public.menu_items with one INSERT ... ON CONFLICT; the first row per
+    (restaurant, lower(name)) wins, as in the CSV order.
+    removed: (restaurant_id, lower(name)) pairs to delete.
+    manifest (see _record_import) is written in the same transaction.
+    Returns (rows staged, restaurant ids touched).
+    """
+    columns = ["restaurant_id", "name", "description", "avg_price", "menu_position"]
+    with _connection(conn) as conn, conn.cursor() as cur:
+        staged = _copy_into_stage(
+            cur, "menu_items_stage", columns,
+            """restaurant_id uuid, name TEXT, description TEXT,
+               avg_price DOUBLE PRECISION, menu_position INTEGER""",
+            rows,
+        )
+        removed = list(removed)
+        if removed:
+            # Before the merge, so a row re-added elsewhere in this load survives
+            execute_values(
+                cur,
+                """
+                DELETE FROM public.menu_items m
+                USING (VALUES %s) AS d(restaurant_id, name_key)
+                WHERE m.restaurant_id = d.restaurant_id::uuid
+                  AND lower(m.name) = d.name_key;
+                """,
+                removed,
+            )
+        cur.execute(
+            """
+            INSERT INTO public.menu_items
+                (restaurant_id, name, description, avg_price, menu_position)
+            SELECT DISTINCT ON (restaurant_id, lower(name))
+                   restaurant_id, name, description, avg_price, menu_position
+            FROM menu_items_stage
+            WHERE name <> ''
+            ORDER BY restaurant_id, lower(name), seq
+            ON CONFLICT (restaurant_id, lower(name)) DO UPDATE SET
+                description   = EXCLUDED.description,
+                avg_price     = EXCLUDED.avg_price,
+                menu_position = EXCLUDED.menu_position;
+            """
+        )
+        cur.execute("SELECT DISTINCT restaurant_id FROM menu_items_stage;")
+        restaurant_ids = {row[0] for row in cur.fetchall()}
+        restaurant_ids.update(rid for rid, _ in removed)
+        restaurant_ids = sorted(restaurant_ids)
+        if restaurant_ids:
+            refresh_search_documents(cur, restaurant_ids)
+            bump_cache_versions(
+                cur, ["catalog"] + [f"menu:{rid}" for rid in restaurant_ids]
+            )
+        if manifest:
+            _record_import(cur, manifest)
         conn.commit()
-        return len(items)
+        return staged, restaurant_ids
 
 
 if __name__ == "__main__":
-    create_restaurants_table()
-    migrate_restaurant_new_columns()
-    create_menu_items_table()
-    create_users_table()
-    ensure_restaurants_uniqueness()
-    ensure_menu_items_uniqueness()
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill-open-hours":
+        migrate_restaurant_new_columns()
+        n = backfill_open_intervals()
+        print(f"Opening hours compiled for {n} restaurants.")
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill-rating-stats":
+        create_restaurant_rating_stats_table()
+        n = backfill_restaurant_rating_stats()
+        print(f"Rating stats rebuilt for {n} restaurants.")
+        sys.exit(0)
+
+    ensure_schema()
     print("Tables and indexes ensured.")
\ No newline at end of file
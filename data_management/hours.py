@@ -0,0 +1,129 @@
+"""
+TigerBites opening-hours parser
+- Compiles restaurants.hours free text ("Sun–Thu 11:30 AM – 9 PM
+  Fri–Sat 11:30 AM – 10 PM", "Mon closed", "Daily 8 AM – 8 PM") into
+  open intervals in minutes of the week (Monday 00:00 = 0)
+- Result is a flat sorted list [start, end, start, end, ...] of merged
+  half-open intervals, stored in restaurants.open_intervals
+- Ranges past midnight run into the next day; Sunday night wraps to Monday
+- Text that cannot be fully parsed gives None (unknown), never a guess
+"""
+
+import re
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+_DAY = r"(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?"
+_TIME = r"\d{1,2}(?::\d{2})?\s*[ap]\.?m\.?|noon|midnight"
+
+_TOKEN_RE = re.compile(
+    rf"""
+    (?P<day_range>{_DAY}\s*-\s*{_DAY})
+    | (?P<daily>daily|every\s*day|open\s*daily)
+    | (?P<day>{_DAY})
+    | (?P<closed>closed)
+    | (?P<all_day>(?:open\s*)?24\s*(?:hours|hrs|/\s*7))
+    | (?P<time_range>(?:{_TIME})\s*-\s*(?:{_TIME}))
+    | (?P<sep>[,;:&|/]|and\b)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])", re.IGNORECASE)
+
+
+def _day(text):
+    return _DAYS[text.strip().lower()[:3]]
+
+
+def _day_span(text):
+    first, last = re.split(r"\s*-\s*", text.strip(), maxsplit=1)
+    start, end = _day(first), _day(last)
+    return [(start + i) % 7 for i in range((end - start) % 7 + 1)]
+
+
+def _minutes(text):
+    text = text.strip().lower()
+    if text == "noon":
+        return 12 * 60
+    if text == "midnight":
+        return 0
+    match = _TIME_RE.match(text)
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    if not (1 <= hour <= 12 and minute < 60):
+        raise ValueError(text)
+    return (hour % 12 + (12 if match.group(3).lower() == "p" else 0)) * 60 + minute
+
+
+def _time_range(text):
+    start, end = re.split(r"\s*-\s*", text.strip(), maxsplit=1)
+    return _minutes(start), _minutes(end)
+
+
+def merge(intervals):
+    """Sort and merge (start, end) pairs; returns the flat list form."""
+    flat = []
+    for start, end in sorted(intervals):
+        if flat and start <= flat[-1]:
+            flat[-1] = max(flat[-1], end)
+        else:
+            flat += [start, end]
+    return flat
+
+
+def parse_hours(text):
+    """Open intervals for free-text hours, or None if the text is not understood."""
+    if not text or not text.strip():
+        return None
+    # Any dash or "to" between days/times is a range separator
+    normalized = re.sub(r"\s*(?:[‐-―−-]|\bto\b)\s*", " - ", text)
+
+    intervals = []
+    days = None          # days the next times/closed apply to
+    applied = False      # whether days already received times
+    pos = 0
+    for match in _TOKEN_RE.finditer(normalized):
+        if normalized[pos:match.start()].strip():
+            return None
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        try:
+            if kind in ("day", "day_range", "daily"):
+                span = list(range(7)) if kind == "daily" else (
+                    _day_span(value) if kind == "day_range" else [_day(value)])
+                days = span if days is None or applied else days + span
+                applied = False
+            elif kind == "closed":
+                if days is None:
+                    return None
+                applied = True
+            elif kind in ("time_range", "all_day"):
+                if days is None:
+                    days = list(range(7))
+                start, end = (0, MINUTES_PER_DAY) if kind == "all_day" else _time_range(value)
+                if end <= start:
+                    end += MINUTES_PER_DAY
+                for day in days:
+                    begin = day * MINUTES_PER_DAY + start
+                    finish = day * MINUTES_PER_DAY + end
+                    if finish > MINUTES_PER_WEEK:
+                        intervals.append((begin, MINUTES_PER_WEEK))
+                        intervals.append((0, finish - MINUTES_PER_WEEK))
+                    else:
+                        intervals.append((begin, finish))
+                applied = True
+        except (ValueError, KeyError, AttributeError):
+            return None
+    if normalized[pos:].strip() or days is None or not applied:
+        return None
+    return merge(intervals)
+
+
+def is_open(intervals, minute_of_week):
+    """Whether a parsed interval list contains minute_of_week."""
+    for i in range(0, len(intervals or ()), 2):
+        if intervals[i] <= minute_of_week < intervals[i + 1]:
+            return True
+    return False
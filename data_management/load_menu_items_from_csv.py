@@ -4,25 +4,38 @@ Expected CSV headers: Item, Price, Description
 - If called with a directory, loads all *_menu.csv files inside.
 - If called with file paths, loads those.
 Restaurant is inferred from filename prefix before ' - '.
+- CSVs are parsed in parallel (--workers N, default: CPU count)
+- All restaurant names are resolved in one query
+- Rows are streamed through COPY into a staging table and merged with a
+  single INSERT ... ON CONFLICT, on one connection
+- Incremental: files whose content hash matches the import manifest are
+  skipped; for changed files only new/changed rows are upserted and rows
+  that disappeared from the CSV are deleted (--full re-upserts every row)
 """
 
+import os
 import sys
 import re
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import csv
 from statistics import mean
 from decimal import Decimal, InvalidOperation
 
 from data_management.db_manager import (
-    create_restaurants_table,
-    create_menu_items_table,
-    create_users_table,
-    ensure_restaurants_uniqueness,
-    ensure_menu_items_uniqueness,
-    find_restaurant_id_by_name,
-    bulk_upsert_menu_items,
+    get_conn,
+    ensure_schema,
+    content_hash,
+    load_import_manifest,
+    load_import_rows,
+    find_restaurant_ids_by_names,
+    copy_menu_items,
 )
 
+MANIFEST_KIND = "menu"
+
 def to_avg_price(s):
     if s is None:
         return None
@@ -43,7 +56,9 @@ def to_avg_price(s):
         return vals[0] if vals else None
 
 def read_menu_csv(csv_path: Path):
+    # menu_position keeps the CSV order so the API can ORDER BY it
     items = []
+    positions = {}
     with csv_path.open(newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         def pick(d, *names):
@@ -61,6 +76,10 @@ def read_menu_csv(csv_path: Path):
                 'avg_price': to_avg_price(price),
             }
             if item['name']:
+                key = item['name'].lower()
+                if key not in positions:
+                    positions[key] = len(positions)
+                item['menu_position'] = positions[key]
                 items.append(item)
     return items
 
@@ -78,41 +97,105 @@ def expand_targets(arg: str):
         return sorted(Path('.').glob(arg))
     return [path]
 
+def parse_file(p: Path, known_hash=None):
+    """
+    (restaurant name, file name, file hash, items) for one CSV; runs in a
+    worker process. items is None when the file hash equals known_hash.
+    """
+    file_hash = content_hash(p.read_bytes())
+    items = None if file_hash == known_hash else read_menu_csv(p)
+    return infer_restaurant_name_from_filename(p), p.name, file_hash, items
+
+def diff_items(rest_id, items, previous, full=False):
+    """
+    Compare parsed items with the row hashes last imported from the file.
+    Returns (rows to upsert, {row_key: row_hash} of those rows, removed
+    row keys); the first item per lower(name) wins, as in the database merge.
+    """
+    seen = set()
+    rows = []
+    hashes = {}
+    for item in items:
+        key = item['name'].lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        values = (item['name'], item['description'], item['avg_price'], item['menu_position'])
+        row_hash = content_hash(*values)
+        if full or previous.get(key) != row_hash:
+            rows.append((rest_id, *values))
+            hashes[key] = row_hash
+    removed = sorted(previous.keys() - seen)
+    return rows, hashes, removed
+
 def main(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m data_management.load_menu_items_from_csv",
+        description="Load <csv|dir with *_menu.csv> files into public.menu_items.",
+    )
+    parser.add_argument("targets", nargs="+")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="CSV parser processes (1 parses in this process)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the import manifest and re-upsert every row")
     if len(argv) <= 1:
-        print("Usage: python -m data_management.load_menu_items_from_csv <csv|dir with *_menu.csv> [...]")
+        parser.print_usage()
         return 2
-
-    create_restaurants_table()
-    create_menu_items_table()
-    create_users_table()
-    ensure_restaurants_uniqueness()
-    ensure_menu_items_uniqueness()
+    args = parser.parse_args(argv[1:])
 
     all_paths = []
-    for a in argv[1:]:
-        all_paths.extend(expand_targets(a))
+    for a in args.targets:
+        all_paths.extend(p for p in expand_targets(a) if p.suffix.lower() == '.csv')
 
     if not all_paths:
         print("No CSV files found.")
         return 2
 
-    total_items = 0
-    for p in all_paths:
-        if p.suffix.lower() != '.csv':
-            continue
-        rname = infer_restaurant_name_from_filename(p)
-        rest_id = find_restaurant_id_by_name(rname)
-        if not rest_id:
-            print(f"[SKIP] Restaurant not found for '{rname}' from file {p.name}.")
-            continue
+    started = time.perf_counter()
+    conn = get_conn()
+    try:
+        ensure_schema(conn)
+        known = {} if args.full else load_import_manifest(MANIFEST_KIND, conn)
+        known_hashes = [known.get(p.name) for p in all_paths]
+
+        workers = max(1, min(args.workers, len(all_paths)))
+        if workers == 1:
+            parsed = list(map(parse_file, all_paths, known_hashes))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(parse_file, all_paths, known_hashes, chunksize=16))
+        parse_seconds = time.perf_counter() - started
+
+        changed = [entry for entry in parsed if entry[3] is not None]
+        ids = find_restaurant_ids_by_names([rname for rname, _, _, _ in changed], conn)
+        previous = load_import_rows(
+            MANIFEST_KIND, [fname for rname, fname, _, _ in changed if rname in ids], conn)
+
+        rows, removed = [], []
+        manifest = {"kind": MANIFEST_KIND, "files": [], "rows": [], "removed": []}
+        for rname, fname, file_hash, items in changed:
+            rest_id = ids.get(rname)
+            if not rest_id:
+                print(f"[SKIP] Restaurant not found for '{rname}' from file {fname}.")
+                continue
+            file_rows, hashes, gone = diff_items(rest_id, items, previous[fname], args.full)
+            rows.extend(file_rows)
+            removed.extend((rest_id, key) for key in gone)
+            manifest["files"].append((fname, file_hash, rest_id))
+            manifest["rows"].extend((fname, key, row_hash) for key, row_hash in hashes.items())
+            manifest["removed"].extend((fname, key) for key in gone)
 
-        items = read_menu_csv(p)
-        n = bulk_upsert_menu_items(rest_id, items)
-        total_items += n
-        print(f"Upserted {n} items for {rname} from {p.name}")
+        total_items, restaurant_ids = copy_menu_items(
+            rows, conn, removed=removed, manifest=manifest)
+    finally:
+        conn.close()
 
-    print(f"Done. Total menu items upserted: {total_items}")
+    elapsed = time.perf_counter() - started
+    rate = total_items / elapsed if elapsed > 0 else 0.0
+    print(f"Done. {len(all_paths) - len(changed)} unchanged files skipped; "
+          f"{total_items} menu items upserted and {len(removed)} removed for "
+          f"{len(restaurant_ids)} restaurants in {elapsed:.2f}s "
+          f"(parse {parse_seconds:.2f}s, {workers} workers) - {rate:,.0f} rows/s")
     return 0
 
 if __name__ == '__main__':
@@ -3,23 +3,30 @@ TigerBites CSV Loader (restaurants)
 - Reads Restaurant Data.csv and upserts into public.restaurants
 - Defaults to a CSV that lives next to this file unless a path is passed
 - Supports 'picture' and 'yelp_rating' columns
+- Rows are streamed through COPY into a staging table and merged with a
+  single INSERT ... ON CONFLICT, on one connection
+- Incremental: an unchanged file (by content hash) is skipped and only
+  new/changed rows are upserted; --full re-upserts every row. Rows that
+  disappear from the CSV are dropped from the manifest, not deleted.
 """
 
 import csv
 import sys
+import time
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
 
 from data_management.db_manager import (
-    create_restaurants_table,
-    create_menu_items_table,
-    create_users_table,
-    ensure_restaurants_uniqueness,
-    ensure_menu_items_uniqueness,
-    migrate_restaurant_new_columns,
-    bulk_insert_restaurants,
+    get_conn,
+    ensure_schema,
+    content_hash,
+    load_import_manifest,
+    load_import_rows,
+    copy_restaurants,
 )
 
+MANIFEST_KIND = "restaurants"
+
 def to_float(x):
     if x is None:
         return None
@@ -55,10 +62,28 @@ def load_csv(csv_path: Path):
             rows.append(row)
     return rows
 
+def diff_rows(rows, previous, full=False):
+    """
+    (rows to upsert, {row_key: row_hash} of those rows, removed row keys)
+    against the row hashes last imported; keyed like the table's
+    (name, location) constraint, last row wins.
+    """
+    current = {}
+    for row in rows:
+        key = f"{row['name']}\n{row['location']}"
+        current[key] = (row, content_hash(*row.values()))
+    changed = {key: value for key, value in current.items()
+               if full or previous.get(key) != value[1]}
+    return ([row for row, _ in changed.values()],
+            {key: row_hash for key, (_, row_hash) in changed.items()},
+            sorted(previous.keys() - current.keys()))
+
 def main():
+    args = [a for a in sys.argv[1:] if a != "--full"]
+    full = len(args) != len(sys.argv) - 1
     # If no arg, default to sibling CSV named "Restaurant Data.csv"
-    if len(sys.argv) >= 2:
-        csv_path = Path(sys.argv[1])
+    if args:
+        csv_path = Path(args[0])
     else:
         csv_path = Path(__file__).resolve().parent / "Restaurant Data.csv"
 
@@ -66,17 +91,30 @@ def main():
         print(f"CSV not found: {csv_path}")
         sys.exit(2)
 
-    # Ensure schema and indexes
-    create_restaurants_table()
-    migrate_restaurant_new_columns()
-    create_menu_items_table()
-    create_users_table()
-    ensure_restaurants_uniqueness()
-    ensure_menu_items_uniqueness()
-
-    rows = load_csv(csv_path)
-    n = bulk_insert_restaurants(rows)
-    print(f"Inserted/updated {n} restaurants from {csv_path.name}.")
+    started = time.perf_counter()
+    source = csv_path.name
+    file_hash = content_hash(csv_path.read_bytes())
+    conn = get_conn()
+    try:
+        # Ensure schema and indexes
+        ensure_schema(conn)
+        if not full and load_import_manifest(MANIFEST_KIND, conn).get(source) == file_hash:
+            print(f"{source} is unchanged since the last import; nothing to do (--full to force).")
+            return
+        previous = load_import_rows(MANIFEST_KIND, [source], conn)[source]
+        rows, hashes, removed = diff_rows(load_csv(csv_path), previous, full)
+        n = copy_restaurants(rows, conn, manifest={
+            "kind": MANIFEST_KIND,
+            "files": [(source, file_hash, None)],
+            "rows": [(source, key, row_hash) for key, row_hash in hashes.items()],
+            "removed": [(source, key) for key in removed],
+        })
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    rate = n / elapsed if elapsed > 0 else 0.0
+    print(f"Inserted/updated {n} restaurants from {source} "
+          f"in {elapsed:.2f}s - {rate:,.0f} rows/s.")
 
 if __name__ == "__main__":
     main()
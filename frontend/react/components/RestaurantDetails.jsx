@@ -3,8 +3,15 @@ import React, { useState } from "react";
 const RestaurantDetails = ({ restaurant, menuItems, reviews = [] }) => {
   const [isOpen, setIsOpen] = useState(false);
 
+  // Rating stats come with the restaurant; reviews may be just one page
+  const reviewCount =
+    restaurant && restaurant.review_count != null
+      ? restaurant.review_count
+      : reviews.length;
   const averageRating =
-    reviews.length > 0
+    restaurant && restaurant.avg_rating != null
+      ? Number(restaurant.avg_rating).toFixed(1)
+      : reviews.length > 0
       ? (
           reviews.reduce((sum, r) => sum + r.rating, 0) / reviews.length
         ).toFixed(1)
@@ -59,7 +66,7 @@ const RestaurantDetails = ({ restaurant, menuItems, reviews = [] }) => {
           )}
           {averageRating && (
             <p className="text-secondary mb-0">
-              ⭐ TigerBites user rating: {averageRating} / 5 ({reviews.length}{" "}
+              ⭐ TigerBites user rating: {averageRating} / 5 ({reviewCount}{" "}
               reviews)
             </p>
           )}
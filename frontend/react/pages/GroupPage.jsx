@@ -562,13 +562,10 @@ const GroupsPage = () => {
                 </div>
 
                 {/* Recommended matches section moved to bottom: show compact restaurant cards matching recommended cuisines */}
-                {groupPreferences && restaurants && restaurants.length > 0 && (
+                {groupPreferences && (
                   (() => {
-                    const recs = (groupPreferences.recommended_cuisines || []).map(c => c.trim().toLowerCase());
-                    const matches = restaurants.filter(r => {
-                      const cat = (r.category || '').trim().toLowerCase();
-                      return cat && recs.includes(cat);
-                    });
+                    // Ranked server-side by how many members favour the cuisine
+                    const matches = groupPreferences.candidates || [];
                     if (matches.length === 0) {
                       return (
                         <div className="mb-4">
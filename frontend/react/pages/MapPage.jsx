@@ -13,6 +13,7 @@ const mapsKey = process.env.GOOGLE_MAPS_KEY;
 
 const MapPage = () => {
   const [locations, setLocations] = useState([]);
+  const [clusters, setClusters] = useState([]);
   const [openMarkerId, setOpenMarkerId] = useState(null);
   const [userLocation, setUserLocation] = useState(null);
   const [mapCenter, setMapCenter] = useState(MAP_CENTER);
@@ -38,15 +39,30 @@ const MapPage = () => {
     }
   }, []);
 
-  useEffect(() => {
-    fetch("/api/map")
+  // Load only what the viewport shows; the server clusters at low zoom
+  const viewportRequest = useRef(null);
+  const loadViewport = (map) => {
+    const bounds = map && map.getBounds();
+    if (!bounds) return;
+    const sw = bounds.getSouthWest();
+    const ne = bounds.getNorthEast();
+    const params = new URLSearchParams({
+      bbox: [sw.lng(), sw.lat(), ne.lng(), ne.lat()].map((v) => v.toFixed(5)).join(","),
+      zoom: String(Math.round(map.getZoom())),
+    });
+    if (viewportRequest.current) viewportRequest.current.abort();
+    const controller = new AbortController();
+    viewportRequest.current = controller;
+    fetch(`/api/map?${params}`, { signal: controller.signal })
       .then((res) => res.json())
       .then((data) => {
-        console.log("Fetched restaurants:", data.restaurants);
-        setLocations(data.restaurants);
+        setLocations(data.restaurants || []);
+        setClusters(data.clusters || []);
       })
-      .catch((err) => console.error("Fetch error:", err));
-  }, []);
+      .catch((err) => {
+        if (err.name !== "AbortError") console.error("Fetch error:", err);
+      });
+  };
 
   const containerRef = useRef(null);
   const [availableHeight, setAvailableHeight] = useState(null);
@@ -85,6 +101,7 @@ const MapPage = () => {
           defaultZoom={15}
           style={{ width: "100%", height: "100%" }}
           onClick={() => setOpenMarkerId(null)}
+          onIdle={(ev) => loadViewport(ev.map)}
         >
           {userLocation && (
             <AdvancedMarker position={userLocation} title="Your location">
@@ -92,6 +109,18 @@ const MapPage = () => {
             </AdvancedMarker>
           )}
 
+          {clusters.map((c) => (
+            <AdvancedMarker
+              key={`cluster-${c.latitude}-${c.longitude}`}
+              position={{ lat: c.latitude, lng: c.longitude }}
+              title={`${c.count} restaurants`}
+            >
+              <Pin background="#FF5F0D" glyphColor="#fff" borderColor="#000" scale={1.4}>
+                <span style={{ color: "#fff", fontWeight: "bold" }}>{c.count}</span>
+              </Pin>
+            </AdvancedMarker>
+          ))}
+
           {locations.map((loc) => (
             <React.Fragment key={loc.id}>
               <AdvancedMarker
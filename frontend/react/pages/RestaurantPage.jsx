@@ -5,6 +5,9 @@ import ReviewList from "../components/ReviewList.jsx";
 import { useParams } from "react-router-dom";
 import MapComponent from "../components/MapComponent.jsx";
 
+// Same page size as the bundle endpoint's first page
+const REVIEWS_PAGE_SIZE = 20;
+
 const RestaurantPage = () => {
   const { restId } = useParams();
   const [restaurant, setRestaurant] = useState(null);
@@ -16,10 +19,11 @@ const RestaurantPage = () => {
   const [error, setError] = useState(null);
   const [showModal, setShowModal] = useState(false);
   const [correctionText, setCorrectionText] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
 
-  useEffect(() => {
-    // Fetch restaurant and menu
-    fetch(`/api/restaurants/${restId}`, { credentials: "include" })
+  // Restaurant, menu, first page of reviews and the viewer in one request
+  const loadBundle = () =>
+    fetch(`/api/restaurants/${restId}/bundle`, { credentials: "include" })
       .then((res) => {
         if (!res.ok) throw new Error(`HTTP ${res.status}`);
         return res.json();
@@ -27,48 +31,39 @@ const RestaurantPage = () => {
       .then((data) => {
         setRestaurant(data.restaurant);
         setMenuItems(data.menu);
-      })
+        setReviews(data.reviews);
+        setNextCursor(data.next_cursor);
+        setCurrentUsername(data.viewer ? data.viewer.username : null);
+        setIsAdmin(!!(data.viewer && data.viewer.admin_status));
+      });
+
+  useEffect(() => {
+    loadBundle()
       .catch((err) => {
         console.error(err);
         setError("Failed to load restaurant");
-      });
-
-    // Fetch reviews
-    fetch(`/api/restaurants/${restId}/reviews`, { credentials: "include" })
-      .then((res) => res.json())
-      .then((data) => {
-        if (data.reviews) {
-          setReviews(data.reviews);
-        }
-      })
-      .catch((err) => console.error("Failed to load reviews:", err));
-
-    // Fetch current user
-    fetch("/api/profile", { credentials: "include" })
-      .then((res) => {
-        if (res.ok) return res.json();
-        return null;
       })
-      .then((data) => {
-        if (data) {
-          setCurrentUsername(data.username);
-          setIsAdmin(!!data.admin_status);
-        }
-        setLoading(false);
-      })
-      .catch(() => setLoading(false));
+      .finally(() => setLoading(false));
   }, [restId]);
 
   const handleReviewSubmitted = (newReview) => {
-    // Refresh reviews after submission
-    fetch(`/api/restaurants/${restId}/reviews`, { credentials: "include" })
+    // Refresh restaurant stats and reviews after submission
+    loadBundle().catch((err) => console.error("Failed to reload reviews:", err));
+  };
+
+  const handleLoadMoreReviews = () => {
+    fetch(
+      `/api/restaurants/${restId}/reviews?limit=${REVIEWS_PAGE_SIZE}&cursor=${encodeURIComponent(nextCursor)}`,
+      { credentials: "include" }
+    )
       .then((res) => res.json())
       .then((data) => {
         if (data.reviews) {
-          setReviews(data.reviews);
+          setReviews([...reviews, ...data.reviews]);
+          setNextCursor(data.next_cursor);
         }
       })
-      .catch((err) => console.error("Failed to reload reviews:", err));
+      .catch((err) => console.error("Failed to load more reviews:", err));
   };
 
   const handleDeleteReview = (reviewId) => {
@@ -133,6 +128,16 @@ const RestaurantPage = () => {
           isAdmin={isAdmin}
           onDeleteReview={handleDeleteReview}
         />
+        {nextCursor && (
+          <div className="text-center mb-4">
+            <button
+              className="btn btn-outline-secondary"
+              onClick={handleLoadMoreReviews}
+            >
+              Load more reviews
+            </button>
+          </div>
+        )}
         {restaurant && (
           <MapComponent
             latitude={restaurant.latitude}
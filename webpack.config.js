@@ -1,5 +1,68 @@
 const path = require("path");
 const Dotenv = require("dotenv-webpack");
+const fs = require("fs");
+const zlib = require("zlib");
+
+// Precompressed copies that backend/static_assets.py serves directly
+const compressible = /\.(js|css|html|svg|json)$/;
+const variants = [
+  [".gz", (buf) => zlib.gzipSync(buf, { level: 9 })],
+  [
+    ".br",
+    (buf) =>
+      zlib.brotliCompressSync(buf, {
+        params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 },
+      }),
+  ],
+];
+
+// Every build first deletes the .gz/.br files of the previous one, so a
+// development build never leaves stale production variants behind.
+// With compress set (production), it writes fresh ones for each asset
+// of at least 1 KiB that shrinks to 80% or less.
+class PrecompressPlugin {
+  constructor({ compress }) {
+    this.compress = compress;
+  }
+
+  apply(compiler) {
+    const removeStale = (_, callback) => {
+      const dir = compiler.options.output.path;
+      if (fs.existsSync(dir)) {
+        for (const name of fs.readdirSync(dir)) {
+          if (variants.some(([suffix]) => name.endsWith(suffix)) &&
+              compressible.test(name.slice(0, -3))) {
+            fs.unlinkSync(path.join(dir, name));
+          }
+        }
+      }
+      callback();
+    };
+    compiler.hooks.beforeRun.tapAsync("PrecompressPlugin", removeStale);
+    compiler.hooks.watchRun.tapAsync("PrecompressPlugin", removeStale);
+    if (!this.compress) return;
+
+    compiler.hooks.thisCompilation.tap("PrecompressPlugin", (compilation) => {
+      const { Compilation, sources } = compiler.webpack;
+      compilation.hooks.processAssets.tap(
+        { name: "PrecompressPlugin", stage: Compilation.PROCESS_ASSETS_STAGE_TRANSFER },
+        (assets) => {
+          for (const name of Object.keys(assets)) {
+            if (!compressible.test(name)) continue;
+            const buf = Buffer.from(assets[name].buffer());
+            if (buf.length < 1024) continue;
+            for (const [suffix, compress] of variants) {
+              const out = compress(buf);
+              if (out.length <= buf.length * 0.8) {
+                compilation.emitAsset(name + suffix, new sources.RawSource(out));
+              }
+            }
+          }
+        }
+      );
+    });
+  }
+}
 
 let config = {
   entry: {
@@ -35,5 +98,6 @@ module.exports = (env, argv) => {
   if (argv.mode === "development") {
     config.devtool = "inline-source-map";
   }
+  config.plugins.push(new PrecompressPlugin({ compress: argv.mode === "production" }));
   return config;
 };